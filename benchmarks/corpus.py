@@ -0,0 +1,205 @@
+"""
+Seeded corpus of realistic and adversarial LLM review outputs for the benchmarks.
+"""
+
+import json
+import random
+
+import numpy as np
+import pandas as pd
+
+from src.review_logger import ReviewScoreLogger
+from src.leaderboard import KEY_COLUMNS, SCORE_COLUMNS
+
+_WORDS = (
+    "sensor datasheet accuracy supply voltage current range resolution calibration "
+    "temperature humidity pressure output analog digital interface register timing "
+    "package footprint compliance RoHS typical maximum minimum response drift noise "
+    "the generated official section omits includes correctly incorrectly lists values"
+).split()
+
+_PREAMBLES = [
+    "Here is my evaluation of the generated datasheet:\n\n",
+    "After carefully comparing both documents, I have produced the following review.\n\n",
+    "Sure! Below is the JSON review you requested.\n\n",
+]
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _prose(rng, target_chars):
+    parts = []
+    length = 0
+    while length < target_chars:
+        paragraph = " ".join(_sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(3, 7)))
+        parts.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(parts)
+
+
+def make_review(rng, keys=None):
+    """
+    Build a review dict in the format the review prompts ask for.
+
+    Args:
+        rng (random.Random): Seeded random generator
+        keys (list, optional): Criterion numbers to include; defaults to 1-16 plus the overall score
+
+    Returns:
+        dict: Review with pN_score / pN_justification keys
+    """
+    numbers = keys or range(1, len(ReviewScoreLogger.P_CRITERIA_BASE_NAMES) + 1)
+    review = {"sensor_evaluated": "Bosch BME280"}
+    for i in numbers:
+        review[f"p{i}_score"] = "N/A" if rng.random() < 0.1 else rng.randint(1, 5)
+        review[f"p{i}_justification"] = _sentence(rng, rng.randint(6, 16))
+    if keys is None or 16 in keys:
+        review["overall_score"] = rng.randint(1, 5)
+        review["overall_justification"] = _sentence(rng, 20)
+        review["confirmation"] = "This review is exclusively for the Bosch BME280 sensor."
+    return review
+
+
+def generate_corpus(seed=0):
+    """
+    Generate the benchmark inputs.
+
+    Args:
+        seed (int): Seed so that every run benchmarks identical inputs
+
+    Returns:
+        dict: case name -> response text
+    """
+    rng = random.Random(seed)
+    review_json = json.dumps(make_review(rng), indent=2)
+    corpus = {}
+
+    # Realistic: a fenced JSON block with a short preamble and sign-off
+    corpus["fenced"] = rng.choice(_PREAMBLES) + "```json\n" + review_json + "\n```\n\n" + _sentence(rng)
+
+    # Realistic: bare JSON surrounded by a few paragraphs of prose
+    corpus["prose_wrapped"] = _prose(rng, 2000) + "\n\n" + review_json + "\n\n" + _prose(rng, 1000)
+
+    # Adversarial: very large prose (e.g. the model echoed the datasheet) before the JSON
+    corpus["large_prose"] = _prose(rng, 200_000) + "\n\n" + review_json
+
+    # Adversarial: many brace fragments (register notations, templates, code) ahead of the JSON
+    fragments = []
+    for _ in range(2000):
+        fragment = rng.choice([
+            "{0x%02X}" % rng.randint(0, 255),
+            "{{placeholder}}",
+            "{ \"partial\": ",
+            "{a {b {c} d} e}",
+            "}",
+            "struct { uint8_t reg; }",
+        ])
+        fragments.append(_sentence(rng, 4) + " " + fragment)
+    corpus["brace_fragments"] = " ".join(fragments) + "\n\n" + review_json
+
+    # Adversarial: output cut off mid-JSON (e.g. max tokens reached), with and without a fence
+    cut = rng.randint(len(review_json) // 3, len(review_json) * 2 // 3)
+    corpus["truncated_fenced"] = "```json\n" + review_json[:cut]
+    corpus["truncated_bare"] = _prose(rng, 1000) + "\n" + review_json[:cut]
+
+    # Adversarial: no JSON at all
+    corpus["no_json"] = _prose(rng, 20_000)
+
+    return corpus
+
+
+def generate_chunk_payloads(seed=0):
+    """
+    Generate dicts for validating the Pydantic review models.
+
+    Args:
+        seed (int): Seed for reproducible payloads
+
+    Returns:
+        dict: model name -> payload dict
+    """
+    rng = random.Random(seed)
+    return {
+        "ReviewChunk1": make_review(rng, list(range(1, 7))),
+        "ReviewChunk2": make_review(rng, list(range(7, 12))),
+        "ReviewChunk3": make_review(rng, list(range(12, 17))),
+        "CompleteReview": make_review(rng),
+    }
+
+
+def generate_review_rows(count, seed=0):
+    """
+    Generate arguments for ReviewScoreLogger.log_review.
+
+    Args:
+        count (int): Number of reviews
+        seed (int): Seed for reproducible rows
+
+    Returns:
+        list: (scores, justifications) tuples keyed "P1".."P16" and "Overall"
+    """
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        review = make_review(rng)
+        scores = {f"P{i}": review[f"p{i}_score"] for i in range(1, 17)}
+        justifications = {f"P{i}": review[f"p{i}_justification"] for i in range(1, 17)}
+        scores["Overall"] = review["overall_score"]
+        justifications["Overall"] = review["overall_justification"]
+        rows.append((scores, justifications))
+    return rows
+
+
+def generate_datasheets(seed=0, chars=200_000):
+    """
+    Generate a large official and generated datasheet for the prompt rendering benchmarks.
+
+    Args:
+        seed (int): Seed for reproducible text
+        chars (int): Approximate size of each datasheet
+
+    Returns:
+        tuple: (official_datasheet, generated_datasheet)
+    """
+    rng = random.Random(seed)
+    return _prose(rng, chars), _prose(rng, chars)
+
+
+def generate_score_frame(count, seed=0, generators=20, reviewers=3, sensors=60, domains=6):
+    """
+    Generate review score columns as loaded by ReviewStore.scan for the leaderboard benchmarks.
+
+    Args:
+        count (int): Number of reviews
+        seed (int): Seed for reproducible rows
+        generators (int): Number of generator models
+        reviewers (int): Number of reviewer models
+        sensors (int): Number of sensors
+        domains (int): Number of sensor domains
+
+    Returns:
+        tuple: (DataFrame with KEY_COLUMNS and SCORE_COLUMNS, NaN for "N/A"; {(brand, type): domain})
+    """
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(1, 6, size=(count, len(SCORE_COLUMNS))).astype(float)
+    scores[rng.random(scores.shape) < 0.1] = np.nan
+    sensor_codes = rng.integers(0, sensors, count)
+    generator_codes = rng.integers(0, generators, count)
+    reviewer_codes = rng.integers(0, reviewers, count)
+    keys = {
+        'Sensor_Brand': np.array([f"Brand{code % 10}" for code in range(sensors)], dtype=object)[sensor_codes],
+        'Sensor_Type': np.array([f"Model{code}" for code in range(sensors)], dtype=object)[sensor_codes],
+        'Generated_Datasheet_LLM_Provider': np.array([f"provider{code % 4}" for code in range(generators)],
+                                                     dtype=object)[generator_codes],
+        'Generated_Datasheet_LLM_Model': np.array([f"generator-{code}" for code in range(generators)],
+                                                  dtype=object)[generator_codes],
+        'Reviewer_LLM_Provider': np.full(count, "reviewer-provider", dtype=object),
+        'Reviewer_LLM_Model': np.array([f"reviewer-{code}" for code in range(reviewers)], dtype=object)[reviewer_codes],
+    }
+    df = pd.DataFrame({name: keys[name] for name in KEY_COLUMNS})
+    for column, name in enumerate(SCORE_COLUMNS):
+        df[name] = scores[:, column]
+    domains_by_sensor = {(f"Brand{code % 10}", f"Model{code}"): f"Domain{code % domains}" for code in range(sensors)}
+    return df, domains_by_sensor
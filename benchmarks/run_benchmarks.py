@@ -0,0 +1,343 @@
+"""
+Benchmarks for the review parsing, validation and logging hot paths.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks
+
+Every run is appended to a history CSV; a benchmark whose best time is slower
+than the median of its recent history by more than the threshold is flagged
+as a regression. The peak memory allocated by one call is shown alongside.
+"""
+
+import os
+import csv
+import time
+import shutil
+import logging
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+import click
+from rich.console import Console
+from rich.table import Table
+from rich.markup import escape
+
+from benchmarks.corpus import (generate_corpus, generate_chunk_payloads, generate_review_rows, generate_datasheets,
+                               generate_score_frame)
+from src.utils import extract_json_from_llm_response
+from src.chunked_reviewer import ChunkedReviewer
+from src.prompt_template import load_template
+from src.review_logger import ReviewScoreLogger
+from src.leaderboard import ReviewScores, build_leaderboard, load_review_scores
+from src import review_models
+
+console = Console()
+
+HISTORY_FIELD_NAMES = ['Timestamp', 'Commit', 'Benchmark', 'Iterations', 'BestSeconds', 'MedianSeconds']
+
+REVIEW_PROMPT_PATH = 'prompts/review_criteria_prompt.txt'
+
+LEADERBOARD_REVIEWS = 100_000
+
+
+class Benchmark:
+    """A named callable timed over a fixed number of iterations."""
+
+    def __init__(self, name, func, iterations):
+        self.name = name
+        self.func = func
+        self.iterations = iterations
+
+
+def _time(benchmark, repeat):
+    """
+    Time a benchmark.
+
+    Returns:
+        tuple: (best, median) seconds per iteration over the repeats
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(benchmark.iterations):
+            benchmark.func()
+        timings.append((time.perf_counter() - start) / benchmark.iterations)
+    return min(timings), statistics.median(timings)
+
+
+def _peak_allocation(benchmark):
+    """Return the peak number of bytes allocated during one call of a benchmark."""
+    tracemalloc.start()
+    try:
+        benchmark.func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _replace_chain_prompt(official_datasheet, generated_datasheet, instructions):
+    """Review prompt built the way it was before PromptTemplate (re-read, chained replaces), as a reference."""
+    with open(REVIEW_PROMPT_PATH, 'r') as f:
+        template = f.read()
+    prompt = template.replace("{{SENSOR_BRAND}}", "Bosch")
+    prompt = prompt.replace("{{SENSOR_MODEL}}", "BME280")
+    prompt = prompt.replace("{{generated_datasheet}}", generated_datasheet)
+    prompt = prompt.replace("{{official_datasheet}}", official_datasheet)
+    return prompt + instructions
+
+
+def build_benchmarks(workdir, seed=0, csv_rows=10_000):
+    """
+    Build the benchmark list.
+
+    Args:
+        workdir (str): Scratch directory for files written by the benchmarks
+        seed (int): Corpus seed
+        csv_rows (int): Number of rows pre-populated in the large review CSV
+
+    Returns:
+        list: Benchmark instances
+    """
+    benchmarks = []
+    corpus = generate_corpus(seed)
+
+    # Response parsing
+    reviewer = ChunkedReviewer(None, {'reviews_base_path': os.path.join(workdir, 'chunked')},
+                               logger=logging.getLogger('benchmarks'))
+    for case, text in corpus.items():
+        iterations = 5 if len(text) > 50_000 else 200
+        benchmarks.append(Benchmark(
+            f"extract_json_from_llm_response[{case}]",
+            lambda text=text: extract_json_from_llm_response(text, "Bosch_BME280", "bench/model"),
+            iterations
+        ))
+        benchmarks.append(Benchmark(
+            f"ChunkedReviewer.extract_json_from_response[{case}]",
+            lambda text=text: reviewer.extract_json_from_response(text),
+            iterations
+        ))
+
+    # Review prompt rendering with two large datasheets
+    official_datasheet, generated_datasheet = generate_datasheets(seed)
+    size = f"2x{len(official_datasheet) // 1000}k"
+    benchmarks.append(Benchmark(
+        f"review prompt[replace chain, {size}]",
+        lambda: _replace_chain_prompt(official_datasheet, generated_datasheet, reviewer._chunk1_instructions()),
+        50
+    ))
+    prompt_reviewer = ChunkedReviewer(None, {'reviews_base_path': os.path.join(workdir, 'chunked'),
+                                             'review_prompt_template_path': REVIEW_PROMPT_PATH},
+                                      logger=logging.getLogger('benchmarks'))
+    benchmarks.append(Benchmark(
+        f"review prompt[PromptTemplate, {size}]",
+        lambda: prompt_reviewer.create_chunk_prompt(1, "Bosch", "BME280", generated_datasheet, official_datasheet),
+        50
+    ))
+    review_template = load_template(REVIEW_PROMPT_PATH)
+    benchmarks.append(Benchmark(
+        f"PromptTemplate.render[{size}]",
+        lambda: review_template.render(SENSOR_BRAND="Bosch", SENSOR_MODEL="BME280",
+                                       generated_datasheet=generated_datasheet,
+                                       official_datasheet=official_datasheet),
+        50
+    ))
+
+    # Pydantic validation
+    for model_name, payload in generate_chunk_payloads(seed).items():
+        model_class = getattr(review_models, model_name)
+        benchmarks.append(Benchmark(
+            f"{model_name}.validate",
+            lambda model_class=model_class, payload=payload: model_class(**payload),
+            2000
+        ))
+
+    # Review logging against a large existing CSV
+    review_logger = ReviewScoreLogger(os.path.join(workdir, 'reviews'))
+    rows = generate_review_rows(csv_rows + 1, seed)
+
+    def log_one(scores, justifications):
+        return review_logger.log_review(
+            "bench", "reviewer", "Bosch", "BME280", "bench", "generator", "found", scores, justifications
+        )
+
+    for scores, justifications in rows[:csv_rows]:
+        log_one(scores, justifications)
+    benchmarks.append(Benchmark(
+        f"ReviewScoreLogger.log_review[{csv_rows} rows]",
+        lambda: log_one(*rows[-1]),
+        50
+    ))
+    benchmarks.append(Benchmark(
+        f"ReviewScoreLogger.get_review_summary[{csv_rows} rows]",
+        lambda: review_logger.get_review_summary("bench", "reviewer"),
+        3
+    ))
+
+    # The same workload against the SQLite review store
+    sqlite_logger = ReviewScoreLogger(os.path.join(workdir, 'reviews_sqlite'), {'review_store': {'type': 'sqlite'}})
+
+    def log_one_sqlite(scores, justifications):
+        return sqlite_logger.log_review(
+            "bench", "reviewer", "Bosch", "BME280", "bench", "generator", "found", scores, justifications
+        )
+
+    for scores, justifications in rows[:csv_rows]:
+        log_one_sqlite(scores, justifications)
+    sqlite_logger.flush()
+    benchmarks.append(Benchmark(
+        f"ReviewScoreLogger.log_review[sqlite, {csv_rows} rows]",
+        lambda: log_one_sqlite(*rows[-1]),
+        50
+    ))
+    benchmarks.append(Benchmark(
+        f"ReviewScoreLogger.get_review_summary[sqlite, {csv_rows} rows]",
+        lambda: sqlite_logger.get_review_summary("bench", "reviewer"),
+        3
+    ))
+    benchmarks.append(Benchmark(
+        f"SQLiteReviewStore.query[sensor, {csv_rows} rows]",
+        lambda: sqlite_logger.store.query(sensor_brand="Bosch", sensor_type="BME280", generator_model="generator"),
+        3
+    ))
+    benchmarks.append(Benchmark(
+        f"load_review_scores[sqlite, {csv_rows} rows]",
+        lambda: load_review_scores(sqlite_logger),
+        3
+    ))
+
+    # Leaderboard statistics over a large set of reviews
+    score_frame, domains_by_sensor = generate_score_frame(LEADERBOARD_REVIEWS, seed)
+    benchmarks.append(Benchmark(
+        f"leaderboard[{LEADERBOARD_REVIEWS // 1000}k reviews]",
+        lambda: build_leaderboard(ReviewScores.from_frame(score_frame, domains_by_sensor)),
+        1
+    ))
+    return benchmarks
+
+
+def _format_seconds(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} µs"
+
+
+def _format_bytes(size):
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MiB"
+    return f"{size / 1024:.1f} KiB"
+
+
+def _current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return ''
+
+
+def load_history(history_path):
+    """
+    Read the benchmark history.
+
+    Returns:
+        dict: benchmark name -> list of best times (oldest first)
+    """
+    history = {}
+    if os.path.exists(history_path):
+        with open(history_path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                history.setdefault(row['Benchmark'], []).append(float(row['BestSeconds']))
+    return history
+
+
+def append_history(history_path, results):
+    """Append this run's results to the history CSV."""
+    os.makedirs(os.path.dirname(history_path) or '.', exist_ok=True)
+    file_exists = os.path.isfile(history_path)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    commit = _current_commit()
+    with open(history_path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(HISTORY_FIELD_NAMES)
+        for name, iterations, best, median in results:
+            writer.writerow([timestamp, commit, name, iterations, f"{best:.9f}", f"{median:.9f}"])
+
+
+@click.command()
+@click.option('--history', 'history_path', default='logs/benchmarks.csv', show_default=True,
+              help='CSV file the results are appended to')
+@click.option('--repeat', default=5, show_default=True, help='Timing repeats per benchmark (best is kept)')
+@click.option('--threshold', default=0.2, show_default=True,
+              help='Flag a regression when slower than the recent median by this fraction')
+@click.option('--window', default=5, show_default=True, help='Number of previous runs the median is taken over')
+@click.option('--filter', 'name_filter', default=None, help='Only run benchmarks whose name contains this text')
+@click.option('--csv-rows', default=10_000, show_default=True, help='Rows in the large review CSV')
+@click.option('--seed', default=0, show_default=True, help='Corpus seed')
+@click.option('--no-save', is_flag=True, help='Do not append the results to the history')
+@click.option('--fail-on-regression', is_flag=True, help='Exit with status 1 if any regression is flagged')
+def main(history_path, repeat, threshold, window, name_filter, csv_rows, seed, no_save, fail_on_regression):
+    """Run the benchmark suite and compare against previous runs."""
+    # The parsers log every failed extraction; that is expected for the adversarial inputs
+    logging.disable(logging.CRITICAL)
+    workdir = tempfile.mkdtemp(prefix='benchmarks_')
+    try:
+        benchmarks = build_benchmarks(workdir, seed, csv_rows)
+        if name_filter:
+            benchmarks = [b for b in benchmarks if name_filter in b.name]
+
+        history = load_history(history_path)
+        results = []
+        regressions = []
+
+        table = Table(title="Benchmarks")
+        table.add_column("Benchmark", style="cyan", overflow="fold")
+        table.add_column("Best", justify="right")
+        table.add_column("Median", justify="right")
+        table.add_column("Baseline", justify="right")
+        table.add_column("Change", justify="right")
+        table.add_column("Peak alloc", justify="right")
+
+        for benchmark in benchmarks:
+            best, median = _time(benchmark, repeat)
+            results.append((benchmark.name, benchmark.iterations, best, median))
+
+            previous = history.get(benchmark.name, [])[-window:]
+            baseline_text = change_text = "-"
+            if previous:
+                baseline = statistics.median(previous)
+                change = (best - baseline) / baseline if baseline else 0.0
+                baseline_text = _format_seconds(baseline)
+                change_text = f"{change:+.1%}"
+                if change > threshold:
+                    regressions.append(benchmark.name)
+                    change_text = f"[red]{change_text}[/red]"
+                elif change < -threshold:
+                    change_text = f"[green]{change_text}[/green]"
+            table.add_row(escape(benchmark.name), _format_seconds(best), _format_seconds(median), baseline_text, change_text,
+                          _format_bytes(_peak_allocation(benchmark)))
+
+        console.print(table)
+        if not no_save:
+            append_history(history_path, results)
+            console.print(f"Results appended to {history_path}")
+
+        if regressions:
+            console.print(f"[bold red]{len(regressions)} regression(s) beyond {threshold:.0%}:[/bold red]")
+            for name in regressions:
+                console.print(f"  - {escape(name)}")
+            if fail_on_regression:
+                raise SystemExit(1)
+        else:
+            console.print("[green]No regressions detected.[/green]")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+
+if __name__ == '__main__':
+    main()
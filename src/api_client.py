@@ -10,9 +10,14 @@ from dotenv import load_dotenv
 import google.generativeai as genai
 import time
 import random
-import concurrent.futures
+import threading
 import logging
 
+from src.http_session import get_session, preconnect
+from src.deadline_executor import DeadlineExecutor, DeadlineExceeded
+from src.rate_limiter import parse_retry_after, parse_retry_delay
+from src.utils import estimate_tokens
+
 # Configure basic logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +31,24 @@ load_dotenv()
 # Initialize global rate limiter
 _rate_limiter = None
 
+# Initialize global response cache
+_response_cache = None
+
+# Initialize global circuit breaker registry
+_circuit_breakers = None
+
+# Worker pool shared by all Gemini clients for running blocking SDK calls under a hard deadline
+_gemini_executor = None
+_gemini_executor_lock = threading.Lock()
+
+# Generation parameters used for every Gemini request
+GEMINI_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "max_output_tokens": 8192,
+    "top_p": 0.95,
+    "top_k": 40
+}
+
 def get_rate_limiter(config):
     """Get or create the global rate limiter instance"""
     global _rate_limiter
@@ -35,16 +58,122 @@ def get_rate_limiter(config):
         _rate_limiter = RateLimiter(config)
     return _rate_limiter
 
+def get_response_cache(config):
+    """
+    Get or create the global response cache instance.
+    
+    Returns:
+        ResponseCache or None: The cache, or None if 'response_cache.enabled' is not set
+    """
+    global _response_cache
+    cache_config = config.get('response_cache', {})
+    if not cache_config.get('enabled', False):
+        return None
+    if _response_cache is None:
+        from src.response_cache import ResponseCache
+        ttl_hours = cache_config.get('ttl_hours')
+        max_size_mb = cache_config.get('max_size_mb')
+        _response_cache = ResponseCache(
+            cache_config.get('path', 'cache/responses.sqlite3'),
+            ttl_seconds=ttl_hours * 3600 if ttl_hours else None,
+            max_bytes=int(max_size_mb * 1024 * 1024) if max_size_mb else None,
+            bypass=cache_config.get('bypass', False)
+        )
+    return _response_cache
+
+def get_circuit_breakers(config):
+    """
+    Get or create the global circuit breaker registry.
+    
+    Returns:
+        CircuitBreakerRegistry or None: The registry, or None if 'circuit_breaker.enabled' is false
+    """
+    global _circuit_breakers
+    if not config.get('circuit_breaker', {}).get('enabled', True):
+        return None
+    if _circuit_breakers is None:
+        from src.circuit_breaker import CircuitBreakerRegistry
+        _circuit_breakers = CircuitBreakerRegistry(config)
+    return _circuit_breakers
+
+def discard_cached_response(response):
+    """
+    Drop a response from the response cache after its caller rejected it (e.g. the reply
+    could not be parsed), so the next attempt sends the request again instead of
+    getting the same reply back until the entry expires.
+    
+    Args:
+        response (dict): Response returned by a client's send_request
+        
+    Returns:
+        bool: True if a cache entry was removed
+    """
+    key = response.get("cache_key") if isinstance(response, dict) else None
+    if not key or _response_cache is None:
+        return False
+    removed = _response_cache.delete(key)
+    if removed:
+        logger.info(f"Discarded rejected response from the response cache (key: {key[:12]})")
+    return removed
+
+def is_claude(model):
+    """Return True if the model identifier refers to an Anthropic Claude model."""
+    return 'anthropic' in model.lower() or 'claude' in model.lower()
+
+def build_openrouter_payload(model, prompt, stream=False):
+    """
+    Build the chat completions payload sent to OpenRouter.
+    
+    Args:
+        model (str): Model identifier
+        prompt (str): The prompt text to send
+        stream (bool): Whether to request a streamed (SSE) response
+        
+    Returns:
+        dict: JSON-serialisable request payload
+    """
+    return {
+        "model": model,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        "stream": stream,
+        **({"temperature": 0.1, "top_p": 0.9} if is_claude(model) else {})
+    }
+
+def extract_openrouter_text(response_json):
+    """Extract the generated text from an OpenRouter (non-streamed) response body."""
+    # Handle different response formats
+    if "choices" in response_json and len(response_json["choices"]) > 0:
+        return response_json["choices"][0]["message"]["content"]
+    elif "output" in response_json:
+        return response_json["output"]
+    logger.warning(f"OpenRouter - Unrecognized response structure: {response_json}")
+    return json.dumps(response_json)  # Fallback to raw JSON string
+
 class APIClient:
     """Base interface for API clients."""
     def __init__(self):
         self.rate_limiter = None
+        self.response_cache = None
+        self.circuit_breakers = None
         self.provider_name = None
         
     def set_rate_limiter(self, rate_limiter):
         """Set the rate limiter for this client"""
         self.rate_limiter = rate_limiter
         
+    def set_response_cache(self, response_cache):
+        """Set the response cache for this client"""
+        self.response_cache = response_cache
+        
+    def set_circuit_breakers(self, circuit_breakers):
+        """Set the circuit breaker registry for this client"""
+        self.circuit_breakers = circuit_breakers
+        
     def send_request(self, model, prompt):
         """
         Send a prompt to the specified model.
@@ -61,14 +190,100 @@ class APIClient:
         """
         raise NotImplementedError
         
-    def _apply_rate_limiting(self, model):
-        """Apply rate limiting before making an API request"""
+    def stream_request(self, model, prompt, usage=None):
+        """
+        Stream a prompt's response from the specified model.
+        
+        Args:
+            model (str): Model identifier
+            prompt (str): The prompt text to send
+            usage (dict, optional): Filled with "input_tokens" and "output_tokens" when the stream ends
+            
+        Yields:
+            str: Chunks of the response text as they arrive
+            
+        Raises:
+            Exception: If the API request fails
+        """
+        raise NotImplementedError
+        
+    def get_connection_stats(self):
+        """
+        Get connection-reuse statistics for this client's HTTP session.
+        
+        Returns:
+            dict or None: Reuse counters, or None if the client does not pool connections
+        """
+        return None
+        
+    def _apply_rate_limiting(self, model, prompt=""):
+        """Apply rate limiting before making an API request, charging the prompt's estimated tokens"""
         if self.rate_limiter and self.provider_name:
-            return self.rate_limiter.wait_if_needed(self.provider_name, model)
+            return self.rate_limiter.wait_if_needed(self.provider_name, model, tokens=estimate_tokens(prompt))
         return 0
+        
+    def _record_usage(self, model, prompt, input_tokens=None, output_tokens=None):
+        """Reconcile the estimated token charge with the usage reported by the API"""
+        if self.rate_limiter and self.provider_name:
+            self.rate_limiter.record_usage(self.provider_name, model, estimate_tokens(prompt), input_tokens, output_tokens)
+        
+    def _check_circuit(self, model):
+        """
+        Raise CircuitOpenError instead of sending if the model's circuit is open.
+        
+        Returns:
+            int or None: The half-open probe slot reserved for this attempt; give it to
+                _release_probe in a finally block
+        """
+        if self.circuit_breakers and self.provider_name:
+            return self.circuit_breakers.get(self.provider_name, model).before_request()
+        return None
+        
+    def _release_probe(self, model, probe):
+        """Free the attempt's probe slot if it ended without recording an outcome"""
+        if probe is not None and self.circuit_breakers and self.provider_name:
+            self.circuit_breakers.get(self.provider_name, model).release_probe(probe)
+        
+    def _record_circuit(self, model, success):
+        """Record the outcome of an attempt with the model's circuit breaker"""
+        if self.circuit_breakers and self.provider_name:
+            breaker = self.circuit_breakers.get(self.provider_name, model)
+            if success:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        
+    def _generation_params(self, model):
+        """Generation parameters that affect the response (part of the cache key)"""
+        return {}
+        
+    def _get_cached_response(self, model, prompt):
+        """Return the cached response for this request, or None"""
+        if not self.response_cache:
+            return None
+        key = self.response_cache.make_key(self.provider_name, model, self._generation_params(model), prompt)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            logger.info(f"{self.provider_name} - Response cache hit for {model} (input tokens: {cached['input_tokens']}, output tokens: {cached['output_tokens']})")
+            cached["cached"] = True
+            cached["cache_key"] = key
+        return cached
+        
+    def _store_cached_response(self, model, prompt, result):
+        """Store a successful response in the cache"""
+        if not self.response_cache:
+            return
+        try:
+            key = self.response_cache.make_key(self.provider_name, model, self._generation_params(model), prompt)
+            self.response_cache.put(key, self.provider_name, model, result,
+                                    prompt_sha256=self.response_cache.prompt_sha256(prompt))
+            # Lets a caller that rejects the response discard it (see discard_cached_response)
+            result["cache_key"] = key
+        except Exception as e:
+            logger.warning(f"{self.provider_name} - Failed to store response in cache: {str(e)}")
 
 class OpenRouterClient(APIClient):
-    def __init__(self, api_key, base_url, timeout=120):
+    def __init__(self, api_key, base_url, timeout=120, pool_maxsize=10):
         """
         Initialize the OpenRouter client.
         
@@ -76,6 +291,7 @@ class OpenRouterClient(APIClient):
             api_key (str): API key for OpenRouter
             base_url (str): Base URL for OpenRouter API
             timeout (int): Request timeout in seconds
+            pool_maxsize (int): Maximum number of pooled keep-alive connections
         """
         super().__init__()
         self.provider_name = "openrouter"
@@ -86,7 +302,29 @@ class OpenRouterClient(APIClient):
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
-        logger.info(f"OpenRouterClient initialized with base_url: {base_url}, timeout: {timeout}")
+        # Long-lived session shared by all clients for this base URL, so requests reuse connections
+        self.session = get_session(base_url, pool_maxsize)
+        logger.info(f"OpenRouterClient initialized with base_url: {base_url}, timeout: {timeout}, pool size: {pool_maxsize}")
+    
+    def preconnect(self, connections=1):
+        """
+        Open keep-alive connections to the OpenRouter API ahead of the first request.
+        
+        Args:
+            connections (int): Number of connections to open
+            
+        Returns:
+            int: Number of connections successfully opened
+        """
+        return preconnect(self.session, self.base_url, connections, timeout=min(self.timeout, 10))
+    
+    def get_connection_stats(self):
+        """Get connection-reuse statistics for the shared OpenRouter session."""
+        return self.session.connection_stats.snapshot()
+    
+    def _generation_params(self, model):
+        payload = build_openrouter_payload(model, "")
+        return {k: v for k, v in payload.items() if k not in ("messages", "stream")}
     
     def send_request(self, model, prompt):
         """
@@ -102,41 +340,37 @@ class OpenRouterClient(APIClient):
         Raises:
             Exception: If the API request fails
         """
+        cached = self._get_cached_response(model, prompt)
+        if cached is not None:
+            return cached
+        
         # Apply rate limiting
-        wait_time = self._apply_rate_limiting(model)
+        wait_time = self._apply_rate_limiting(model, prompt)
         if wait_time > 0:
             logger.info(f"OpenRouter - Rate limited: waited {wait_time:.2f}s before sending request for {model}")
         
         endpoint = f"{self.base_url}/chat/completions"
         
-        is_claude_model = 'anthropic' in model.lower() or 'claude' in model.lower()
+        is_claude_model = is_claude(model)
         effective_timeout = self.timeout * 3 if is_claude_model else self.timeout
         
         logger.info(f"OpenRouter - Starting API request to {endpoint} for model: {model}")
         logger.info(f"OpenRouter - Model identified as Claude: {is_claude_model}, using timeout: {effective_timeout}s")
         logger.info(f"OpenRouter - Prompt length: {len(prompt)} characters")
         
-        payload = {
-            "model": model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "stream": False,
-            **({"temperature": 0.1, "top_p": 0.9} if is_claude_model else {})
-        }
+        payload = build_openrouter_payload(model, prompt)
         
         max_retries = 3
         retry_count = 0
         
         while retry_count < max_retries:
+            # Fail fast (even mid-ladder) once the model's circuit has opened
+            probe = self._check_circuit(model)
             try:
                 start_time = time.time()
                 logger.info(f"OpenRouter - Sending request at {datetime.now().isoformat()} (attempt {retry_count+1}/{max_retries})")
                 
-                response = requests.post(
+                response = self.session.post(
                     endpoint,
                     headers=self.headers,
                     data=json.dumps(payload),
@@ -144,55 +378,66 @@ class OpenRouterClient(APIClient):
                 )
                 
                 elapsed_time = time.time() - start_time
-                logger.info(f"OpenRouter - Response received in {elapsed_time:.2f} seconds with status code: {response.status_code}")
+                connection_reused = getattr(response, 'connection_reused', False)
+                logger.info(f"OpenRouter - Response received in {elapsed_time:.2f} seconds with status code: {response.status_code} (connection reused: {connection_reused})")
                 
                 # Handle rate limiting errors (HTTP 429)
                 if response.status_code == 429:
+                    # Throttling is not a sign of a degraded model
+                    self._record_circuit(model, True)
                     retry_count += 1
                     
-                    # Try to extract rate limit information
+                    # Rate limit information comes as HTTP headers, and for upstream
+                    # provider limits also inside the error body's metadata
+                    headers = dict(response.headers)
                     try:
-                        error_data = response.json()
-                        headers = error_data.get("metadata", {}).get("headers", {})
-                        if headers and "X-RateLimit-Limit" in headers:
-                            rpm = int(headers["X-RateLimit-Limit"])
-                            if self.rate_limiter:
-                                self.rate_limiter.update_rate_limit(model, rpm)
-                                logger.info(f"OpenRouter - Updated rate limit for {model} to {rpm} rpm based on API response")
+                        headers.update(response.json().get("error", {}).get("metadata", {}).get("headers", {}) or {})
                     except Exception as e:
                         logger.warning(f"OpenRouter - Error parsing rate limit information: {str(e)}")
+                    suggested_wait = None
+                    if self.rate_limiter:
+                        suggested_wait = self.rate_limiter.record_rate_limited(
+                            self.provider_name, model,
+                            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                            headers=headers
+                        )
                     
-                    # Calculate backoff with jitter
-                    backoff = min(60, (2 ** retry_count) + random.uniform(0, 1))
+                    # Honour the provider's delay if it gave one, otherwise back off with jitter. The inline
+                    # wait is capped; the rate limiter blocks the bucket for the rest of a longer delay
+                    if suggested_wait is not None:
+                        backoff = min(60, suggested_wait) + random.uniform(0, 1)
+                    else:
+                        backoff = min(60, (2 ** retry_count) + random.uniform(0, 1))
                     logger.warning(f"OpenRouter - Rate limit exceeded for {model}. Retrying in {backoff:.2f}s (attempt {retry_count}/{max_retries})")
                     time.sleep(backoff)
+                    self._apply_rate_limiting(model)
                     continue
                 
                 # For other errors, just raise
                 response.raise_for_status()
                 response_json = response.json()
+                self._record_circuit(model, True)
+                if self.rate_limiter:
+                    self.rate_limiter.record_success(self.provider_name, model, headers=response.headers)
                 
-                # Handle different response formats
-                if "choices" in response_json and len(response_json["choices"]) > 0:
-                    text = response_json["choices"][0]["message"]["content"]
-                elif "output" in response_json:
-                    text = response_json["output"]
-                else:
-                    logger.warning(f"OpenRouter - Unrecognized response structure: {response_json}")
-                    text = json.dumps(response_json)  # Fallback to raw JSON string
+                text = extract_openrouter_text(response_json)
                 
                 result = {
                     "text": text,
                     "input_tokens": response_json.get("usage", {}).get("prompt_tokens", 0),
-                    "output_tokens": response_json.get("usage", {}).get("completion_tokens", 0)
+                    "output_tokens": response_json.get("usage", {}).get("completion_tokens", 0),
+                    "connection_reused": connection_reused
                 }
                 
                 logger.info(f"OpenRouter - Request successful. Input tokens: {result['input_tokens']}, Output tokens: {result['output_tokens']}")
+                self._record_usage(model, prompt, result['input_tokens'], result['output_tokens'])
                 logger.info(f"OpenRouter - Response length: {len(result['text'])} characters")
                 
+                self._store_cached_response(model, prompt, result)
                 return result
             
             except requests.exceptions.Timeout:
+                self._record_circuit(model, False)
                 if retry_count < max_retries - 1:
                     retry_count += 1
                     backoff = min(60, (2 ** retry_count) + random.uniform(0, 1))
@@ -202,6 +447,7 @@ class OpenRouterClient(APIClient):
                     logger.error(f"OpenRouter - Request timed out after {effective_timeout} seconds for model {model} (all retries exhausted)")
                     raise Exception(f"API request to OpenRouter timed out after {effective_timeout} seconds. For Claude models, consider increasing the timeout in your config.")
             except requests.exceptions.RequestException as e:
+                self._record_circuit(model, False)
                 if retry_count < max_retries - 1 and (hasattr(e, 'response') and e.response is not None and e.response.status_code >= 500):
                     # Retry on server errors
                     retry_count += 1
@@ -216,6 +462,99 @@ class OpenRouterClient(APIClient):
                     else:
                         logger.error(f"OpenRouter - Request failed: {str(e)}")
                     raise Exception(error_msg)
+            finally:
+                self._release_probe(model, probe)
+
+    def stream_request(self, model, prompt, usage=None):
+        """
+        Stream a response from OpenRouter using server-sent events.
+        
+        Args:
+            model (str): Model identifier
+            prompt (str): The prompt text to send
+            usage (dict, optional): Filled with "input_tokens" and "output_tokens"
+                from the final usage event once the stream has finished
+            
+        Yields:
+            str: Chunks of the response text as they arrive
+            
+        Raises:
+            Exception: If the streaming request fails
+        """
+        wait_time = self._apply_rate_limiting(model, prompt)
+        if wait_time > 0:
+            logger.info(f"OpenRouter - Rate limited: waited {wait_time:.2f}s before streaming request for {model}")
+        
+        endpoint = f"{self.base_url}/chat/completions"
+        effective_timeout = self.timeout * 3 if is_claude(model) else self.timeout
+        payload = build_openrouter_payload(model, prompt, stream=True)
+        # Ask OpenRouter to append token usage to the end of the stream
+        payload["usage"] = {"include": True}
+        
+        # Checked after rate limiting, which may raise before anything is sent
+        probe = self._check_circuit(model)
+        try:
+            start_time = time.time()
+            logger.info(f"OpenRouter - Starting stream request for {model} at {datetime.now().isoformat()}")
+            try:
+                response = self.session.post(
+                    endpoint,
+                    headers=self.headers,
+                    data=json.dumps(payload),
+                    timeout=effective_timeout,
+                    stream=True
+                )
+            except requests.exceptions.RequestException as e:
+                self._record_circuit(model, False)
+                logger.error(f"OpenRouter - Stream request failed: {str(e)}")
+                raise Exception(f"API request failed: {str(e)}")
+            
+            with response:
+                if response.status_code >= 400:
+                    self._record_circuit(model, response.status_code == 429)
+                    logger.error(f"OpenRouter - Stream request failed with status {response.status_code}: {response.text}")
+                    raise Exception(f"API request failed: {response.status_code} Response: {response.text}")
+                
+                # Server-sent events are UTF-8 regardless of the (usually missing) charset
+                response.encoding = 'utf-8'
+                try:
+                    for line in response.iter_lines(decode_unicode=True):
+                        # Skip keep-alive comments (": OPENROUTER PROCESSING") and blank separators
+                        if not line or not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        event = json.loads(data)
+                        if "error" in event:
+                            raise Exception(f"API request failed during streaming: {event['error']}")
+                        if usage is not None and event.get("usage"):
+                            usage["input_tokens"] = event["usage"].get("prompt_tokens", 0)
+                            usage["output_tokens"] = event["usage"].get("completion_tokens", 0)
+                        for choice in event.get("choices", []):
+                            content = choice.get("delta", {}).get("content")
+                            if content:
+                                yield content
+                except requests.exceptions.RequestException as e:
+                    self._record_circuit(model, False)
+                    logger.error(f"OpenRouter - Stream interrupted after {time.time() - start_time:.2f}s: {str(e)}")
+                    raise Exception(f"API request to OpenRouter failed during streaming: {str(e)}")
+            
+            self._record_circuit(model, True)
+            if usage is not None:
+                self._record_usage(model, prompt, usage.get("input_tokens"), usage.get("output_tokens"))
+            logger.info(f"OpenRouter - Streaming request completed in {time.time() - start_time:.2f}s")
+        finally:
+            # A stream that raises outside the handlers above, or is abandoned, records no outcome
+            self._release_probe(model, probe)
+
+def get_gemini_executor():
+    """Get or create the deadline executor shared by all Gemini clients"""
+    global _gemini_executor
+    with _gemini_executor_lock:
+        if _gemini_executor is None:
+            _gemini_executor = DeadlineExecutor(max_workers=16, max_abandoned=32, name="gemini")
+        return _gemini_executor
 
 class GeminiClient(APIClient):
     def __init__(self, api_key, timeout=120):
@@ -235,8 +574,41 @@ class GeminiClient(APIClient):
         
         # Configure the API key globally instead of creating a client instance
         genai.configure(api_key=self.api_key)
+        # GenerativeModel handles, built once per model name
+        self.models = {}
+        self.models_lock = threading.Lock()
         logger.info(f"GeminiClient initialized with timeout: {timeout}")
     
+    def _generation_params(self, model):
+        return GEMINI_GENERATION_CONFIG
+    
+    def _get_model(self, model_name):
+        """Return the cached GenerativeModel for a model name, creating it on first use"""
+        with self.models_lock:
+            gen_model = self.models.get(model_name)
+            if gen_model is None:
+                gen_model = genai.GenerativeModel(model_name)
+                self.models[model_name] = gen_model
+            return gen_model
+    
+    @staticmethod
+    def _token_counts(response, prompt, response_text):
+        """
+        Read token counts from the response's usage metadata, estimating any that are missing.
+        
+        Returns:
+            tuple: (input_tokens, output_tokens)
+        """
+        usage_metadata = getattr(response, "usage_metadata", None)
+        input_tokens = getattr(usage_metadata, "prompt_token_count", 0) or 0
+        output_tokens = getattr(usage_metadata, "candidates_token_count", 0) or 0
+        if not input_tokens:
+            input_tokens = estimate_tokens(prompt)
+            logger.info(f"Gemini - No prompt token count in response; estimated {input_tokens} input tokens")
+        if not output_tokens:
+            output_tokens = estimate_tokens(response_text)
+        return input_tokens, output_tokens
+    
     def send_request(self, model, prompt):
         """
         Send a prompt to the specified Gemini model with retry mechanism.
@@ -251,8 +623,12 @@ class GeminiClient(APIClient):
         Raises:
             Exception: If the API request fails after retries
         """
+        cached = self._get_cached_response(model, prompt)
+        if cached is not None:
+            return cached
+        
         # Apply rate limiting
-        wait_time = self._apply_rate_limiting(model)
+        wait_time = self._apply_rate_limiting(model, prompt)
         if wait_time > 0:
             logger.info(f"Gemini - Rate limited: waited {wait_time:.2f}s before sending request for {model}")
             
@@ -264,55 +640,41 @@ class GeminiClient(APIClient):
         logger.info(f"Gemini - Using model name: {model_name}")
         
         for attempt in range(max_retries):
+            # Fail fast (even mid-ladder) once the model's circuit has opened
+            probe = self._check_circuit(model)
             try:
                 start_time = time.time()
                 logger.info(f"Gemini - Attempt {attempt+1}/{max_retries} at {datetime.now().isoformat()}")
                 
-                # Create a GenerativeModel instance
-                gen_model = genai.GenerativeModel(model_name)
+                gen_model = self._get_model(model_name)
                 
                 # Define generation config using the appropriate structure
-                generation_config = {
-                    "temperature": 0.7,
-                    "max_output_tokens": 8192,
-                    "top_p": 0.95,
-                    "top_k": 40
-                }
+                generation_config = GEMINI_GENERATION_CONFIG
                 
                 # Define request options including SDK-level timeout
                 request_options = {"timeout": self.timeout}
                 
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    logger.info(f"Gemini - Submitting request to thread executor with SDK timeout: {self.timeout}s")
-                    # Use generate_content with the appropriate parameters
-                    future = executor.submit(
-                        gen_model.generate_content, 
+                # Using a slightly longer timeout for the overall operation
+                overall_timeout = self.timeout * 1.1  # 10% buffer
+                logger.info(f"Gemini - Submitting request with SDK timeout: {self.timeout}s, hard deadline: {overall_timeout:.1f}s")
+                try:
+                    # A call that misses the deadline is abandoned at once; its worker is replaced
+                    response = get_gemini_executor().call(
+                        overall_timeout,
+                        gen_model.generate_content,
                         prompt,
                         generation_config=generation_config,
                         request_options=request_options
                     )
-                    
-                    try:
-                        # Using a slightly longer timeout for the overall operation
-                        overall_timeout = self.timeout * 1.1  # 10% buffer
-                        logger.info(f"Gemini - Waiting for response (overall timeout: {overall_timeout:.1f}s)")
-                        response = future.result(timeout=overall_timeout)
-                        elapsed_time = time.time() - start_time
-                        logger.info(f"Gemini - Response received in {elapsed_time:.2f} seconds")
-                    except concurrent.futures.TimeoutError:
-                        logger.error(f"Gemini - Request timed out after {overall_timeout:.1f} seconds for model {model}")
-                        future.cancel()  # Attempt to cancel the background task
-                        raise Exception(f"API request to Gemini timed out after {overall_timeout:.1f} seconds for model {model}")
-                
-                # Count tokens for the prompt if available
-                try:
-                    # Use countTokens method if available
-                    token_count = gen_model.count_tokens(prompt)
-                    input_tokens = token_count.total_tokens
-                    logger.info(f"Gemini - Input tokens counted: {input_tokens}")
-                except Exception as e:
-                    logger.warning(f"Gemini - Failed to count tokens: {str(e)}")
-                    input_tokens = 0
+                    elapsed_time = time.time() - start_time
+                    logger.info(f"Gemini - Response received in {elapsed_time:.2f} seconds")
+                except DeadlineExceeded:
+                    logger.error(f"Gemini - Request timed out after {overall_timeout:.1f} seconds for model {model}")
+                    raise Exception(f"API request to Gemini timed out after {overall_timeout:.1f} seconds for model {model}")
+                
+                self._record_circuit(model, True)
+                if self.rate_limiter:
+                    self.rate_limiter.record_success(self.provider_name, model)
                 
                 # Extract text from response
                 if hasattr(response, 'text'):
@@ -322,42 +684,59 @@ class GeminiClient(APIClient):
                 else:
                     response_text = str(response)
                 
+                # Token counts come with the response; no separate count_tokens round-trip
+                input_tokens, output_tokens = self._token_counts(response, prompt, response_text)
+                
                 # Create result object
                 result = {
                     "text": response_text,
                     "input_tokens": input_tokens,
-                    "output_tokens": getattr(response, "candidates_token_count", 0)
+                    "output_tokens": output_tokens
                 }
                 
                 logger.info(f"Gemini - Request successful. Input tokens: {result['input_tokens']}, Output tokens: {result['output_tokens']}")
+                self._record_usage(model, prompt, result['input_tokens'], result['output_tokens'])
                 logger.info(f"Gemini - Response length: {len(result['text'])} characters")
                 
+                self._store_cached_response(model, prompt, result)
                 return result
                 
             except Exception as e:
                 error_str = str(e).lower()
                 # Handle rate limiting
                 if "rate limit" in error_str or "quota" in error_str or "429" in error_str:
+                    # Throttling is not a sign of a degraded model
+                    self._record_circuit(model, True)
                     # Try to extract rate limit information from error message
+                    suggested_wait = None
                     try:
                         import re
                         # Look for patterns like "limited to X requests per minute"
                         rpm_pattern = r"limited to (\d+) requests? per minute"
                         rpm_match = re.search(rpm_pattern, error_str)
-                        if rpm_match and self.rate_limiter:
-                            rpm = int(rpm_match.group(1))
-                            self.rate_limiter.update_rate_limit(model, rpm)
-                            logger.info(f"Gemini - Updated rate limit for {model} to {rpm} rpm based on error message")
+                        headers = {"X-RateLimit-Limit": rpm_match.group(1)} if rpm_match else None
+                        if self.rate_limiter:
+                            suggested_wait = self.rate_limiter.record_rate_limited(
+                                self.provider_name, model, retry_after=parse_retry_delay(str(e)), headers=headers
+                            )
                     except Exception as ex:
                         logger.warning(f"Gemini - Error parsing rate limit information: {str(ex)}")
                     
-                    # Apply exponential backoff
+                    # Honour the retry delay in the quota error if there is one, otherwise back off exponentially.
+                    # The inline wait is capped; the rate limiter blocks the bucket for the rest of a longer delay
                     if attempt < max_retries - 1:
-                        delay = (2 ** (attempt + 1)) + random.uniform(0, 1)  # More aggressive backoff for rate limits
+                        if suggested_wait is not None:
+                            delay = min(60, suggested_wait) + random.uniform(0, 1)
+                        else:
+                            delay = (2 ** (attempt + 1)) + random.uniform(0, 1)  # More aggressive backoff for rate limits
                         logger.warning(f"Gemini - Rate limit exceeded. Retrying in {delay:.2f} seconds (attempt {attempt+1}/{max_retries})...")
                         time.sleep(delay)
+                        self._apply_rate_limiting(model)
                         continue
                 
+                else:
+                    self._record_circuit(model, False)
+                
                 # Special handling for deadline exceeded errors
                 if "deadline exceeded" in error_str or "deadline_exceeded" in error_str:
                     logger.warning(f"Gemini - API deadline exceeded (attempt {attempt+1}/{max_retries})")
@@ -371,18 +750,31 @@ class GeminiClient(APIClient):
                 delay = (2 ** attempt) + random.uniform(0, 1)  # Increased jitter for better distribution
                 logger.info(f"Gemini - Retrying in {delay:.2f} seconds...")
                 time.sleep(delay)
+            finally:
+                self._release_probe(model, probe)
 
-    def stream_request(self, model, prompt):
+    def stream_request(self, model, prompt, usage=None):
         """
         Stream a request to the Gemini API.
         
         Args:
             model (str): The model identifier to use.
             prompt: The prompt text to send to the model.
+            usage (dict, optional): Filled with "input_tokens" and "output_tokens"
+                once the stream has finished, if the API reports them.
             
         Yields:
             Chunks of the response as they arrive.
+            
+        Raises:
+            Exception: If the streaming request fails
         """
+        wait_time = self._apply_rate_limiting(model, prompt)
+        if wait_time > 0:
+            logger.info(f"Gemini - Rate limited: waited {wait_time:.2f}s before streaming request for {model}")
+        
+        # Checked after rate limiting, which may raise before anything is sent
+        probe = self._check_circuit(model)
         try:
             start_time = time.time()
             logger.info(f"Gemini - Starting stream request at {datetime.now().isoformat()}")
@@ -390,38 +782,47 @@ class GeminiClient(APIClient):
             # Extract model name from full identifier if needed
             model_name = model.split('/')[-1]
             
-            # Create GenerativeModel instance
-            gen_model = genai.GenerativeModel(model_name)
+            gen_model = self._get_model(model_name)
             
             # Configure generation parameters
-            generation_config = {
-                "temperature": 0.7,
-                "max_output_tokens": 8192,
-                "top_p": 0.95,
-                "top_k": 40
-            }
+            generation_config = GEMINI_GENERATION_CONFIG
             
             # Use the streaming interface 
             response = gen_model.generate_content(
                 prompt,
                 generation_config=generation_config,
+                request_options={"timeout": self.timeout},
                 stream=True
             )
             
+            usage_metadata = None
             for chunk in response:
+                usage_metadata = getattr(chunk, 'usage_metadata', None) or usage_metadata
                 if hasattr(chunk, 'text'):
                     yield chunk.text
                 elif hasattr(chunk, 'parts') and chunk.parts:
                     yield chunk.parts[0].text
                 else:
                     yield str(chunk)
+            
+            if usage is not None and usage_metadata is not None:
+                usage["input_tokens"] = getattr(usage_metadata, "prompt_token_count", 0) or 0
+                usage["output_tokens"] = getattr(usage_metadata, "candidates_token_count", 0) or 0
+            if usage_metadata is not None:
+                self._record_usage(model, prompt, getattr(usage_metadata, "prompt_token_count", 0),
+                                   getattr(usage_metadata, "candidates_token_count", 0))
                 
+            self._record_circuit(model, True)
             response_time = time.time() - start_time
             logger.info(f"Gemini streaming request completed in {response_time:.2f}s")
             
         except Exception as e:
+            self._record_circuit(model, False)
             logger.error(f"Error during streaming: {str(e)}")
-            yield f"Error: {str(e)}"
+            raise Exception(f"Streaming request to Gemini failed for model {model}: {str(e)}")
+        finally:
+            # An abandoned stream records no outcome
+            self._release_probe(model, probe)
 
 class APIClientFactory:
     @staticmethod
@@ -452,13 +853,21 @@ class APIClientFactory:
                     raise ValueError("OpenRouter base URL is required")
                     
                 timeout = provider_config.get('timeout', 120)
+                pool_maxsize = provider_config.get('pool_maxsize', 10)
                 logger.info(f"Creating OpenRouterClient with base_url: {provider_config['base_url']}, timeout: {timeout}")
                 
                 client = OpenRouterClient(
                     provider_config['api_key'],
                     provider_config['base_url'],
-                    timeout
+                    timeout,
+                    pool_maxsize
                 )
+                
+                # Optionally warm up the connection pool (true, or the number of connections to open)
+                preconnect_setting = provider_config.get('preconnect', False)
+                if preconnect_setting:
+                    connections = 1 if preconnect_setting is True else int(preconnect_setting)
+                    client.preconnect(connections)
             elif provider_name == "google_gemini":
                 if 'api_key' not in provider_config or not provider_config['api_key']:
                     logger.error("Gemini API key missing or empty in provider_config")
@@ -471,6 +880,23 @@ class APIClientFactory:
                     provider_config['api_key'],
                     timeout
                 )
+            elif provider_name == "replay":
+                # Imported lazily so the replay provider's dependencies are only loaded when used
+                from src.replay_client import ReplayClient
+                
+                metrics_log_path = provider_config.get('metrics_log_path', (config or {}).get('metrics_log_path'))
+                logger.info(f"Creating ReplayClient with recordings: {provider_config.get('recordings_path')}, metrics: {metrics_log_path}")
+                
+                client = ReplayClient(
+                    recordings_path=provider_config.get('recordings_path'),
+                    metrics_log_path=metrics_log_path,
+                    latency=provider_config.get('latency'),
+                    rate_limit_probability=provider_config.get('rate_limit_probability', 0.0),
+                    timeout_probability=provider_config.get('timeout_probability', 0.0),
+                    timeout=provider_config.get('timeout', 120),
+                    time_scale=provider_config.get('time_scale', 1.0),
+                    seed=provider_config.get('seed')
+                )
             else:
                 logger.error(f"Unsupported provider: {provider_name}")
                 raise ValueError(f"Unsupported provider: {provider_name}")
@@ -481,7 +907,72 @@ class APIClientFactory:
                 client.set_rate_limiter(rate_limiter)
                 logger.info(f"Rate limiter configured for {provider_name} client")
                 
+                response_cache = get_response_cache(config)
+                if response_cache:
+                    client.set_response_cache(response_cache)
+                    logger.info(f"Response cache configured for {provider_name} client")
+                
+                circuit_breakers = get_circuit_breakers(config)
+                if circuit_breakers:
+                    client.set_circuit_breakers(circuit_breakers)
+                    logger.info(f"Circuit breakers configured for {provider_name} client")
+                
             return client
         except Exception as e:
             logger.error(f"Error creating API client for provider {provider_name}: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def get_async_client(provider_config, provider_name, config=None):
+        """
+        Factory method to get the asyncio variant of a provider's API client.
+        
+        Args:
+            provider_config (dict): Configuration for the provider
+            provider_name (str): Name of the provider
+            config (dict, optional): Full application config for rate limiting
+            
+        Returns:
+            AsyncAPIClient: Instance of the appropriate asyncio client
+        """
+        # Imported lazily so the blocking clients do not require aiohttp
+        from src.async_api_client import AsyncOpenRouterClient, AsyncGeminiClient
+        
+        logger.info(f"Creating async API client for provider: {provider_name}")
+        
+        if 'api_key' not in provider_config or not provider_config['api_key']:
+            logger.error(f"{provider_name} API key missing or empty in provider_config")
+            raise ValueError(f"API key is required for provider {provider_name}")
+        
+        timeout = provider_config.get('timeout', 120)
+        if provider_name == "openrouter":
+            if 'base_url' not in provider_config or not provider_config['base_url']:
+                logger.error("OpenRouter base_url missing or empty in provider_config")
+                raise ValueError("OpenRouter base URL is required")
+            client = AsyncOpenRouterClient(
+                provider_config['api_key'],
+                provider_config['base_url'],
+                timeout,
+                provider_config.get('async_pool_maxsize', 100)
+            )
+        elif provider_name == "google_gemini":
+            client = AsyncGeminiClient(provider_config['api_key'], timeout)
+        else:
+            logger.error(f"Unsupported provider: {provider_name}")
+            raise ValueError(f"Unsupported provider: {provider_name}")
+        
+        if config:
+            client.set_rate_limiter(get_rate_limiter(config))
+            logger.info(f"Rate limiter configured for async {provider_name} client")
+            
+            response_cache = get_response_cache(config)
+            if response_cache:
+                client.set_response_cache(response_cache)
+                logger.info(f"Response cache configured for async {provider_name} client")
+            
+            circuit_breakers = get_circuit_breakers(config)
+            if circuit_breakers:
+                client.set_circuit_breakers(circuit_breakers)
+                logger.info(f"Circuit breakers configured for async {provider_name} client")
+        
+        return client
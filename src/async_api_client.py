@@ -0,0 +1,602 @@
+"""
+Asyncio API clients for communicating with LLM providers.
+
+These mirror the blocking clients in src/api_client.py, but every request is a
+coroutine so hundreds of requests can be in flight on a single event loop.
+The shared RateLimiter and ResponseCache do blocking I/O (SQLite, JSON files),
+so they are called through asyncio.to_thread and never stall the loop.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from datetime import datetime
+
+import aiohttp
+import google.generativeai as genai
+
+from src.api_client import (
+    GEMINI_GENERATION_CONFIG,
+    build_openrouter_payload,
+    extract_openrouter_text,
+    is_claude,
+)
+from src.rate_limiter import parse_retry_after, parse_retry_delay
+from src.utils import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAPIClient:
+    """Base interface for asyncio API clients."""
+    def __init__(self):
+        self.rate_limiter = None
+        self.response_cache = None
+        self.circuit_breakers = None
+        self.provider_name = None
+
+    def set_rate_limiter(self, rate_limiter):
+        """Set the rate limiter for this client"""
+        self.rate_limiter = rate_limiter
+
+    def set_response_cache(self, response_cache):
+        """Set the response cache for this client"""
+        self.response_cache = response_cache
+
+    def set_circuit_breakers(self, circuit_breakers):
+        """Set the circuit breaker registry for this client"""
+        self.circuit_breakers = circuit_breakers
+
+    async def send_request(self, model, prompt):
+        """
+        Send a prompt to the specified model.
+
+        Args:
+            model (str): Model identifier
+            prompt (str): The prompt text to send
+
+        Returns:
+            dict: Response data including text and token counts
+
+        Raises:
+            Exception: If the API request fails
+        """
+        raise NotImplementedError
+
+    async def stream_request(self, model, prompt, usage=None):
+        """
+        Stream a prompt's response from the specified model.
+
+        Args:
+            model (str): Model identifier
+            prompt (str): The prompt text to send
+            usage (dict, optional): Filled with "input_tokens" and "output_tokens" when the stream ends
+
+        Yields:
+            str: Chunks of the response text as they arrive
+        """
+        raise NotImplementedError
+        yield  # pragma: no cover - makes this an async generator
+
+    async def aclose(self):
+        """Release any network resources held by the client."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def _apply_rate_limiting(self, model, prompt=""):
+        """Apply rate limiting before making an API request without blocking the event loop"""
+        if self.rate_limiter and self.provider_name:
+            wait_time = await asyncio.to_thread(
+                self.rate_limiter.reserve, self.provider_name, model, tokens=estimate_tokens(prompt)
+            )
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+            return wait_time
+        return 0
+
+    async def _record_usage(self, model, prompt, input_tokens=None, output_tokens=None):
+        """Reconcile the estimated token charge with the usage reported by the API"""
+        if self.rate_limiter and self.provider_name:
+            await asyncio.to_thread(
+                self.rate_limiter.record_usage, self.provider_name, model, estimate_tokens(prompt), input_tokens, output_tokens
+            )
+
+    async def _record_success(self, model, headers=None):
+        """Let the rate limiter adapt to a successful request"""
+        if self.rate_limiter and self.provider_name:
+            await asyncio.to_thread(self.rate_limiter.record_success, self.provider_name, model, headers=headers)
+
+    async def _record_rate_limited(self, model, retry_after=None, headers=None):
+        """Let the rate limiter adapt to a 429 and return the delay it suggests, or None"""
+        if self.rate_limiter and self.provider_name:
+            return await asyncio.to_thread(
+                self.rate_limiter.record_rate_limited, self.provider_name, model, retry_after=retry_after, headers=headers
+            )
+        return None
+
+    def _check_circuit(self, model):
+        """
+        Raise CircuitOpenError instead of sending if the model's circuit is open.
+
+        Returns:
+            int or None: The half-open probe slot reserved for this attempt; give it to
+                _release_probe in a finally block
+        """
+        if self.circuit_breakers and self.provider_name:
+            return self.circuit_breakers.get(self.provider_name, model).before_request()
+        return None
+
+    def _release_probe(self, model, probe):
+        """Free the attempt's probe slot if it ended without recording an outcome"""
+        if probe is not None and self.circuit_breakers and self.provider_name:
+            self.circuit_breakers.get(self.provider_name, model).release_probe(probe)
+
+    def _record_circuit(self, model, success):
+        """Record the outcome of an attempt with the model's circuit breaker"""
+        if self.circuit_breakers and self.provider_name:
+            breaker = self.circuit_breakers.get(self.provider_name, model)
+            if success:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+
+    def _generation_params(self, model):
+        """Generation parameters that affect the response (part of the cache key)"""
+        return {}
+
+    async def _get_cached_response(self, model, prompt):
+        """Return the cached response for this request, or None"""
+        if not self.response_cache:
+            return None
+        key = self.response_cache.make_key(self.provider_name, model, self._generation_params(model), prompt)
+        cached = await asyncio.to_thread(self.response_cache.get, key)
+        if cached is not None:
+            logger.info(f"{self.provider_name} (async) - Response cache hit for {model} (input tokens: {cached['input_tokens']}, output tokens: {cached['output_tokens']})")
+            cached["cached"] = True
+            cached["cache_key"] = key
+        return cached
+
+    async def _store_cached_response(self, model, prompt, result):
+        """Store a successful response in the cache"""
+        if not self.response_cache:
+            return
+        try:
+            key = self.response_cache.make_key(self.provider_name, model, self._generation_params(model), prompt)
+            await asyncio.to_thread(
+                self.response_cache.put, key, self.provider_name, model, result,
+                prompt_sha256=self.response_cache.prompt_sha256(prompt)
+            )
+            result["cache_key"] = key
+        except Exception as e:
+            logger.warning(f"{self.provider_name} (async) - Failed to store response in cache: {str(e)}")
+
+
+class AsyncOpenRouterClient(AsyncAPIClient):
+    def __init__(self, api_key, base_url, timeout=120, pool_maxsize=100):
+        """
+        Initialize the asyncio OpenRouter client.
+
+        Args:
+            api_key (str): API key for OpenRouter
+            base_url (str): Base URL for OpenRouter API
+            timeout (int): Request timeout in seconds
+            pool_maxsize (int): Maximum number of simultaneous connections
+        """
+        super().__init__()
+        self.provider_name = "openrouter"
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        # Created lazily so it is bound to the event loop that actually runs the requests
+        self._session = None
+        logger.info(f"AsyncOpenRouterClient initialized with base_url: {base_url}, timeout: {timeout}")
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize)
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self._session
+
+    async def aclose(self):
+        """Close the underlying aiohttp session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def _effective_timeout(self, model):
+        return self.timeout * 3 if is_claude(model) else self.timeout
+
+    def _generation_params(self, model):
+        payload = build_openrouter_payload(model, "")
+        return {k: v for k, v in payload.items() if k not in ("messages", "stream")}
+
+    async def send_request(self, model, prompt):
+        """
+        Send a prompt to the specified model via OpenRouter API.
+
+        Args:
+            model (str): Model identifier (e.g., "openai/gpt-4")
+            prompt (str): The prompt text to send
+
+        Returns:
+            dict: Response data including text and token counts
+
+        Raises:
+            Exception: If the API request fails
+        """
+        cached = await self._get_cached_response(model, prompt)
+        if cached is not None:
+            return cached
+
+        wait_time = await self._apply_rate_limiting(model, prompt)
+        if wait_time > 0:
+            logger.info(f"OpenRouter (async) - Rate limited: waited {wait_time:.2f}s before sending request for {model}")
+
+        endpoint = f"{self.base_url}/chat/completions"
+        effective_timeout = self._effective_timeout(model)
+        payload = build_openrouter_payload(model, prompt)
+        logger.info(f"OpenRouter (async) - Starting API request for model: {model}, prompt length: {len(prompt)} characters")
+
+        max_retries = 3
+        retry_count = 0
+
+        while retry_count < max_retries:
+            # Fail fast (even mid-ladder) once the model's circuit has opened
+            probe = self._check_circuit(model)
+            try:
+                start_time = time.time()
+                logger.info(f"OpenRouter (async) - Sending request at {datetime.now().isoformat()} (attempt {retry_count+1}/{max_retries})")
+
+                async with self._get_session().post(
+                    endpoint,
+                    data=json.dumps(payload),
+                    timeout=aiohttp.ClientTimeout(total=effective_timeout)
+                ) as response:
+                    elapsed_time = time.time() - start_time
+                    logger.info(f"OpenRouter (async) - Response received in {elapsed_time:.2f} seconds with status code: {response.status}")
+
+                    # Handle rate limiting errors (HTTP 429)
+                    if response.status == 429:
+                        # Throttling is not a sign of a degraded model
+                        self._record_circuit(model, True)
+                        retry_count += 1
+                        suggested_wait = await self._record_rate_limited(
+                            model,
+                            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                            headers=response.headers
+                        )
+                        # The inline wait is capped; the rate limiter blocks the bucket for the rest of a longer delay
+                        if suggested_wait is not None:
+                            backoff = min(60, suggested_wait) + random.uniform(0, 1)
+                        else:
+                            backoff = min(60, (2 ** retry_count) + random.uniform(0, 1))
+                        logger.warning(f"OpenRouter (async) - Rate limit exceeded for {model}. Retrying in {backoff:.2f}s (attempt {retry_count}/{max_retries})")
+                        await asyncio.sleep(backoff)
+                        await self._apply_rate_limiting(model)
+                        continue
+
+                    response.raise_for_status()
+                    response_json = await response.json(content_type=None)
+                    self._record_circuit(model, True)
+                    await self._record_success(model, headers=response.headers)
+
+                result = {
+                    "text": extract_openrouter_text(response_json),
+                    "input_tokens": response_json.get("usage", {}).get("prompt_tokens", 0),
+                    "output_tokens": response_json.get("usage", {}).get("completion_tokens", 0)
+                }
+                logger.info(f"OpenRouter (async) - Request successful. Input tokens: {result['input_tokens']}, Output tokens: {result['output_tokens']}")
+                await self._record_usage(model, prompt, result['input_tokens'], result['output_tokens'])
+                await self._store_cached_response(model, prompt, result)
+                return result
+
+            except asyncio.TimeoutError:
+                self._record_circuit(model, False)
+                if retry_count < max_retries - 1:
+                    retry_count += 1
+                    backoff = min(60, (2 ** retry_count) + random.uniform(0, 1))
+                    logger.warning(f"OpenRouter (async) - Request timed out. Retrying in {backoff:.2f}s (attempt {retry_count}/{max_retries})")
+                    await asyncio.sleep(backoff)
+                else:
+                    logger.error(f"OpenRouter (async) - Request timed out after {effective_timeout} seconds for model {model} (all retries exhausted)")
+                    raise Exception(f"API request to OpenRouter timed out after {effective_timeout} seconds. For Claude models, consider increasing the timeout in your config.")
+            except aiohttp.ClientResponseError as e:
+                self._record_circuit(model, False)
+                if retry_count < max_retries - 1 and e.status >= 500:
+                    # Retry on server errors
+                    retry_count += 1
+                    backoff = min(60, (2 ** retry_count) + random.uniform(0, 1))
+                    logger.warning(f"OpenRouter (async) - Server error {e.status}. Retrying in {backoff:.2f}s (attempt {retry_count}/{max_retries})")
+                    await asyncio.sleep(backoff)
+                else:
+                    logger.error(f"OpenRouter (async) - Request failed with status {e.status}: {e.message}")
+                    raise Exception(f"API request failed: {e.status} {e.message}")
+            except aiohttp.ClientError as e:
+                self._record_circuit(model, False)
+                logger.error(f"OpenRouter (async) - Request failed: {str(e)}")
+                raise Exception(f"API request failed: {str(e)}")
+            finally:
+                self._release_probe(model, probe)
+
+        raise Exception(f"API request to OpenRouter failed: rate limit exceeded for {model} after {max_retries} attempts")
+
+    async def stream_request(self, model, prompt, usage=None):
+        """
+        Stream a response from OpenRouter using server-sent events.
+
+        A 429 received before the stream starts is retried like in send_request;
+        once chunks have been yielded, failures are raised.
+
+        Args:
+            model (str): Model identifier
+            prompt (str): The prompt text to send
+            usage (dict, optional): Filled with "input_tokens" and "output_tokens"
+                from the final usage event once the stream has finished
+
+        Yields:
+            str: Chunks of the response text as they arrive
+
+        Raises:
+            Exception: If the streaming request fails
+        """
+        await self._apply_rate_limiting(model, prompt)
+        endpoint = f"{self.base_url}/chat/completions"
+        payload = build_openrouter_payload(model, prompt, stream=True)
+        # Ask OpenRouter to append token usage to the end of the stream
+        payload["usage"] = {"include": True}
+        reported = {}
+        start_time = time.time()
+        logger.info(f"OpenRouter (async) - Starting stream request for {model} at {datetime.now().isoformat()}")
+
+        max_retries = 3
+        for attempt in range(max_retries):
+            # Checked after rate limiting, which may raise before anything is sent
+            probe = self._check_circuit(model)
+            backoff = None
+            try:
+                async with self._get_session().post(
+                    endpoint,
+                    data=json.dumps(payload),
+                    timeout=aiohttp.ClientTimeout(total=self._effective_timeout(model))
+                ) as response:
+                    if response.status == 429:
+                        # Throttling is not a sign of a degraded model
+                        self._record_circuit(model, True)
+                        suggested_wait = await self._record_rate_limited(
+                            model,
+                            retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                            headers=response.headers
+                        )
+                        if attempt == max_retries - 1:
+                            raise Exception(f"API request to OpenRouter failed: rate limit exceeded for {model} after {max_retries} attempts")
+                        # The inline wait is capped; the rate limiter blocks the bucket for the rest of a longer delay
+                        if suggested_wait is not None:
+                            backoff = min(60, suggested_wait) + random.uniform(0, 1)
+                        else:
+                            backoff = min(60, (2 ** (attempt + 1)) + random.uniform(0, 1))
+                        logger.warning(f"OpenRouter (async) - Rate limit exceeded for {model} stream. Retrying in {backoff:.2f}s (attempt {attempt+1}/{max_retries})")
+                    elif response.status >= 400:
+                        self._record_circuit(model, False)
+                        body = await response.text()
+                        raise Exception(f"API request failed: {response.status} Response: {body}")
+                    else:
+                        async for raw_line in response.content:
+                            line = raw_line.decode('utf-8').strip()
+                            # Skip keep-alive comments (": OPENROUTER PROCESSING") and blank separators
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[len("data:"):].strip()
+                            if data == "[DONE]":
+                                break
+                            event = json.loads(data)
+                            if "error" in event:
+                                raise Exception(f"API request failed during streaming: {event['error']}")
+                            if event.get("usage"):
+                                reported["input_tokens"] = event["usage"].get("prompt_tokens", 0)
+                                reported["output_tokens"] = event["usage"].get("completion_tokens", 0)
+                            for choice in event.get("choices", []):
+                                content = choice.get("delta", {}).get("content")
+                                if content:
+                                    yield content
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._record_circuit(model, False)
+                logger.error(f"OpenRouter (async) - Stream failed after {time.time() - start_time:.2f}s: {type(e).__name__} {str(e)}")
+                raise Exception(f"API request to OpenRouter failed during streaming: {type(e).__name__} {str(e)}")
+            finally:
+                # A stream that raises outside the handlers above, or is abandoned, records no outcome
+                self._release_probe(model, probe)
+
+            if backoff is not None:
+                await asyncio.sleep(backoff)
+                await self._apply_rate_limiting(model)
+                continue
+
+            self._record_circuit(model, True)
+            if usage is not None:
+                usage.update(reported)
+            await self._record_usage(model, prompt, reported.get("input_tokens"), reported.get("output_tokens"))
+            logger.info(f"OpenRouter (async) streaming request completed in {time.time() - start_time:.2f}s")
+            return
+
+
+class AsyncGeminiClient(AsyncAPIClient):
+    def __init__(self, api_key, timeout=120):
+        """
+        Initialize the asyncio Gemini client.
+
+        Args:
+            api_key (str): Direct API key for Gemini
+            timeout (int): Request timeout in seconds
+        """
+        super().__init__()
+        self.provider_name = "google_gemini"
+        self.api_key = api_key
+        if not self.api_key:
+            raise Exception("Gemini API key is not provided in configuration")
+        self.timeout = timeout
+        genai.configure(api_key=self.api_key)
+        # GenerativeModel handles, built once per model name (only touched from the event loop)
+        self.models = {}
+        logger.info(f"AsyncGeminiClient initialized with timeout: {timeout}")
+
+    def _generation_params(self, model):
+        return GEMINI_GENERATION_CONFIG
+
+    def _get_model(self, model_name):
+        """Return the cached GenerativeModel for a model name, creating it on first use"""
+        gen_model = self.models.get(model_name)
+        if gen_model is None:
+            gen_model = genai.GenerativeModel(model_name)
+            self.models[model_name] = gen_model
+        return gen_model
+
+    async def send_request(self, model, prompt):
+        """
+        Send a prompt to the specified Gemini model with retry mechanism.
+
+        Args:
+            model (str): Model identifier (e.g., "google/gemini-2.5-pro-exp-03-25")
+            prompt (str): The prompt text to send
+
+        Returns:
+            dict: Response data including text and token counts
+
+        Raises:
+            Exception: If the API request fails after retries
+        """
+        cached = await self._get_cached_response(model, prompt)
+        if cached is not None:
+            return cached
+
+        wait_time = await self._apply_rate_limiting(model, prompt)
+        if wait_time > 0:
+            logger.info(f"Gemini (async) - Rate limited: waited {wait_time:.2f}s before sending request for {model}")
+
+        max_retries = 3
+        gen_model = self._get_model(model.split('/')[-1])
+        logger.info(f"Gemini (async) - Starting API request for model: {model}, prompt length: {len(prompt)} characters")
+
+        for attempt in range(max_retries):
+            # Fail fast (even mid-ladder) once the model's circuit has opened
+            probe = self._check_circuit(model)
+            try:
+                start_time = time.time()
+                # asyncio.wait_for cancels the coroutine on timeout, so nothing is left running
+                response = await asyncio.wait_for(
+                    gen_model.generate_content_async(
+                        prompt,
+                        generation_config=GEMINI_GENERATION_CONFIG,
+                        request_options={"timeout": self.timeout}
+                    ),
+                    timeout=self.timeout * 1.1
+                )
+                logger.info(f"Gemini (async) - Response received in {time.time() - start_time:.2f} seconds")
+
+                self._record_circuit(model, True)
+                await self._record_success(model)
+                usage = getattr(response, "usage_metadata", None)
+                result = {
+                    "text": response.text if hasattr(response, 'text') else str(response),
+                    "input_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+                    "output_tokens": getattr(usage, "candidates_token_count", 0) or 0
+                }
+                logger.info(f"Gemini (async) - Request successful. Input tokens: {result['input_tokens']}, Output tokens: {result['output_tokens']}")
+                await self._record_usage(model, prompt, result['input_tokens'], result['output_tokens'])
+                await self._store_cached_response(model, prompt, result)
+                return result
+
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    e = Exception(f"API request to Gemini timed out after {self.timeout * 1.1:.1f} seconds for model {model}")
+                error_str = str(e).lower()
+                rate_limited = "rate limit" in error_str or "quota" in error_str or "429" in error_str
+                # Throttling is not a sign of a degraded model
+                self._record_circuit(model, rate_limited)
+                suggested_wait = None
+                if rate_limited:
+                    suggested_wait = await self._record_rate_limited(model, retry_after=parse_retry_delay(str(e)))
+                logger.error(f"Gemini (async) - API request failed (attempt {attempt+1}/{max_retries}): {type(e).__name__} - {str(e)} for model {model}")
+                if attempt == max_retries - 1:
+                    raise Exception(f"API request to Gemini failed after {max_retries} attempts: {str(e)}")
+
+                if rate_limited:
+                    # The inline wait is capped; the rate limiter blocks the bucket for the rest of a longer delay
+                    if suggested_wait is not None:
+                        delay = min(60, suggested_wait) + random.uniform(0, 1)
+                    else:
+                        delay = (2 ** (attempt + 1)) + random.uniform(0, 1)  # More aggressive backoff for rate limits
+                else:
+                    delay = (2 ** attempt) + random.uniform(0, 1)
+                logger.info(f"Gemini (async) - Retrying in {delay:.2f} seconds...")
+                await asyncio.sleep(delay)
+                if rate_limited:
+                    await self._apply_rate_limiting(model)
+            finally:
+                self._release_probe(model, probe)
+
+    async def stream_request(self, model, prompt, usage=None):
+        """
+        Stream a request to the Gemini API.
+
+        Args:
+            model (str): The model identifier to use.
+            prompt (str): The prompt text to send to the model.
+            usage (dict, optional): Filled with "input_tokens" and "output_tokens"
+                once the stream has finished, if the API reports them.
+
+        Yields:
+            str: Chunks of the response text as they arrive.
+
+        Raises:
+            Exception: If the streaming request fails
+        """
+        await self._apply_rate_limiting(model, prompt)
+        start_time = time.time()
+        gen_model = self._get_model(model.split('/')[-1])
+        usage_metadata = None
+        # Checked after rate limiting, which may raise before anything is sent
+        probe = self._check_circuit(model)
+        try:
+            response = await gen_model.generate_content_async(
+                prompt,
+                generation_config=GEMINI_GENERATION_CONFIG,
+                request_options={"timeout": self.timeout},
+                stream=True
+            )
+            async for chunk in response:
+                usage_metadata = getattr(chunk, 'usage_metadata', None) or usage_metadata
+                if hasattr(chunk, 'text'):
+                    yield chunk.text
+                elif hasattr(chunk, 'parts') and chunk.parts:
+                    yield chunk.parts[0].text
+        except Exception as e:
+            error_str = str(e).lower()
+            rate_limited = "rate limit" in error_str or "quota" in error_str or "429" in error_str
+            # Throttling is not a sign of a degraded model
+            self._record_circuit(model, rate_limited)
+            if rate_limited:
+                await self._record_rate_limited(model, retry_after=parse_retry_delay(str(e)))
+            logger.error(f"Gemini (async) - Error during streaming: {str(e)}")
+            raise Exception(f"Streaming request to Gemini failed for model {model}: {str(e)}")
+        finally:
+            # An abandoned stream records no outcome
+            self._release_probe(model, probe)
+
+        self._record_circuit(model, True)
+        input_tokens = getattr(usage_metadata, "prompt_token_count", 0) or None
+        output_tokens = getattr(usage_metadata, "candidates_token_count", 0) or None
+        if usage is not None and usage_metadata is not None:
+            usage["input_tokens"] = input_tokens or 0
+            usage["output_tokens"] = output_tokens or 0
+        await self._record_usage(model, prompt, input_tokens, output_tokens)
+        logger.info(f"Gemini (async) streaming request completed in {time.time() - start_time:.2f}s")
@@ -1,12 +1,31 @@
 import os
 import json
+import hashlib
 import logging
-import time
 import traceback
+import concurrent.futures
 from pathlib import Path
 
 from pydantic import ValidationError
 from src.review_models import ReviewChunk1, ReviewChunk2, ReviewChunk3, CompleteReview
+from src.prompt_template import load_template
+from src.datasheet_index import get_datasheet_index, datasheet_roots
+from src.content_cache import get_content_cache
+from src.review_logger import ReviewIndex
+from src.api_client import discard_cached_response
+
+CHUNK_MODELS = {1: ReviewChunk1, 2: ReviewChunk2, 3: ReviewChunk3}
+
+REPAIR_INSTRUCTIONS = """
+
+# CORRECTION REQUIRED
+Your previous response to this request could not be used: {error}
+Your previous response was:
+
+{previous_response}
+
+Return ONLY the corrected, complete and valid JSON in the exact structure requested above.
+"""
 
 class ChunkedReviewer:
     def __init__(self, review_client, config, logger=None):
@@ -18,15 +37,19 @@ class ChunkedReviewer:
         # Get and validate path configuration
         self.base_prompt_path = config.get('review_prompt_template_path')
         self.reviews_path = config.get('reviews_base_path', 'results/reviews/')
+        # Validated chunks are kept here until their review is complete, so reruns only redo missing chunks
+        self.partial_path = os.path.join(self.reviews_path, 'partial')
+        # Attempts per chunk; attempts after a malformed response use a repair prompt
+        self.chunk_max_attempts = max(1, int(config.get('chunk_max_attempts', 3)))
+        # Compiled chunk templates: chunk number -> (base template, base + chunk instructions)
+        self.chunk_templates = {}
         
-        # Try multiple potential paths for official datasheets
+        # Official datasheets are found through the shared index over all datasheet roots
         self.official_datasheets_path = config.get('official_datasheets_path', 'data/official_datasheets/')
-        self.alternate_paths = [
-            'datasheet/',               # Root datasheet folder
-            'data/official_datasheets/', # Config specified path
-            'data/datasheets/',         # Another common location
-            'datasheets/'               # Another possibility
-        ]
+        self.datasheet_index = get_datasheet_index(datasheet_roots(config))
+        self.content_cache = get_content_cache(config)
+        # Completed reviews keyed by reviewer and datasheet content hashes, so reruns skip unchanged files
+        self.review_index = ReviewIndex(os.path.join(self.reviews_path, 'chunked_review_index.jsonl'))
         
         # Ensure directories exist
         os.makedirs(self.reviews_path, exist_ok=True)
@@ -35,29 +58,18 @@ class ChunkedReviewer:
         self.logger.info(f"ChunkedReviewer initialized with:")
         self.logger.info(f"  - Prompt template: {self.base_prompt_path}")
         self.logger.info(f"  - Reviews output: {self.reviews_path}")
-        self.logger.info(f"  - Primary datasheets path: {self.official_datasheets_path}")
-        self.logger.info(f"  - Will check alternate paths if needed: {self.alternate_paths}")
+        self.logger.info(f"  - Official datasheet roots: {self.datasheet_index.roots}")
     
     def create_chunk_prompt(self, chunk_num, sensor_brand, sensor_model, generated_datasheet, official_datasheet):
         """Create a prompt for a specific chunk of the review"""
-        # Read base prompt
         try:
-            with open(self.base_prompt_path, 'r') as f:
-                template = f.read()
-                
-            # Replace general placeholders
-            prompt = template.replace("{{SENSOR_BRAND}}", sensor_brand)
-            prompt = prompt.replace("{{SENSOR_MODEL}}", sensor_model)
-            prompt = prompt.replace("{{generated_datasheet}}", generated_datasheet)
-            prompt = prompt.replace("{{official_datasheet}}", official_datasheet)
-            
-            # Modify for specific chunk
-            if chunk_num == 1:
-                prompt = self._modify_prompt_for_chunk1(prompt)
-            elif chunk_num == 2:
-                prompt = self._modify_prompt_for_chunk2(prompt)
-            elif chunk_num == 3:
-                prompt = self._modify_prompt_for_chunk3(prompt)
+            # Fill all placeholders in one pass over the compiled chunk template
+            prompt = self._chunk_template(chunk_num).render(
+                SENSOR_BRAND=sensor_brand,
+                SENSOR_MODEL=sensor_model,
+                generated_datasheet=generated_datasheet,
+                official_datasheet=official_datasheet
+            )
                 
             self.logger.info(f"Created prompt for chunk {chunk_num}, length: {len(prompt)} characters")
             return prompt
@@ -70,8 +82,18 @@ class ChunkedReviewer:
             self.logger.error(traceback.format_exc())
             raise
     
-    def _modify_prompt_for_chunk1(self, prompt):
-        """Modify prompt to focus on P1-P6 criteria only"""
+    def _chunk_template(self, chunk_num):
+        """Return the review template with the chunk's instructions appended, compiled once per template version"""
+        base = load_template(self.base_prompt_path)
+        cached = self.chunk_templates.get(chunk_num)
+        if cached is None or cached[0] is not base:
+            instructions = {1: self._chunk1_instructions, 2: self._chunk2_instructions, 3: self._chunk3_instructions}[chunk_num]()
+            cached = (base, base.with_suffix(instructions))
+            self.chunk_templates[chunk_num] = cached
+        return cached[1]
+    
+    def _chunk1_instructions(self):
+        """Instructions that focus chunk 1 on P1-P6 criteria only"""
         # Add specific instructions for this chunk
         chunk_instructions = """
 # IMPORTANT: Response Format for CHUNK 1
@@ -99,10 +121,10 @@ Return ONLY valid JSON with this exact structure:
 DO NOT include evaluations for P7-P16 or overall score in this response.
 Keep justifications concise (under 100 characters) to ensure response fits within API limits.
 """
-        return prompt + chunk_instructions
+        return chunk_instructions
     
-    def _modify_prompt_for_chunk2(self, prompt):
-        """Modify prompt to focus on P7-P11 criteria only"""
+    def _chunk2_instructions(self):
+        """Instructions that focus chunk 2 on P7-P11 criteria only"""
         chunk_instructions = """
 # IMPORTANT: Response Format for CHUNK 2
 This is part 2 of 3 of the review. ONLY evaluate criteria P7-P11 (Pin Configuration through Sensor Performance).
@@ -127,10 +149,10 @@ Return ONLY valid JSON with this exact structure:
 DO NOT include evaluations for P1-P6, P12-P16, or overall score in this response.
 Keep justifications concise (under 100 characters) to ensure response fits within API limits.
 """
-        return prompt + chunk_instructions
+        return chunk_instructions
     
-    def _modify_prompt_for_chunk3(self, prompt):
-        """Modify prompt to focus on P12-P16 criteria and overall score"""
+    def _chunk3_instructions(self):
+        """Instructions that focus chunk 3 on P12-P16 criteria and overall score"""
         chunk_instructions = """
 # IMPORTANT: Response Format for CHUNK 3
 This is part 3 of 3 of the review. ONLY evaluate criteria P12-P16 (Communication Protocol through Compliance) and provide an overall score.
@@ -158,7 +180,7 @@ Return ONLY valid JSON with this exact structure:
 DO NOT include evaluations for P1-P11 in this response.
 Keep justifications concise (under 100 characters) to ensure response fits within API limits.
 """
-        return prompt + chunk_instructions
+        return chunk_instructions
         
     def extract_json_from_response(self, response_text):
         """Extract JSON from the LLM response text"""
@@ -191,6 +213,19 @@ Keep justifications concise (under 100 characters) to ensure response fits withi
             
     def process_review_chunk(self, chunk_num, model_id, sensor_brand, sensor_model, prompt):
         """Process a single review chunk"""
+        chunk, _, _ = self._attempt_chunk(chunk_num, model_id, sensor_brand, sensor_model, prompt)
+        return chunk
+    
+    def _attempt_chunk(self, chunk_num, model_id, sensor_brand, sensor_model, prompt):
+        """
+        Send one chunk prompt and validate the answer.
+        
+        Returns:
+            tuple: (chunk, response_text, error) - chunk is None on failure; response_text is None
+                if no response was received
+        """
+        response = None
+        response_text = None
         try:
             self.logger.info(f"Processing {sensor_brand} {sensor_model} review chunk {chunk_num} with model {model_id}")
             
@@ -206,22 +241,101 @@ Keep justifications concise (under 100 characters) to ensure response fits withi
             json_data = self.extract_json_from_response(response_text)
             if not json_data:
                 self.logger.error(f"Failed to extract JSON from chunk {chunk_num}")
-                return None
+                # A rerun must ask the model again rather than get this reply back from the response cache
+                discard_cached_response(response)
+                return None, response_text, "the response did not contain valid JSON"
                 
             # Validate with appropriate Pydantic model
-            if chunk_num == 1:
-                return ReviewChunk1(**json_data)
-            elif chunk_num == 2:
-                return ReviewChunk2(**json_data)
-            elif chunk_num == 3:
-                return ReviewChunk3(**json_data)
+            return CHUNK_MODELS[chunk_num](**json_data), response_text, None
                 
         except ValidationError as e:
             self.logger.error(f"Validation error for chunk {chunk_num}: {e}")
-            return None
+            discard_cached_response(response)
+            return None, response_text, f"the JSON failed validation: {e}"
         except Exception as e:
             self.logger.error(f"Error processing chunk {chunk_num}: {e}")
+            return None, response_text, str(e)
+    
+    def _partial_chunk_path(self, model_id, sensor_brand, sensor_model, generated_datasheet_path, chunk_num):
+        """Return the file a validated chunk of this review is persisted to"""
+        datasheet_stem = Path(generated_datasheet_path).stem
+        return os.path.join(
+            self.partial_path,
+            f"{model_id.replace('/', '_')}_{sensor_brand}_{sensor_model}_{datasheet_stem}_chunk{chunk_num}.json"
+        )
+    
+    def _datasheet_review_path(self, model_id, sensor_brand, sensor_model, generated_datasheet_path):
+        """Return the file the complete review of one generated datasheet is saved to"""
+        datasheet_stem = Path(generated_datasheet_path).stem
+        return os.path.join(
+            self.reviews_path, 'by_datasheet',
+            f"{model_id.replace('/', '_')}_{sensor_brand}_{sensor_model}_{datasheet_stem}_review.json"
+        )
+    
+    def _load_partial_chunk(self, path, chunk_num, prompt_hash):
+        """Return a persisted chunk if it was produced from the same prompt, else None"""
+        if not os.path.exists(path):
             return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('prompt_sha256') != prompt_hash:
+                self.logger.info(f"Ignoring saved chunk {chunk_num} at {path}: the prompt has changed")
+                return None
+            return CHUNK_MODELS[chunk_num](**saved['chunk'])
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable saved chunk {chunk_num} at {path}: {str(e)}")
+            return None
+    
+    def _save_partial_chunk(self, path, chunk, prompt_hash):
+        """Persist a validated chunk (written atomically so an interrupted write is never loaded)"""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'prompt_sha256': prompt_hash, 'chunk': chunk.model_dump()}, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Could not save chunk to {path}: {str(e)}")
+    
+    def review_chunk(self, chunk_num, model_id, sensor_brand, sensor_model, prompt, partial_path):
+        """
+        Get a validated chunk: reuse a persisted one if available, otherwise request it,
+        retrying failures (with a repair prompt after a malformed response) and persisting the result.
+        
+        Args:
+            chunk_num (int): Chunk number (1-3)
+            model_id (str): Reviewer model
+            sensor_brand (str): Sensor brand
+            sensor_model (str): Sensor model
+            prompt (str): The chunk prompt
+            partial_path (str): File the validated chunk is persisted to
+            
+        Returns:
+            ReviewChunk1, ReviewChunk2, ReviewChunk3 or None: The chunk, or None if every attempt failed
+        """
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        chunk = self._load_partial_chunk(partial_path, chunk_num, prompt_hash)
+        if chunk is not None:
+            self.logger.info(f"Reusing saved chunk {chunk_num} from {partial_path}")
+            return chunk
+        
+        attempt_prompt = prompt
+        for attempt in range(1, self.chunk_max_attempts + 1):
+            chunk, response_text, error = self._attempt_chunk(chunk_num, model_id, sensor_brand, sensor_model, attempt_prompt)
+            if chunk is not None:
+                self._save_partial_chunk(partial_path, chunk, prompt_hash)
+                return chunk
+            if attempt == self.chunk_max_attempts:
+                break
+            if response_text is not None:
+                # The model answered but the answer was unusable: ask it to repair the answer
+                self.logger.warning(f"Chunk {chunk_num} attempt {attempt}/{self.chunk_max_attempts} unusable ({error}); retrying with a repair prompt")
+                attempt_prompt = prompt + REPAIR_INSTRUCTIONS.format(error=error, previous_response=response_text[:4000])
+            else:
+                self.logger.warning(f"Chunk {chunk_num} attempt {attempt}/{self.chunk_max_attempts} failed ({error}); retrying")
+                attempt_prompt = prompt
+        return None
     
     def combine_chunks(self, chunk1, chunk2, chunk3):
         """Combine three chunks into a complete review"""
@@ -269,49 +383,37 @@ Keep justifications concise (under 100 characters) to ensure response fits withi
         
         return CompleteReview(**combined_data)
             
+    def _content_hashes(self, sensor_brand, sensor_model, generated_datasheet_path):
+        """Return (generated_sha256, official_sha256); the official hash is '' if there is no official datasheet"""
+        entry = self.datasheet_index.lookup(sensor_brand, sensor_model)
+        official_sha256 = self.content_cache.sha256(entry.path) if entry is not None else ""
+        return self.content_cache.sha256(generated_datasheet_path), official_sha256
+    
+    def already_reviewed(self, model_id, sensor_brand, sensor_model, generated_datasheet_path):
+        """Return the index record if this reviewer already reviewed the current contents of both datasheets, else None"""
+        try:
+            generated_sha256, official_sha256 = self._content_hashes(sensor_brand, sensor_model, generated_datasheet_path)
+        except OSError:
+            return None
+        return self.review_index.get(model_id, generated_sha256, official_sha256)
+    
     def review_sensor(self, model_id, sensor_brand, sensor_model, generated_datasheet_path):
         """Process a complete sensor review by breaking it into chunks"""
         # Read the generated datasheet file
         try:
             self.logger.info(f"Reading generated datasheet from {generated_datasheet_path}")
-            with open(generated_datasheet_path, 'r') as f:
-                generated_datasheet = f.read()
+            generated_datasheet = self.content_cache.read(generated_datasheet_path)
             self.logger.info(f"Successfully read generated datasheet ({len(generated_datasheet)} chars)")
                 
-            # Try to locate and read the official datasheet with different file extensions
-            official_datasheet = None
-            official_datasheet_path = None
-            
-            # Try all possible paths to find the official datasheet
-            for base_path in self.alternate_paths:
-                # Try with .md extension first (most common)
-                potential_path = os.path.join(base_path, f"{sensor_brand}_{sensor_model}.md")
-                self.logger.info(f"Trying to load official datasheet from: {potential_path}")
-                
-                if os.path.exists(potential_path):
-                    self.logger.info(f"Found official datasheet at {potential_path}")
-                    with open(potential_path, 'r') as f:
-                        official_datasheet = f.read()
-                    official_datasheet_path = potential_path
-                    break
-                    
-                # Try with .txt extension as fallback
-                potential_path_txt = os.path.join(base_path, f"{sensor_brand}_{sensor_model}.txt") 
-                if os.path.exists(potential_path_txt):
-                    self.logger.info(f"Found official datasheet at {potential_path_txt}")
-                    with open(potential_path_txt, 'r') as f:
-                        official_datasheet = f.read()
-                    official_datasheet_path = potential_path_txt
-                    break
-            
+            official_datasheet, entry = self.datasheet_index.read(sensor_brand, sensor_model)
             if official_datasheet is None:
                 self.logger.error(f"Official datasheet for {sensor_brand}_{sensor_model} not found in any of the searched paths")
-                self.logger.error(f"Searched paths: {self.alternate_paths}")
-                self.logger.error(f"Tried the following files:")
-                for path in self.alternate_paths:
-                    self.logger.error(f"  - {os.path.join(path, f'{sensor_brand}_{sensor_model}.md')}")
-                    self.logger.error(f"  - {os.path.join(path, f'{sensor_brand}_{sensor_model}.txt')}")
+                self.logger.error(f"Searched paths: {self.datasheet_index.roots}")
                 raise FileNotFoundError(f"Official datasheet for {sensor_brand}_{sensor_model} not found")
+            official_datasheet_path = entry.path
+            # Hashed now, so the index describes the contents that were actually reviewed
+            generated_sha256 = self.content_cache.sha256(generated_datasheet_path)
+            official_sha256 = self.content_cache.sha256(official_datasheet_path)
                 
             self.logger.info(f"Successfully read official datasheet from {official_datasheet_path} ({len(official_datasheet)} chars)")
                 
@@ -320,55 +422,73 @@ Keep justifications concise (under 100 characters) to ensure response fits withi
             self.logger.error(traceback.format_exc())
             return None
             
-        # Process each chunk with delay between to respect rate limits
-        chunks = []
-        for chunk_num in range(1, 4):
-            try:
+        # Process the chunks concurrently; throttling is left to the client's shared rate limiter.
+        # Chunks saved by an earlier, interrupted run are reused instead of being requested again.
+        chunks = {}
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=3, thread_name_prefix="review-chunk")
+        try:
+            futures = {}
+            for chunk_num in range(1, 4):
                 prompt = self.create_chunk_prompt(
                     chunk_num, sensor_brand, sensor_model, 
                     generated_datasheet, official_datasheet
                 )
-                
                 self.logger.info(f"Sending chunk {chunk_num} to LLM model {model_id}")
-                chunk = self.process_review_chunk(
-                    chunk_num, model_id, sensor_brand, sensor_model, prompt
+                future = executor.submit(
+                    self.review_chunk,
+                    chunk_num, model_id, sensor_brand, sensor_model, prompt,
+                    self._partial_chunk_path(model_id, sensor_brand, sensor_model, generated_datasheet_path, chunk_num)
                 )
-                
+                futures[future] = chunk_num
+            
+            # Collect the chunks as they finish
+            for future in concurrent.futures.as_completed(futures):
+                chunk_num = futures[future]
+                chunk = future.result()
                 if not chunk:
+                    # Chunks that did succeed stay saved, so a rerun only requests the missing ones
                     self.logger.error(f"Failed to process chunk {chunk_num}")
                     return None
-                    
                 self.logger.info(f"Successfully processed chunk {chunk_num}")
-                chunks.append(chunk)
-                
-                # Add delay between chunks to respect rate limits
-                if chunk_num < 3:
-                    delay = 30
-                    self.logger.info(f"Waiting {delay} seconds between chunks to respect rate limits")
-                    time.sleep(delay)
-            except Exception as e:
-                self.logger.error(f"Error processing chunk {chunk_num}: {str(e)}")
-                self.logger.error(traceback.format_exc())
-                return None
+                chunks[chunk_num] = chunk
+        except Exception as e:
+            self.logger.error(f"Error processing review chunks: {str(e)}")
+            self.logger.error(traceback.format_exc())
+            return None
+        finally:
+            # Return without waiting for chunks still in flight after a failure; their results are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
                 
         # Combine chunks into complete review
         try:
             self.logger.info(f"Combining {len(chunks)} chunks into complete review")
-            complete_review = self.combine_chunks(chunks[0], chunks[1], chunks[2])
+            complete_review = self.combine_chunks(chunks[1], chunks[2], chunks[3])
             
-            # Save the review
+            # Save the review: the per-sensor file holds the latest review, and a copy named after
+            # the generated datasheet keeps each datasheet's review from being overwritten by the next
             output_path = os.path.join(
                 self.reviews_path,
                 f"{model_id.replace('/', '_')}_{sensor_brand}_{sensor_model}_review.json"
             )
+            datasheet_output_path = self._datasheet_review_path(model_id, sensor_brand, sensor_model, generated_datasheet_path)
             
-            self.logger.info(f"Saving review to {output_path}")
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            with open(output_path, 'w') as f:
-                f.write(complete_review.model_dump_json(indent=2))
+            self.logger.info(f"Saving review to {output_path} and {datasheet_output_path}")
+            review_json = complete_review.model_dump_json(indent=2)
+            for path in (output_path, datasheet_output_path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as f:
+                    f.write(review_json)
                 
             self.logger.info(f"Successfully saved complete review to {output_path}")
+            self.review_index.add(model_id, generated_sha256, official_sha256,
+                                  generated_filename=os.path.basename(generated_datasheet_path),
+                                  output_path=datasheet_output_path, overall_score=complete_review.overall_score)
+            
+            # The review is complete; its saved chunks are no longer needed
+            for chunk_num in CHUNK_MODELS:
+                partial_file = self._partial_chunk_path(model_id, sensor_brand, sensor_model, generated_datasheet_path, chunk_num)
+                if os.path.exists(partial_file):
+                    os.remove(partial_file)
             return complete_review
             
         except Exception as e:
@@ -0,0 +1,193 @@
+"""
+Circuit breakers that stop sending requests to a degraded provider/model.
+"""
+
+import time
+import threading
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the model's circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of recent attempts for one provider/model.
+
+    closed:    requests flow; once the window holds at least min_requests outcomes
+               and the failure rate reaches the threshold, the circuit opens.
+    open:      requests fail fast with CircuitOpenError for open_seconds.
+    half-open: up to half_open_max_requests probes are let through; a successful
+               probe closes the circuit, a failed one opens it again. A probe that
+               ends without an outcome must give its slot back with release_probe().
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_rate_threshold=0.5, window_size=10, min_requests=4,
+                 open_seconds=60, half_open_max_requests=1):
+        """
+        Initialize a circuit breaker.
+
+        Args:
+            name (str): Name used in log messages (e.g. "openrouter/openai/gpt-4o")
+            failure_rate_threshold (float): Failure rate (0-1) over the window that opens the circuit
+            window_size (int): Number of most recent outcomes considered
+            min_requests (int): Minimum outcomes in the window before the circuit can open
+            open_seconds (float): How long the circuit stays open before probing
+            half_open_max_requests (int): Concurrent probes allowed while half-open
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.half_open_max_requests = half_open_max_requests
+        self.outcomes = deque(maxlen=window_size)
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.probes_in_flight = 0
+        # Counts half-open periods, so a late release_probe() cannot free a later period's slot
+        self.half_open_period = 0
+        self.lock = threading.Lock()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+        logger.warning(f"Circuit for {self.name} opened; failing fast for {self.open_seconds}s")
+
+    def _admit(self):
+        """Return (allowed, probe) where probe identifies a reserved half-open slot, or is None."""
+        with self.lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    return False, None
+                self.state = self.HALF_OPEN
+                self.probes_in_flight = 0
+                self.half_open_period += 1
+                logger.info(f"Circuit for {self.name} half-open; probing")
+            if self.state == self.HALF_OPEN:
+                if self.probes_in_flight >= self.half_open_max_requests:
+                    return False, None
+                self.probes_in_flight += 1
+                return True, self.half_open_period
+            return True, None
+
+    def allow_request(self):
+        """
+        Check whether a request may be sent now (reserving a probe slot when half-open).
+
+        Returns:
+            bool: True if the request may be sent
+        """
+        return self._admit()[0]
+
+    def before_request(self):
+        """
+        Raise if the circuit does not allow a request.
+
+        Returns:
+            int or None: The reserved probe slot when half-open (pass it to release_probe), else None
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or half-open with all probes in flight)
+        """
+        allowed, probe = self._admit()
+        if not allowed:
+            raise CircuitOpenError(f"Circuit for {self.name} is open; not sending request")
+        return probe
+
+    def release_probe(self, probe):
+        """
+        Give back a half-open probe slot whose request ended without recording an outcome
+        (e.g. it raised before sending, or its stream was abandoned).
+
+        Recording an outcome ends the half-open period, so calling this afterwards
+        (e.g. unconditionally in a finally block) does nothing.
+
+        Args:
+            probe (int or None): The value returned by before_request
+        """
+        if probe is None:
+            return
+        with self.lock:
+            if self.state == self.HALF_OPEN and self.half_open_period == probe and self.probes_in_flight > 0:
+                self.probes_in_flight -= 1
+                logger.info(f"Circuit for {self.name}: probe ended without an outcome; slot released")
+
+    def record_success(self):
+        """Record a successful attempt."""
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                logger.info(f"Circuit for {self.name} closed after a successful probe")
+                self.state = self.CLOSED
+                self.outcomes.clear()
+            self.outcomes.append(True)
+
+    def record_failure(self):
+        """Record a failed attempt (timeout, connection error or server error)."""
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self._open()
+                return
+            self.outcomes.append(False)
+            if self.state == self.CLOSED and len(self.outcomes) >= self.min_requests:
+                failure_rate = self.outcomes.count(False) / len(self.outcomes)
+                if failure_rate >= self.failure_rate_threshold:
+                    self._open()
+
+    def is_open(self):
+        """Return True if requests are currently being rejected."""
+        with self.lock:
+            return self.state == self.OPEN and time.monotonic() - self.opened_at < self.open_seconds
+
+
+class CircuitBreakerRegistry:
+    """Creates and holds one CircuitBreaker per (provider, model)."""
+
+    def __init__(self, config):
+        """
+        Initialize the registry from the 'circuit_breaker' config section.
+
+        Args:
+            config (dict): Configuration dictionary
+        """
+        breaker_config = config.get('circuit_breaker', {})
+        self.settings = {
+            'failure_rate_threshold': breaker_config.get('failure_rate_threshold', 0.5),
+            'window_size': breaker_config.get('window_size', 10),
+            'min_requests': breaker_config.get('min_requests', 4),
+            'open_seconds': breaker_config.get('open_seconds', 60),
+            'half_open_max_requests': breaker_config.get('half_open_max_requests', 1)
+        }
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def get(self, provider_name, model_id):
+        """
+        Get the circuit breaker for a provider and model.
+
+        Args:
+            provider_name (str): The provider name
+            model_id (str): The model ID
+
+        Returns:
+            CircuitBreaker: The breaker for this provider/model
+        """
+        key = (provider_name, model_id)
+        with self.lock:
+            breaker = self.breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(f"{provider_name}/{model_id}", **self.settings)
+                self.breakers[key] = breaker
+            return breaker
+
+    def is_open(self, provider_name, model_id):
+        """Return True if the provider/model circuit is currently open."""
+        return self.get(provider_name, model_id).is_open()
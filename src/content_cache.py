@@ -0,0 +1,177 @@
+"""
+Process-wide, size-bounded cache of datasheet file contents.
+
+A review sweep reads the same official datasheet once per generated datasheet,
+reviewer and chunk, and the same generated datasheet once per reviewer. The
+cache keeps the decoded text of recently used files so each file is read from
+disk once; every lookup re-stats the file, and a changed mtime or size reloads
+it. A file rewritten within the file system's timestamp granularity keeps its
+mtime, so entries cached while their mtime was that recent are re-hashed on
+the next lookup instead of being trusted.
+"""
+
+import os
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict, namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Entries whose mtime was this close to the time they were read are verified by hash on the next lookup
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CachedContent = namedtuple('CachedContent', ['content', 'sha256', 'size', 'mtime', 'racy'])
+
+_content_cache = None
+_content_cache_lock = threading.Lock()
+
+
+class ContentCache:
+    """LRU cache of text files keyed by absolute path, bounded by total file size."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes (int): Maximum total size (in bytes on disk) of the cached files
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _load(path, stat):
+        """Read and hash a file. Returns a CachedContent."""
+        with open(path, 'rb') as f:
+            data = f.read()
+        racy = time.time_ns() - stat.st_mtime_ns < RACY_WINDOW_NS
+        return CachedContent(data.decode('utf-8'), hashlib.sha256(data).hexdigest(), stat.st_size, stat.st_mtime_ns, racy)
+
+    def _lookup(self, path):
+        """Return the current CachedContent for a path, loading it on a miss or change."""
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached is not None and cached.size == stat.st_size and cached.mtime == stat.st_mtime_ns and not cached.racy:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return cached
+        loaded = self._load(key, stat)
+        with self.lock:
+            if cached is None:
+                self.misses += 1
+            elif cached.sha256 == loaded.sha256:
+                # Only the timestamp (or a racy entry) needed checking; keep the text already shared by callers
+                loaded = loaded._replace(content=cached.content)
+                self.hits += 1
+            else:
+                self.reloads += 1
+                logger.info(f"Content cache: {path} changed on disk; reloaded")
+            self._store(key, loaded)
+        return loaded
+
+    def _store(self, key, entry):
+        """Insert an entry and evict least recently used ones beyond the limit. Must hold self.lock."""
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.total_bytes -= previous.size
+        if entry.size > self.max_bytes:
+            return
+        self.entries[key] = entry
+        self.total_bytes += entry.size
+        while self.total_bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted.size
+            self.evictions += 1
+
+    def read(self, path):
+        """
+        Read a UTF-8 text file through the cache.
+
+        Args:
+            path (str): Path to the file
+
+        Returns:
+            str: The file contents
+
+        Raises:
+            OSError: If the file does not exist or cannot be read
+            UnicodeDecodeError: If the file is not valid UTF-8
+        """
+        return self._lookup(path).content
+
+    def sha256(self, path):
+        """
+        Get the SHA-256 of a file's contents, reading it through the cache.
+
+        Args:
+            path (str): Path to the file
+
+        Returns:
+            str: Hex digest of the file's bytes
+        """
+        return self._lookup(path).sha256
+
+    def invalidate(self, path=None):
+        """
+        Drop one path, or every entry if path is None.
+
+        Args:
+            path (str, optional): Path to drop
+        """
+        with self.lock:
+            if path is None:
+                self.entries.clear()
+                self.total_bytes = 0
+            else:
+                entry = self.entries.pop(os.path.abspath(path), None)
+                if entry is not None:
+                    self.total_bytes -= entry.size
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: entries, size_bytes, max_bytes, hits, misses, reloads and evictions
+        """
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "size_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "evictions": self.evictions
+            }
+
+
+def get_content_cache(config=None):
+    """
+    Get or create the process-wide content cache.
+
+    Args:
+        config (dict, optional): Configuration dictionary ('content_cache.max_size_mb'); only
+            used when the cache is first created
+
+    Returns:
+        ContentCache: The shared cache
+    """
+    global _content_cache
+    with _content_cache_lock:
+        if _content_cache is None:
+            max_size_mb = (config or {}).get('content_cache', {}).get('max_size_mb')
+            _content_cache = ContentCache(int(max_size_mb * 1024 * 1024) if max_size_mb else DEFAULT_MAX_BYTES)
+        return _content_cache
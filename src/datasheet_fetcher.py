@@ -3,10 +3,11 @@
 Module for loading official sensor datasheets from markdown files.
 """
 
-import os
 import logging
 import pandas as pd
 
+from src.datasheet_index import get_datasheet_index
+
 class OfficialDatasheetLoader:
     """Class to load official sensor datasheets from local markdown files."""
     
@@ -19,6 +20,7 @@ class OfficialDatasheetLoader:
         """
         self.sensors_csv_path = sensors_csv_path
         self.datasheet_directory = datasheet_directory
+        self.index = get_datasheet_index([datasheet_directory])
         self.logger = logging.getLogger(__name__)
     
     def get_official_datasheet(self, brand, sensor_type):
@@ -32,20 +34,15 @@ class OfficialDatasheetLoader:
             tuple: (status, content) where status is a string ('Found', 'Not Found', etc.)
                   and content is the datasheet text if available
         """
-        # Construct expected datasheet filename
-        filename = f"{brand}_{sensor_type}.md"
-        file_path = os.path.join(self.datasheet_directory, filename)
-        
-        # Check if file exists
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                self.logger.info(f"Successfully loaded datasheet from {file_path}")
-                return "Found", content
-            except Exception as e:
-                self.logger.error(f"Error reading datasheet file {file_path}: {str(e)}")
-                return "Error Reading", ""
+        # Resolved through the shared index and content cache instead of probing and re-reading files
+        try:
+            content, entry = self.index.read(brand, sensor_type)
+        except Exception as e:
+            self.logger.error(f"Error reading datasheet for {brand} {sensor_type}: {str(e)}")
+            return "Error Reading", ""
+        if entry is not None:
+            self.logger.info(f"Successfully loaded datasheet from {entry.path}")
+            return "Found", content
         else:
-            self.logger.warning(f"No datasheet file found for {brand} {sensor_type} at {file_path}")
+            self.logger.warning(f"No datasheet file found for {brand} {sensor_type} in {self.datasheet_directory}")
             return "Not Found", ""
\ No newline at end of file
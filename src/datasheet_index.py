@@ -0,0 +1,197 @@
+"""
+In-memory index of the official datasheets on disk.
+
+The datasheet roots are scanned once and every "<Brand>_<Model>.md" (or .txt)
+file is mapped from its normalized brand and model to its path, size and
+mtime. Lookups re-scan only the roots whose directory mtime has changed (a file
+was added, removed or renamed), so a review no longer probes every root and
+extension with os.path.exists.
+"""
+
+import os
+import re
+import threading
+import logging
+from collections import namedtuple
+
+from src.content_cache import get_content_cache
+
+logger = logging.getLogger(__name__)
+
+# Extensions in order of preference when a root holds both
+DATASHEET_EXTENSIONS = ('.md', '.txt')
+
+# Roots searched after the configured ones
+DEFAULT_DATASHEET_ROOTS = ['datasheet/', 'data/official_datasheets/', 'data/datasheets/', 'datasheets/']
+
+DatasheetEntry = namedtuple('DatasheetEntry', ['brand', 'model', 'path', 'size', 'mtime'])
+
+# Shared indexes: tuple of roots -> DatasheetIndex
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def normalize_name(name):
+    """
+    Normalize a brand or model name for lookups (case-insensitive, whitespace collapsed).
+
+    Args:
+        name (str): Brand or model name
+
+    Returns:
+        str: Normalized name
+    """
+    return re.sub(r"\s+", " ", str(name)).strip().casefold()
+
+
+def datasheet_roots(config):
+    """
+    Return the datasheet roots to search, configured ones first.
+
+    Args:
+        config (dict): Configuration dictionary ('datasheet_path', 'official_datasheets_path')
+
+    Returns:
+        list: Root directories in order of preference
+    """
+    roots = []
+    for root in [config.get('datasheet_path'), config.get('official_datasheets_path')] + DEFAULT_DATASHEET_ROOTS:
+        if root and os.path.normpath(root) not in [os.path.normpath(r) for r in roots]:
+            roots.append(root)
+    return roots
+
+
+class DatasheetIndex:
+    """Maps normalized (brand, model) to the preferred datasheet file across several roots."""
+
+    def __init__(self, roots):
+        """
+        Initialize the index and scan the roots.
+
+        Args:
+            roots (list): Datasheet directories in order of preference
+        """
+        self.roots = list(roots)
+        self.lock = threading.Lock()
+        # root -> directory mtime_ns at the last scan (None if the root does not exist)
+        self.root_mtimes = {}
+        # root -> {(brand, model): DatasheetEntry}
+        self.root_entries = {}
+        self.entries = {}
+        self.refresh()
+
+    def _scan_root(self, root):
+        """Return {(brand, model): DatasheetEntry} for one root."""
+        entries = {}
+        try:
+            with os.scandir(root) as it:
+                files = [entry for entry in it if entry.is_file()]
+        except OSError:
+            return entries
+        # Sorted so that .md wins over .txt for the same sensor
+        files.sort(key=lambda entry: DATASHEET_EXTENSIONS.index(os.path.splitext(entry.name)[1])
+                   if os.path.splitext(entry.name)[1] in DATASHEET_EXTENSIONS else len(DATASHEET_EXTENSIONS))
+        for file_entry in files:
+            stem, extension = os.path.splitext(file_entry.name)
+            if extension not in DATASHEET_EXTENSIONS or '_' not in stem:
+                continue
+            brand, model = stem.split('_', 1)
+            key = (normalize_name(brand), normalize_name(model))
+            if key in entries:
+                continue
+            stat = file_entry.stat()
+            entries[key] = DatasheetEntry(brand, model, file_entry.path, stat.st_size, stat.st_mtime_ns)
+        return entries
+
+    def refresh(self):
+        """
+        Re-scan the roots whose directory changed since the last scan.
+
+        Returns:
+            bool: True if any root was re-scanned
+        """
+        with self.lock:
+            changed = False
+            for root in self.roots:
+                try:
+                    mtime = os.stat(root).st_mtime_ns
+                except OSError:
+                    mtime = None
+                if root in self.root_mtimes and self.root_mtimes[root] == mtime:
+                    continue
+                self.root_mtimes[root] = mtime
+                self.root_entries[root] = self._scan_root(root) if mtime is not None else {}
+                changed = True
+            if changed:
+                merged = {}
+                for root in reversed(self.roots):
+                    merged.update(self.root_entries[root])
+                self.entries = merged
+                logger.info(f"Datasheet index: {len(merged)} datasheets in {len(self.roots)} roots")
+            return changed
+
+    def lookup(self, brand, model):
+        """
+        Find the datasheet for a sensor.
+
+        Args:
+            brand (str): Sensor brand
+            model (str): Sensor model/type
+
+        Returns:
+            DatasheetEntry or None: The preferred datasheet, with its current size and mtime
+        """
+        self.refresh()
+        key = (normalize_name(brand), normalize_name(model))
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(entry.path)
+        except OSError:
+            # Removed between scans; the next refresh drops it
+            return None
+        if stat.st_size != entry.size or stat.st_mtime_ns != entry.mtime:
+            entry = entry._replace(size=stat.st_size, mtime=stat.st_mtime_ns)
+            with self.lock:
+                self.entries[key] = entry
+        return entry
+
+    def read(self, brand, model):
+        """
+        Read the datasheet for a sensor through the shared content cache.
+
+        Args:
+            brand (str): Sensor brand
+            model (str): Sensor model/type
+
+        Returns:
+            tuple: (content, entry), or (None, None) if there is no datasheet
+
+        Raises:
+            OSError: If the file exists but cannot be read
+        """
+        entry = self.lookup(brand, model)
+        if entry is None:
+            return None, None
+        return get_content_cache().read(entry.path), entry
+
+
+def get_datasheet_index(roots):
+    """
+    Get (or create) the shared index for a list of roots.
+
+    Args:
+        roots (list): Datasheet directories in order of preference
+
+    Returns:
+        DatasheetIndex: The shared index
+    """
+    key = tuple(os.path.normpath(root) for root in roots)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = DatasheetIndex(roots)
+            _indexes[key] = index
+        return index
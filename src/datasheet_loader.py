@@ -1,21 +1,26 @@
 import os
 import logging
 
+from src.datasheet_index import get_datasheet_index
+
 # Initialize logger for this module
 logger = logging.getLogger(__name__)
 
 class OfficialDatasheetLoader:
     """
-    Loads official datasheets for sensors.
+    Loads official datasheets for sensors through the shared datasheet index.
     """
-    def __init__(self, official_datasheets_dir: str):
+    def __init__(self, official_datasheets_dir: str | list[str]):
         """
         Initializes the OfficialDatasheetLoader.
 
         Args:
-            official_datasheets_dir: The base path to the official datasheets directory.
+            official_datasheets_dir: The base path to the official datasheets directory,
+                or a list of directories searched in order.
         """
         self.official_datasheets_dir = official_datasheets_dir
+        roots = [official_datasheets_dir] if isinstance(official_datasheets_dir, str) else official_datasheets_dir
+        self.index = get_datasheet_index(roots)
 
     def load_datasheet(self, brand: str, sensor_type: str) -> tuple[str | None, str]:
         """
@@ -30,20 +35,16 @@ class OfficialDatasheetLoader:
             and a status message ("Found", "Official Datasheet Not Found",
             "Error Fetching Official Datasheet").
         """
-        filename = f"{brand}_{sensor_type}.md"
-        filepath = os.path.join(self.official_datasheets_dir, filename)
-
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            logger.info(f"Successfully loaded official datasheet: {filepath}")
-            return content, "Found"
-        except FileNotFoundError:
-            logger.warning(f"Official datasheet {filepath} not found.")
-            return None, "Official Datasheet Not Found"
+            content, entry = self.index.read(brand, sensor_type)
         except IOError as e:
-            logger.error(f"IOError while reading official datasheet {filepath}: {e}")
+            logger.error(f"IOError while reading official datasheet for {brand} {sensor_type}: {e}")
             return None, "Error Fetching Official Datasheet"
+        if entry is None:
+            logger.warning(f"Official datasheet for {brand}_{sensor_type} not found in {self.index.roots}.")
+            return None, "Official Datasheet Not Found"
+        logger.info(f"Successfully loaded official datasheet: {entry.path}")
+        return content, "Found"
 
 if __name__ == '__main__':
     # Example Usage (for testing purposes)
@@ -0,0 +1,225 @@
+"""
+Runs blocking calls (e.g. SDK requests) on worker threads with hard deadlines.
+"""
+
+import time
+import queue
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call does not finish before its deadline."""
+
+
+class _Task:
+    """A submitted call and its outcome."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.state = self.QUEUED
+        self.result = None
+        self.exception = None
+        self.abandoned = False
+        self.replaced = False
+        self.done = threading.Event()
+
+
+class DeadlineExecutor:
+    """
+    Thread pool whose calls have hard wall-clock deadlines.
+
+    A Python thread stuck in a blocking call cannot be killed, so when a call
+    misses its deadline the caller gets DeadlineExceeded at once and the stuck
+    worker is abandoned: it no longer counts towards the pool, a replacement
+    worker is started for the next call, and the abandoned thread exits as soon
+    as its call finally returns (its result is discarded). Calls still waiting
+    in the queue when their deadline passes are cancelled and never run.
+
+    At most max_abandoned stuck threads are replaced; beyond that the pool
+    shrinks instead of leaking more threads. Workers are daemon threads, so a
+    hung call never keeps the interpreter from exiting.
+    """
+
+    def __init__(self, max_workers=8, max_abandoned=32, name="deadline"):
+        """
+        Initialize the executor. Worker threads are started on demand.
+
+        Args:
+            max_workers (int): Maximum number of live (non-abandoned) workers
+            max_abandoned (int): Maximum number of abandoned threads that are replaced
+            name (str): Prefix for worker thread names
+        """
+        self.max_workers = max_workers
+        self.max_abandoned = max_abandoned
+        self.name = name
+        self.tasks = queue.Queue()
+        self.lock = threading.Lock()
+        self.workers = 0
+        self.idle = 0
+        self.pending = 0
+        self.abandoned = 0
+        self.completed = 0
+        self.deadlines_exceeded = 0
+        self.thread_counter = 0
+        self.shutting_down = False
+
+    def _spawn_if_needed(self):
+        """Start a worker if queued calls outnumber idle workers. Must hold self.lock."""
+        if self.pending > self.idle and self.workers < self.max_workers:
+            self.workers += 1
+            self.thread_counter += 1
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-{self.thread_counter}", daemon=True)
+            thread.start()
+
+    def _worker(self):
+        while True:
+            with self.lock:
+                self.idle += 1
+            task = self.tasks.get()
+            with self.lock:
+                self.idle -= 1
+                if task is None:
+                    self.workers -= 1
+                    return
+                self.pending -= 1
+                if task.state == _Task.CANCELLED:
+                    continue
+                task.state = _Task.RUNNING
+            try:
+                task.result = task.fn(*task.args, **task.kwargs)
+            except BaseException as e:
+                task.exception = e
+            with self.lock:
+                task.state = _Task.DONE
+                task.done.set()
+                self.completed += 1
+                if task.replaced:
+                    # A replacement took this worker's place while it was stuck
+                    self.abandoned -= 1
+                    logger.info(f"{self.name}: abandoned call finished; its thread exits")
+                    return
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queue a call.
+
+        Returns:
+            _Task: Handle to pass to wait()
+
+        Raises:
+            RuntimeError: If the executor has been shut down
+        """
+        task = _Task(fn, args, kwargs)
+        with self.lock:
+            if self.shutting_down:
+                raise RuntimeError(f"{self.name}: executor has been shut down")
+            self.pending += 1
+            self.tasks.put(task)
+            self._spawn_if_needed()
+        return task
+
+    def wait(self, task, timeout):
+        """
+        Wait for a submitted call, abandoning it if it misses the deadline.
+
+        Args:
+            task (_Task): Handle returned by submit()
+            timeout (float): Seconds to wait
+
+        Returns:
+            The call's return value
+
+        Raises:
+            DeadlineExceeded: If the call did not finish in time
+            Exception: Whatever the call raised
+        """
+        if not task.done.wait(timeout):
+            with self.lock:
+                if task.state != _Task.DONE:
+                    self._abandon(task)
+                    raise DeadlineExceeded(f"Call did not finish within {timeout:.1f}s")
+        if task.exception is not None:
+            raise task.exception
+        return task.result
+
+    def _abandon(self, task):
+        """Give up on a task that missed its deadline. Must hold self.lock."""
+        self.deadlines_exceeded += 1
+        task.abandoned = True
+        if task.state == _Task.QUEUED:
+            task.state = _Task.CANCELLED
+            return
+        if self.abandoned < self.max_abandoned:
+            task.replaced = True
+            self.abandoned += 1
+            self.workers -= 1
+            logger.warning(f"{self.name}: call exceeded its deadline; abandoning its thread "
+                           f"({self.abandoned} abandoned) and starting a replacement")
+            self._spawn_if_needed()
+        else:
+            logger.warning(f"{self.name}: call exceeded its deadline but {self.abandoned} threads are already "
+                           f"abandoned; not replacing it")
+
+    def call(self, timeout, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on a worker and wait at most timeout seconds.
+
+        Args:
+            timeout (float): Hard deadline in seconds, including time spent queued
+            fn (callable): The blocking call
+
+        Returns:
+            The call's return value
+
+        Raises:
+            DeadlineExceeded: If the call did not finish in time
+            Exception: Whatever the call raised
+        """
+        return self.wait(self.submit(fn, *args, **kwargs), timeout)
+
+    def get_stats(self):
+        """
+        Get executor statistics.
+
+        Returns:
+            dict: workers, idle, abandoned, completed and deadlines_exceeded
+        """
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "idle": self.idle,
+                "abandoned": self.abandoned,
+                "completed": self.completed,
+                "deadlines_exceeded": self.deadlines_exceeded
+            }
+
+    def shutdown(self, timeout=None):
+        """
+        Stop the idle and busy workers once their current call is done. Abandoned threads are left to finish.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the workers to exit
+        """
+        with self.lock:
+            self.shutting_down = True
+            workers = self.workers
+        for _ in range(workers):
+            self.tasks.put(None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.lock:
+                if self.workers == 0:
+                    return
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(0.01)
@@ -0,0 +1,87 @@
+"""
+Routes requests away from a model whose circuit breaker is open.
+"""
+
+import logging
+
+from src.api_client import APIClient
+from src.circuit_breaker import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+class FallbackRouter(APIClient):
+    """
+    Wraps the client of a primary model. While the primary model's circuit is
+    open (or opens during a request), requests are sent to the fallback model
+    instead of failing.
+    """
+
+    def __init__(self, primary_client, primary_model, fallback_client, fallback_model, circuit_breakers):
+        """
+        Initialize the router.
+
+        Args:
+            primary_client (APIClient): Client for the primary model
+            primary_model (str): Primary model identifier
+            fallback_client (APIClient): Client for the fallback model
+            fallback_model (str): Fallback model identifier
+            circuit_breakers (CircuitBreakerRegistry): Registry shared with the clients
+        """
+        super().__init__()
+        self.primary_client = primary_client
+        self.primary_model = primary_model
+        self.fallback_client = fallback_client
+        self.fallback_model = fallback_model
+        self.circuit_breakers = circuit_breakers
+        self.provider_name = primary_client.provider_name
+        self.routed = 0
+        logger.info(f"Routing {primary_model} to {fallback_model} while its circuit is open")
+
+    def _send_fallback(self, prompt, reason):
+        logger.warning(f"Circuit for {self.primary_model} is open ({reason}); routing request to {self.fallback_model}")
+        self.routed += 1
+        result = self.fallback_client.send_request(self.fallback_model, prompt)
+        return {**result, "model": self.fallback_model, "provider": self.fallback_client.provider_name}
+
+    def send_request(self, model, prompt):
+        """
+        Send a prompt to the primary model, or to the fallback while the primary's circuit is open.
+
+        Args:
+            model (str): Model identifier; requests for other models than the primary are not routed
+            prompt (str): The prompt text to send
+
+        Returns:
+            dict: Response data including text and token counts. "model" and "provider"
+                name the model that answered.
+
+        Raises:
+            Exception: If the request fails
+        """
+        if model != self.primary_model:
+            return self.primary_client.send_request(model, prompt)
+        if self.circuit_breakers.is_open(self.provider_name, self.primary_model):
+            return self._send_fallback(prompt, "before sending")
+        try:
+            result = self.primary_client.send_request(self.primary_model, prompt)
+        except CircuitOpenError as e:
+            return self._send_fallback(prompt, str(e))
+        except Exception:
+            # The failure that opened the circuit is not retried on the primary either
+            if self.circuit_breakers.is_open(self.provider_name, self.primary_model):
+                return self._send_fallback(prompt, "opened during this request")
+            raise
+        return {**result, "model": self.primary_model, "provider": self.provider_name}
+
+    def stream_request(self, model, prompt, usage=None):
+        """Stream from the primary model, or from the fallback if the primary's circuit is open."""
+        if model == self.primary_model and self.circuit_breakers.is_open(self.provider_name, self.primary_model):
+            logger.warning(f"Circuit for {self.primary_model} is open; streaming from {self.fallback_model}")
+            self.routed += 1
+            return self.fallback_client.stream_request(self.fallback_model, prompt, usage=usage)
+        return self.primary_client.stream_request(model, prompt, usage=usage)
+
+    def get_connection_stats(self):
+        """Get connection-reuse statistics of the primary client."""
+        return self.primary_client.get_connection_stats()
@@ -0,0 +1,176 @@
+"""
+Hedged requests: duplicate slow requests to a fallback model to cut tail latency.
+"""
+
+import time
+import threading
+import logging
+import concurrent.futures
+
+from src.api_client import APIClient
+
+logger = logging.getLogger(__name__)
+
+
+class HedgedClient(APIClient):
+    """
+    Wraps the client of a primary model. When a request to the primary model runs
+    past the latency percentile observed for this client's own requests, a
+    duplicate ("hedge") is sent to the fallback model and whichever answer arrives
+    first is returned. Until min_samples requests have completed, the fixed
+    default_delay_seconds is used instead of the percentile.
+
+    The losing request is abandoned: its result is discarded when it completes
+    (a blocking HTTP call cannot be interrupted once sent). The number of hedges
+    is capped at max_hedge_ratio of the completed primary requests so hedging
+    cannot more than slightly inflate the request rate.
+    """
+
+    def __init__(self, primary_client, primary_model, fallback_client, fallback_model, latency_estimator,
+                 percentile=95, max_hedge_ratio=0.1, min_delay_seconds=1.0, max_workers=8,
+                 min_samples=20, default_delay_seconds=120.0):
+        """
+        Initialize the hedged client.
+
+        Args:
+            primary_client (APIClient): Client for the primary model
+            primary_model (str): Primary model identifier
+            fallback_client (APIClient): Client for the fallback model
+            fallback_model (str): Fallback model identifier
+            latency_estimator (LatencyEstimator): Latencies of the primary model for the requests
+                this client sends (its observations are added as requests complete)
+            percentile (float): Latency percentile after which a hedge is sent
+            max_hedge_ratio (float): Maximum hedges per completed primary request (e.g. 0.1 = at most 10% extra requests)
+            min_delay_seconds (float): Never hedge earlier than this
+            max_workers (int): Threads available for in-flight and abandoned requests
+            min_samples (int): Observed latencies needed before the percentile is trusted
+            default_delay_seconds (float): Hedge delay used until then
+        """
+        super().__init__()
+        self.primary_client = primary_client
+        self.primary_model = primary_model
+        self.fallback_client = fallback_client
+        self.fallback_model = fallback_model
+        self.latency_estimator = latency_estimator
+        self.percentile = percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.min_delay_seconds = min_delay_seconds
+        self.min_samples = min_samples
+        self.default_delay_seconds = default_delay_seconds
+        self.provider_name = primary_client.provider_name
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        logger.info(f"Hedging {primary_model} with {fallback_model} after p{percentile} latency "
+                    f"(max hedge ratio: {max_hedge_ratio})")
+
+    def _timed_primary(self, prompt):
+        start_time = time.monotonic()
+        result = self.primary_client.send_request(self.primary_model, prompt)
+        if not result.get("cached"):
+            self.latency_estimator.observe(self.primary_model, time.monotonic() - start_time)
+        return result
+
+    def _hedge_delay(self):
+        """Seconds to wait for the primary before hedging."""
+        if self.latency_estimator.sample_count(self.primary_model) < self.min_samples:
+            return self.default_delay_seconds
+        delay = self.latency_estimator.percentile(self.primary_model, self.percentile)
+        return max(self.min_delay_seconds, delay)
+
+    def _reserve_hedge(self):
+        # self.requests counts completed requests only, so the current one never pays for its own hedge
+        with self.lock:
+            if self.hedges < self.max_hedge_ratio * self.requests:
+                self.hedges += 1
+                return True
+            return False
+
+    def send_request(self, model, prompt):
+        """
+        Send a prompt, hedging to the fallback model if the primary is slow.
+
+        Args:
+            model (str): Model identifier; requests for other models than the primary are not hedged
+            prompt (str): The prompt text to send
+
+        Returns:
+            dict: Response data including text and token counts. "model" and "provider" name the
+                model that answered and "hedged" is True when the hedge answered first.
+
+        Raises:
+            Exception: If every request that was sent failed
+        """
+        if model != self.primary_model:
+            return self.primary_client.send_request(model, prompt)
+
+        try:
+            return self._send_hedged(prompt)
+        finally:
+            with self.lock:
+                self.requests += 1
+
+    def _send_hedged(self, prompt):
+        """Send a prompt to the primary model, hedging it if it runs past the hedge delay."""
+        primary = self.executor.submit(self._timed_primary, prompt)
+        delay = self._hedge_delay()
+        try:
+            result = primary.result(timeout=delay)
+            return {"model": self.primary_model, "provider": self.provider_name, **result, "hedged": False}
+        except concurrent.futures.TimeoutError:
+            pass
+
+        if not self._reserve_hedge():
+            logger.info(f"Hedge budget exhausted; waiting for {self.primary_model}")
+            result = primary.result()
+            return {"model": self.primary_model, "provider": self.provider_name, **result, "hedged": False}
+
+        logger.info(f"{self.primary_model} still running after its {delay:.1f}s hedge delay; "
+                    f"hedging with {self.fallback_model}")
+        fallback = self.executor.submit(self.fallback_client.send_request, self.fallback_model, prompt)
+        models = {primary: self.primary_model, fallback: self.fallback_model}
+        pending = set(models)
+        last_error = None
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"Hedged request to {models[future]} failed: {str(e)}")
+                    last_error = e
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                hedged = future is fallback
+                if hedged:
+                    with self.lock:
+                        self.hedge_wins += 1
+                    result = {**result, "model": self.fallback_model, "provider": self.fallback_client.provider_name}
+                logger.info(f"Hedged request answered first by {models[future]}")
+                return {"model": self.primary_model, "provider": self.provider_name, **result, "hedged": hedged}
+        raise last_error
+
+    def close(self):
+        """Shut down the worker threads; abandoned requests still in flight finish in the background."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stream_request(self, model, prompt, usage=None):
+        """Stream from the primary client; streamed requests are not hedged."""
+        return self.primary_client.stream_request(model, prompt, usage=usage)
+
+    def get_connection_stats(self):
+        """Get connection-reuse statistics of the primary client."""
+        return self.primary_client.get_connection_stats()
+
+    def get_hedge_stats(self):
+        """
+        Get hedging statistics.
+
+        Returns:
+            dict: requests, hedges and hedge_wins (hedges answered first by the fallback)
+        """
+        with self.lock:
+            return {"requests": self.requests, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
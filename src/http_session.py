@@ -0,0 +1,164 @@
+"""
+Shared keep-alive HTTP sessions with connection-reuse tracking.
+"""
+
+import threading
+import logging
+import concurrent.futures
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# Set to True by the tracking connections whenever a new TCP (+TLS) connection is opened
+# on the current thread; the adapter resets it before each request. preconnect sets
+# warming_up on its worker threads so the warm-up requests are left out of the stats.
+_thread_state = threading.local()
+
+# One session per base URL, shared by every client talking to that provider
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class _TrackingHTTPConnection(HTTPConnection):
+    def connect(self):
+        _thread_state.new_connection = True
+        return super().connect()
+
+
+class _TrackingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _thread_state.new_connection = True
+        return super().connect()
+
+
+class _TrackingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TrackingHTTPConnection
+
+
+class _TrackingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TrackingHTTPSConnection
+
+
+class ConnectionStats:
+    """Thread-safe counters of how many requests reused a pooled connection."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record(self, reused):
+        """Record the outcome of one request."""
+        with self.lock:
+            self.requests += 1
+            if not reused:
+                self.new_connections += 1
+
+    def snapshot(self):
+        """
+        Return the current counters.
+
+        Returns:
+            dict: requests, reused, new_connections and reuse_rate (0-1)
+        """
+        with self.lock:
+            reused = self.requests - self.new_connections
+            return {
+                "requests": self.requests,
+                "reused": reused,
+                "new_connections": self.new_connections,
+                "reuse_rate": reused / self.requests if self.requests else 0.0
+            }
+
+
+class TrackingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that records, per request, whether a pooled connection was reused."""
+
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TrackingHTTPConnectionPool,
+            "https": _TrackingHTTPSConnectionPool
+        }
+
+    def send(self, request, **kwargs):
+        _thread_state.new_connection = False
+        response = super().send(request, **kwargs)
+        response.connection_reused = not _thread_state.new_connection
+        if not getattr(_thread_state, 'warming_up', False):
+            self.stats.record(response.connection_reused)
+        return response
+
+
+def get_session(base_url, pool_maxsize=10):
+    """
+    Get (or create) the shared keep-alive session for a base URL.
+
+    Args:
+        base_url (str): Base URL of the provider API
+        pool_maxsize (int): Maximum number of pooled connections per host
+
+    Returns:
+        requests.Session: Session with a sized, instrumented connection pool.
+            Its reuse statistics are available as ``session.connection_stats``.
+    """
+    with _sessions_lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            session = requests.Session()
+            session.connection_stats = ConnectionStats()
+            adapter = TrackingHTTPAdapter(
+                session.connection_stats,
+                pool_connections=1,
+                pool_maxsize=pool_maxsize
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[base_url] = session
+            logger.info(f"Created shared HTTP session for {base_url} (pool size: {pool_maxsize})")
+        return session
+
+
+def preconnect(session, url, connections=1, timeout=10):
+    """
+    Open connections ahead of time so the first requests skip the TCP+TLS handshake.
+
+    The warm-up requests are not counted in the session's connection stats, so the
+    stats describe only real API requests.
+
+    Args:
+        session (requests.Session): Session whose pool should be warmed
+        url (str): URL to send the warm-up HEAD requests to
+        connections (int): Number of connections to open concurrently
+        timeout (float): Timeout for each warm-up request in seconds
+
+    Returns:
+        int: Number of connections successfully opened
+    """
+    def _warm():
+        # The response body is empty, so the connection goes straight back to the pool
+        _thread_state.warming_up = True
+        try:
+            session.head(url, timeout=timeout)
+        finally:
+            _thread_state.warming_up = False
+
+    opened = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, connections)) as executor:
+        futures = [executor.submit(_warm) for _ in range(max(1, connections))]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+                opened += 1
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Pre-connect to {url} failed: {str(e)}")
+    logger.info(f"Pre-connected {opened}/{len(futures)} connections to {url}")
+    return opened
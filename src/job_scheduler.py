@@ -0,0 +1,206 @@
+"""
+Concurrent job scheduler for fanning out LLM requests across providers and models.
+"""
+
+import time
+import queue
+import asyncio
+import logging
+import threading
+import concurrent.futures
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A single unit of work (one prompt sent to one model)."""
+
+    def __init__(self, key, provider, model_id, payload=None, expected_seconds=None):
+        """
+        Initialize a job.
+
+        Args:
+            key (str): Unique identifier of the job (e.g., "Adafruit_DHT22|openai/gpt-4")
+            provider (str): Provider name used to send the request
+            model_id (str): Model identifier
+            payload (dict, optional): Arbitrary data needed by the worker function
+            expected_seconds (float, optional): Estimated duration, used to order dispatch
+        """
+        self.key = key
+        self.provider = provider
+        self.model_id = model_id
+        self.payload = payload or {}
+        self.expected_seconds = expected_seconds
+
+    def __repr__(self):
+        return f"Job({self.key!r}, provider={self.provider!r}, model={self.model_id!r})"
+
+
+class JobScheduler:
+    """
+    Runs jobs concurrently on a thread pool.
+
+    A job is only dispatched when the rate limiter has a free in-flight slot for
+    its provider and model, so per-provider and per-model concurrency caps are
+    honoured without tying up worker threads. Request pacing (requests per
+    minute) is still applied by the API clients through the same RateLimiter.
+
+    Jobs with an expected duration are dispatched longest-expected-first, so
+    slow models start early instead of finishing last as stragglers.
+
+    run_async() applies the same dispatch rules to coroutine workers (the
+    asyncio API clients), so many requests share one event loop instead of
+    holding a thread each.
+    """
+
+    def __init__(self, rate_limiter=None, max_workers=4, poll_interval=0.5):
+        """
+        Initialize the scheduler.
+
+        Args:
+            rate_limiter (RateLimiter, optional): Shared rate limiter holding the concurrency caps
+            max_workers (int): Maximum number of requests in flight overall
+            poll_interval (float): Seconds to wait between dispatch attempts while jobs are running
+        """
+        self.rate_limiter = rate_limiter
+        self.max_workers = max(1, int(max_workers))
+        self.poll_interval = poll_interval
+
+    def _try_acquire(self, job):
+        if self.rate_limiter is None:
+            return True
+        return self.rate_limiter.try_acquire_slot(job.provider, job.model_id)
+
+    def _release(self, job):
+        if self.rate_limiter is not None:
+            self.rate_limiter.release_slot(job.provider, job.model_id)
+
+    def _run_job(self, worker, job):
+        try:
+            return worker(job)
+        finally:
+            # Free the slot as soon as the request finishes so the dispatcher can reuse it
+            self._release(job)
+
+    def run(self, jobs, worker):
+        """
+        Run the jobs and yield their outcomes as they finish.
+
+        Args:
+            jobs (list): Job instances; ties in expected duration keep their given order
+            worker (callable): Function called with a Job in a worker thread
+
+        Yields:
+            tuple: (job, result, error) where error is the exception raised by the worker, or None
+        """
+        # Longest-expected-first; sorted() is stable, so jobs without estimates keep their order
+        pending = sorted(jobs, key=lambda job: job.expected_seconds or 0, reverse=True)
+        in_flight = {}
+        logger.info(f"Scheduling {len(pending)} jobs with up to {self.max_workers} concurrent workers")
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while pending or in_flight:
+                # Dispatch every pending job that has a free slot, in order
+                for job in list(pending):
+                    if len(in_flight) >= self.max_workers:
+                        break
+                    if self._try_acquire(job):
+                        pending.remove(job)
+                        logger.debug(f"Dispatching {job}")
+                        in_flight[executor.submit(self._run_job, worker, job)] = job
+
+                if not in_flight:
+                    # Nothing could be dispatched; slots are held elsewhere, so wait and retry
+                    time.sleep(self.poll_interval)
+                    continue
+
+                done, _ = concurrent.futures.wait(
+                    in_flight, timeout=self.poll_interval,
+                    return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    job = in_flight.pop(future)
+                    try:
+                        yield job, future.result(), None
+                    except Exception as e:
+                        logger.debug(f"{job} failed: {str(e)}")
+                        yield job, None, e
+        finally:
+            executor.shutdown(wait=not pending and not in_flight, cancel_futures=True)
+
+    def run_async(self, jobs, worker, max_in_flight=None, cleanup=None):
+        """
+        Run the jobs on one asyncio event loop and yield their outcomes as they finish.
+
+        The event loop runs in a background thread, so like run() this is a plain
+        generator and the caller handles each outcome while other requests are in flight.
+
+        Args:
+            jobs (list): Job instances; ties in expected duration keep their given order
+            worker (callable): Coroutine function awaited with a Job on the event loop
+            max_in_flight (int, optional): Maximum number of requests in flight overall (defaults to max_workers)
+            cleanup (callable, optional): Coroutine function awaited on the event loop once the
+                jobs are done (e.g. to close the clients' HTTP sessions)
+
+        Yields:
+            tuple: (job, result, error) where error is the exception raised by the worker, or None
+        """
+        max_in_flight = max(1, int(max_in_flight or self.max_workers))
+        outcomes = queue.Queue()
+        finished = object()
+        stop = threading.Event()
+
+        async def run_job(job):
+            try:
+                outcomes.put((job, await worker(job), None))
+            except Exception as e:
+                logger.debug(f"{job} failed: {str(e)}")
+                outcomes.put((job, None, e))
+            finally:
+                self._release(job)
+
+        async def dispatch():
+            # Longest-expected-first; sorted() is stable, so jobs without estimates keep their order
+            pending = sorted(jobs, key=lambda job: job.expected_seconds or 0, reverse=True)
+            in_flight = set()
+            logger.info(f"Scheduling {len(pending)} jobs on one event loop with up to {max_in_flight} in flight")
+            try:
+                while (pending or in_flight) and not stop.is_set():
+                    for job in list(pending):
+                        if len(in_flight) >= max_in_flight:
+                            break
+                        if self._try_acquire(job):
+                            pending.remove(job)
+                            logger.debug(f"Dispatching {job}")
+                            in_flight.add(asyncio.ensure_future(run_job(job)))
+
+                    if not in_flight:
+                        # Nothing could be dispatched; slots are held elsewhere, so wait and retry
+                        await asyncio.sleep(self.poll_interval)
+                        continue
+
+                    _, in_flight = await asyncio.wait(
+                        in_flight, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED
+                    )
+
+                # Only left over if the caller stopped consuming outcomes early
+                for task in in_flight:
+                    task.cancel()
+                await asyncio.gather(*in_flight, return_exceptions=True)
+                if cleanup is not None:
+                    await cleanup()
+            finally:
+                outcomes.put(finished)
+
+        loop_thread = threading.Thread(target=asyncio.run, args=(dispatch(),), name="job-scheduler-loop", daemon=True)
+        loop_thread.start()
+        try:
+            while True:
+                outcome = outcomes.get()
+                if outcome is finished:
+                    break
+                yield outcome
+        finally:
+            stop.set()
+            loop_thread.join()
@@ -0,0 +1,120 @@
+"""
+Per-model latency estimates built from the metrics log history.
+"""
+
+import os
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyEstimator:
+    """
+    Estimates how long a request to a model will take, based on the
+    ResponseTimeSeconds recorded in logs/metrics.csv by MetricsLogger.
+    """
+
+    def __init__(self, metrics_log_path, default_seconds=30.0):
+        """
+        Initialize the estimator from the metrics log.
+
+        Args:
+            metrics_log_path (str): Path to the metrics CSV file
+            default_seconds (float): Estimate used when there is no history at all
+        """
+        self.default_seconds = default_seconds
+        self.lock = threading.Lock()
+        # model -> list of response times, and (model, brand, type) -> list of response times
+        self.model_samples = {}
+        self.sensor_samples = {}
+
+        if metrics_log_path and os.path.exists(metrics_log_path):
+            try:
+                df = pd.read_csv(metrics_log_path)
+                df = df.dropna(subset=['Model', 'ResponseTimeSeconds'])
+                for model, times in df.groupby('Model')['ResponseTimeSeconds']:
+                    self.model_samples[model] = times.astype(float).tolist()
+                for (model, brand, sensor_type), times in df.groupby(['Model', 'SensorBrand', 'SensorType'])['ResponseTimeSeconds']:
+                    self.sensor_samples[(model, brand, sensor_type)] = times.astype(float).tolist()
+                logger.info(f"Loaded latency history for {len(self.model_samples)} models from {metrics_log_path}")
+            except Exception as e:
+                logger.warning(f"Could not load latency history from {metrics_log_path}: {str(e)}")
+
+    def observe(self, model_id, seconds, sensor_brand=None, sensor_type=None):
+        """
+        Add a newly observed response time to the history.
+
+        Args:
+            model_id (str): Model identifier
+            seconds (float): Observed response time
+            sensor_brand (str, optional): Brand of the sensor
+            sensor_type (str, optional): Type/model of the sensor
+        """
+        with self.lock:
+            self.model_samples.setdefault(model_id, []).append(float(seconds))
+            if sensor_brand is not None and sensor_type is not None:
+                self.sensor_samples.setdefault((model_id, sensor_brand, sensor_type), []).append(float(seconds))
+
+    def _samples(self, model_id, sensor_brand=None, sensor_type=None):
+        with self.lock:
+            samples = self.sensor_samples.get((model_id, sensor_brand, sensor_type))
+            if not samples:
+                samples = self.model_samples.get(model_id)
+            return list(samples) if samples else None
+
+    def expected_seconds(self, model_id, sensor_brand=None, sensor_type=None):
+        """
+        Estimate the response time of a request.
+
+        Uses the median of this model's history for the same sensor if available,
+        otherwise the median for the model, otherwise the median across all models.
+
+        Args:
+            model_id (str): Model identifier
+            sensor_brand (str, optional): Brand of the sensor
+            sensor_type (str, optional): Type/model of the sensor
+
+        Returns:
+            float: Expected response time in seconds
+        """
+        samples = self._samples(model_id, sensor_brand, sensor_type)
+        if samples:
+            return float(np.median(samples))
+        with self.lock:
+            all_samples = [t for times in self.model_samples.values() for t in times]
+        if all_samples:
+            return float(np.median(all_samples))
+        return self.default_seconds
+
+    def sample_count(self, model_id):
+        """
+        Count the response times recorded for a model.
+
+        Args:
+            model_id (str): Model identifier
+
+        Returns:
+            int: Number of samples
+        """
+        with self.lock:
+            return len(self.model_samples.get(model_id, []))
+
+    def percentile(self, model_id, q):
+        """
+        Get a percentile of a model's response time history.
+
+        Args:
+            model_id (str): Model identifier
+            q (float): Percentile in the range 0-100 (e.g. 95)
+
+        Returns:
+            float or None: The percentile in seconds, or None if the model has no history
+        """
+        samples = self._samples(model_id)
+        if not samples:
+            return None
+        return float(np.percentile(samples, q))
@@ -0,0 +1,347 @@
+"""
+Ranks datasheet generator models from the logged reviews.
+
+Reviews are loaded once into a columnar float array of the sixteen Pn scores
+plus the Overall Likert score, with "N/A" and error markers as NaN. Group
+statistics are computed with bincount over integer group codes. Bootstrap
+confidence intervals of a mean draw one weight per distinct score value of the
+group (multinomial counts for small groups, Bayesian bootstrap Gamma weights
+for large ones), which costs O(resamples x distinct values) rather than
+O(resamples x reviews).
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.review_logger import ReviewScoreLogger
+
+logger = logging.getLogger(__name__)
+
+CRITERIA = [f"P{i}_{name}" for i, name in enumerate(ReviewScoreLogger.P_CRITERIA_BASE_NAMES, 1)] + ["Overall"]
+SCORE_COLUMNS = [f"{name}_Likert_Score" if name == "Overall" else f"{name}_Score" for name in CRITERIA]
+NUM_P_CRITERIA = len(ReviewScoreLogger.P_CRITERIA_BASE_NAMES)
+OVERALL = NUM_P_CRITERIA
+
+KEY_COLUMNS = ['Sensor_Brand', 'Sensor_Type', 'Generated_Datasheet_LLM_Provider', 'Generated_Datasheet_LLM_Model',
+               'Reviewer_LLM_Provider', 'Reviewer_LLM_Model']
+
+UNKNOWN_DOMAIN = "Unknown"
+
+# Groups at least this large are resampled with the Bayesian bootstrap
+BAYESIAN_BOOTSTRAP_MIN_SIZE = 1000
+
+
+def _numeric_column(column):
+    """Parse a column of scores into floats (NaN for "N/A", errors and blanks), parsing each distinct value once."""
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=float)
+    codes, distinct = pd.factorize(column, use_na_sentinel=True)
+    parsed = pd.to_numeric(pd.Series(distinct, dtype=object), errors='coerce').to_numpy(dtype=float)
+    return np.append(parsed, np.nan)[codes]
+
+
+def _factorize_pairs(first, second):
+    """
+    Integer-code the (first, second) pair of every row.
+
+    Returns:
+        tuple: (labels, codes) - labels is a list of (first, second) tuples and codes indexes into it
+    """
+    first_codes, first_values = pd.factorize(first.astype(str))
+    second_codes, second_values = pd.factorize(second.astype(str))
+    pair_codes, codes = np.unique(first_codes.astype(np.int64) * len(second_values) + second_codes,
+                                  return_inverse=True)
+    labels = [(first_values[code // len(second_values)], second_values[code % len(second_values)])
+              for code in pair_codes]
+    return labels, codes.reshape(-1)
+
+
+class ReviewScores:
+    """Columnar review scores with integer-coded generator, reviewer and domain labels."""
+
+    def __init__(self, scores, generator_labels, generator_codes, reviewer_labels, reviewer_codes,
+                 domain_labels, domain_codes):
+        """
+        Build the columns.
+
+        Args:
+            scores (numpy.ndarray): (reviews, len(CRITERIA)) float array, NaN where a score is missing
+            generator_labels (numpy.ndarray): Generator model names ("provider/model")
+            generator_codes (numpy.ndarray): Index into generator_labels of each review
+            reviewer_labels (numpy.ndarray): Reviewer model names ("provider/model")
+            reviewer_codes (numpy.ndarray): Index into reviewer_labels of each review
+            domain_labels (numpy.ndarray): Sensor domains
+            domain_codes (numpy.ndarray): Index into domain_labels of each review
+        """
+        self.scores = scores
+        self.generator_labels, self.generator_codes = generator_labels, generator_codes
+        self.reviewer_labels, self.reviewer_codes = reviewer_labels, reviewer_codes
+        self.domain_labels, self.domain_codes = domain_labels, domain_codes
+
+    def __len__(self):
+        return self.scores.shape[0]
+
+    @classmethod
+    def from_frame(cls, df, domains_by_sensor=None):
+        """
+        Build the columns from review rows.
+
+        Args:
+            df (pandas.DataFrame): Rows with KEY_COLUMNS and SCORE_COLUMNS
+            domains_by_sensor (dict, optional): (brand, type) -> domain
+
+        Returns:
+            ReviewScores: The columnar scores
+        """
+        scores = np.column_stack([
+            _numeric_column(df[column]) if column in df.columns else np.full(len(df), np.nan)
+            for column in SCORE_COLUMNS
+        ])
+        generators, generator_codes = _factorize_pairs(df['Generated_Datasheet_LLM_Provider'],
+                                                       df['Generated_Datasheet_LLM_Model'])
+        reviewers, reviewer_codes = _factorize_pairs(df['Reviewer_LLM_Provider'], df['Reviewer_LLM_Model'])
+        # Resolve the domain once per distinct sensor rather than once per review
+        sensors, sensor_codes = _factorize_pairs(df['Sensor_Brand'], df['Sensor_Type'])
+        domains_by_sensor = domains_by_sensor or {}
+        sensor_domains = [domains_by_sensor.get(sensor, UNKNOWN_DOMAIN) for sensor in sensors]
+        domain_labels, sensor_domain_codes = np.unique(np.array(sensor_domains, dtype=object).astype(str),
+                                                       return_inverse=True)
+        return cls(
+            scores,
+            np.array([f"{provider}/{model}" for provider, model in generators], dtype=object), generator_codes,
+            np.array([f"{provider}/{model}" for provider, model in reviewers], dtype=object), reviewer_codes,
+            domain_labels.astype(object), sensor_domain_codes.reshape(-1)[sensor_codes]
+        )
+
+    def pn_average(self):
+        """
+        Mean of each review's available Pn scores.
+
+        Returns:
+            numpy.ndarray: One value per review, NaN if it has no Pn score
+        """
+        p_scores = self.scores[:, :NUM_P_CRITERIA]
+        present = ~np.isnan(p_scores)
+        counts = present.sum(axis=1)
+        totals = np.where(present, p_scores, 0.0).sum(axis=1)
+        return np.divide(totals, counts, out=np.full(len(totals), np.nan), where=counts > 0)
+
+    def select(self, mask):
+        """
+        Keep only the reviews where mask is True.
+
+        Returns:
+            ReviewScores: The subset
+        """
+        subset = ReviewScores.__new__(ReviewScores)
+        subset.scores = self.scores[mask]
+        subset.generator_labels, subset.generator_codes = self.generator_labels, self.generator_codes[mask]
+        subset.reviewer_labels, subset.reviewer_codes = self.reviewer_labels, self.reviewer_codes[mask]
+        subset.domain_labels, subset.domain_codes = self.domain_labels, self.domain_codes[mask]
+        return subset
+
+
+def load_domains(sensors_csv_path):
+    """
+    Map each sensor to its domain from the sensors CSV.
+
+    Args:
+        sensors_csv_path (str): Path to the CSV with Brand, Type and Domain columns
+
+    Returns:
+        dict: (brand, type) -> domain (empty if the file has no Domain column or cannot be read)
+    """
+    try:
+        sensors_df = pd.read_csv(sensors_csv_path)
+    except Exception as e:
+        logger.warning(f"Could not read sensor domains from {sensors_csv_path}: {e}")
+        return {}
+    if 'Domain' not in sensors_df.columns:
+        return {}
+    return {(str(brand), str(sensor_type)): str(domain)
+            for brand, sensor_type, domain in sensors_df[['Brand', 'Type', 'Domain']].itertuples(index=False)}
+
+
+def load_review_scores(review_logger, domains_by_sensor=None, **filters):
+    """
+    Load the score columns of every logged review.
+
+    Args:
+        review_logger (ReviewScoreLogger): Logger whose store holds the reviews
+        domains_by_sensor (dict, optional): (brand, type) -> domain
+        **filters: Review store filters (e.g. reviewer_model)
+
+    Returns:
+        ReviewScores or None: The scores, or None if there are no reviews
+    """
+    review_logger.flush()
+    df = review_logger.store.scan(KEY_COLUMNS + SCORE_COLUMNS, numeric_columns=SCORE_COLUMNS, **filters)
+    if df is None or df.empty:
+        return None
+    return ReviewScores.from_frame(df, domains_by_sensor)
+
+
+def group_stats(codes, n_groups, values):
+    """
+    Count, mean and sample variance of each column per group, ignoring NaN.
+
+    Args:
+        codes (numpy.ndarray): Group code (0..n_groups-1) of each row
+        n_groups (int): Number of groups
+        values (numpy.ndarray): (rows,) or (rows, columns) float array
+
+    Returns:
+        tuple: (counts, means, variances), each (n_groups,) or (n_groups, columns); means are
+            NaN for empty groups and variances NaN for groups with fewer than two values
+    """
+    matrix = values.reshape(len(values), -1)
+    columns = matrix.shape[1]
+    present = ~np.isnan(matrix)
+    filled = np.where(present, matrix, 0.0)
+    # One bincount over (group, column) cells instead of one per column
+    cells = (codes.astype(np.intp)[:, None] * columns + np.arange(columns)).ravel()
+    size = n_groups * columns
+    counts = np.bincount(cells, weights=present.ravel(), minlength=size).reshape(n_groups, columns)
+    sums = np.bincount(cells, weights=filled.ravel(), minlength=size).reshape(n_groups, columns)
+    means = np.divide(sums, counts, out=np.full((n_groups, columns), np.nan), where=counts > 0)
+    # Second pass around the group mean, which is more accurate than sum of squares minus squared sum
+    deviations = np.where(present, filled - np.nan_to_num(means)[codes], 0.0)
+    squares = np.bincount(cells, weights=(deviations ** 2).ravel(), minlength=size).reshape(n_groups, columns)
+    variances = np.divide(squares, counts - 1, out=np.full((n_groups, columns), np.nan), where=counts > 1)
+    if values.ndim == 1:
+        return counts[:, 0], means[:, 0], variances[:, 0]
+    return counts, means, variances
+
+
+def _value_counts(codes, n_groups, values):
+    """
+    Count every distinct value per group, ignoring NaN.
+
+    Returns:
+        tuple: (distinct, counts) - distinct is (values,) and counts is (n_groups, values)
+    """
+    present = ~np.isnan(values)
+    value_codes, distinct = pd.factorize(values[present])
+    counts = np.bincount(codes[present].astype(np.intp) * len(distinct) + value_codes,
+                         minlength=n_groups * len(distinct))
+    return np.asarray(distinct, dtype=float), counts.reshape(n_groups, len(distinct))
+
+
+def _bootstrap_from_counts(distinct, counts, rng, n_boot, confidence):
+    """Percentile bootstrap CI of the mean of a sample given as counts of its distinct values."""
+    n = counts.sum()
+    if n == 0 or n_boot <= 0:
+        return np.nan, np.nan
+    observed = counts > 0
+    if observed.sum() == 1:
+        value = distinct[observed][0]
+        return value, value
+    if n < BAYESIAN_BOOTSTRAP_MIN_SIZE:
+        # Resampling n values with replacement = multinomial counts over the distinct values
+        draws = rng.multinomial(n, counts[observed] / n, size=n_boot)
+        means = draws @ distinct[observed] / n
+    else:
+        # Bayesian bootstrap: an Exp(1) weight per review sums to a Gamma(count) weight per
+        # distinct value. Same mean and variance as the multinomial counts, several times
+        # cheaper to draw, and indistinguishable from it at this size
+        weights = rng.standard_gamma(counts[observed], size=(n_boot, observed.sum()))
+        means = weights @ distinct[observed] / weights.sum(axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha])
+    return low, high
+
+
+def bootstrap_mean_ci(values, rng, n_boot=1000, confidence=0.95):
+    """
+    Percentile bootstrap confidence interval of the mean, ignoring NaN.
+
+    Args:
+        values (numpy.ndarray): Sample
+        rng (numpy.random.Generator): Random generator
+        n_boot (int): Number of resamples
+        confidence (float): Confidence level
+
+    Returns:
+        tuple: (low, high), NaN if the sample is empty
+    """
+    distinct, counts = _value_counts(np.zeros(len(values), dtype=np.intp), 1, values)
+    return _bootstrap_from_counts(distinct, counts[0], rng, n_boot, confidence)
+
+
+def _grouped_cis(codes, n_groups, values, rng, n_boot, confidence):
+    """Bootstrap CI of the mean of values for every group. Returns (lows, highs)."""
+    distinct, counts = _value_counts(codes, n_groups, values)
+    lows = np.full(n_groups, np.nan)
+    highs = np.full(n_groups, np.nan)
+    for group in range(n_groups):
+        lows[group], highs[group] = _bootstrap_from_counts(distinct, counts[group], rng, n_boot, confidence)
+    return lows, highs
+
+
+def _summary_frame(label_name, labels, codes, values, rng, n_boot, confidence):
+    """Count, mean, variance and CI of values per label, as a DataFrame."""
+    counts, means, variances = group_stats(codes, len(labels), values)
+    lows, highs = _grouped_cis(codes, len(labels), values, rng, n_boot, confidence)
+    return pd.DataFrame({
+        label_name: labels,
+        'Reviews': counts.astype(int),
+        'Mean': means,
+        'Variance': variances,
+        'CI_Low': lows,
+        'CI_High': highs,
+    })
+
+
+def build_leaderboard(review_scores, n_boot=1000, confidence=0.95, seed=0):
+    """
+    Compute the per-model, per-domain and per-criterion statistics.
+
+    Args:
+        review_scores (ReviewScores): Loaded reviews
+        n_boot (int): Bootstrap resamples per interval (0 to skip the intervals)
+        confidence (float): Confidence level of the intervals
+        seed (int): Seed of the bootstrap, so reruns give the same intervals
+
+    Returns:
+        dict: DataFrames keyed 'models' (ranked by mean Pn score, with Overall columns),
+            'domains' (mean Pn score per sensor domain), 'criteria' (every criterion across
+            all reviews) and 'model_criteria' (mean of every criterion per model)
+    """
+    rng = np.random.default_rng(seed)
+    pn_average = review_scores.pn_average()
+    overall = review_scores.scores[:, OVERALL]
+    models = _summary_frame('Generator_Model', review_scores.generator_labels, review_scores.generator_codes,
+                            pn_average, rng, n_boot, confidence)
+    overall_stats = _summary_frame('Generator_Model', review_scores.generator_labels, review_scores.generator_codes,
+                                   overall, rng, n_boot, confidence)
+    for column in ['Mean', 'Variance', 'CI_Low', 'CI_High']:
+        models[f'Overall_{column}'] = overall_stats[column]
+    models = models[models['Reviews'] > 0].sort_values('Mean', ascending=False, na_position='last')
+    models.insert(0, 'Rank', np.arange(1, len(models) + 1))
+
+    domains = _summary_frame('Domain', review_scores.domain_labels, review_scores.domain_codes,
+                             pn_average, rng, n_boot, confidence)
+    domains = domains[domains['Reviews'] > 0].sort_values('Mean', ascending=False, na_position='last')
+
+    single_group = np.zeros(len(review_scores), dtype=np.intp)
+    counts, means, variances = group_stats(single_group, 1, review_scores.scores)
+    criteria_cis = [bootstrap_mean_ci(review_scores.scores[:, column], rng, n_boot, confidence)
+                    for column in range(len(CRITERIA))]
+    criteria = pd.DataFrame({
+        'Criterion': CRITERIA,
+        'Reviews': counts[0].astype(int),
+        'Mean': means[0],
+        'Variance': variances[0],
+        'CI_Low': [low for low, _ in criteria_cis],
+        'CI_High': [high for _, high in criteria_cis],
+    })
+
+    _, model_means, _ = group_stats(review_scores.generator_codes, len(review_scores.generator_labels),
+                                    review_scores.scores)
+    model_criteria = pd.DataFrame(model_means, columns=CRITERIA, index=review_scores.generator_labels)
+    model_criteria = model_criteria.loc[models['Generator_Model']]
+
+    return {'models': models.reset_index(drop=True), 'domains': domains.reset_index(drop=True),
+            'criteria': criteria, 'model_criteria': model_criteria}
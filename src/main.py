@@ -6,6 +6,7 @@ This CLI tool allows users to compare responses from different LLMs about sensor
 
 import os
 import time
+import asyncio
 import click
 import sys
 import json
@@ -35,14 +36,25 @@ logging.basicConfig(
 )
 
 # Import our utility modules
-from src.utils import extract_json_from_llm_response
+from src.utils import extract_json_from_llm_response, CHARS_PER_TOKEN
 from src.chunked_reviewer import ChunkedReviewer
-from src.api_client import APIClientFactory
+from src.api_client import APIClientFactory, get_rate_limiter, get_circuit_breakers, discard_cached_response
+from src.circuit_breaker import CircuitOpenError
+from src.fallback_router import FallbackRouter
+from src.job_scheduler import Job, JobScheduler
+from src.run_journal import RunJournal
+from src.latency_estimator import LatencyEstimator
+from src.hedged_client import HedgedClient
 from src.prompt_generator import PromptGenerator
+from src.prompt_template import load_template
 from src.result_processor import ResultProcessor
 from src.metrics_logger import MetricsLogger
 from src.datasheet_loader import OfficialDatasheetLoader
+from src.datasheet_index import datasheet_roots
+from src.content_cache import get_content_cache
 from src.review_logger import ReviewScoreLogger
+from src.review_store import SQLiteReviewStore
+from src.leaderboard import load_domains, load_review_scores, build_leaderboard
 
 logger = logging.getLogger(__name__)
 logger.info(f"NumPy version: {__import__('numpy').__version__}")
@@ -55,6 +67,12 @@ def load_config(config_path):
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
 
+def apply_cache_bypass(cfg, bypass_cache):
+    """Mark the response cache as bypassed for this run (lookups skipped, results still stored)."""
+    if bypass_cache:
+        cfg.setdefault('response_cache', {})['bypass'] = True
+        logger.info("Response cache bypass requested from CLI")
+
 def display_sensors(df):
     """Display available sensors in a table, including an 'All Sensors' option."""
     table = Table(title="Available Sensors")
@@ -164,11 +182,106 @@ def create_api_client(model_id: str, cfg: dict, purpose: str = "generator"):
     if not actual_provider_config:
         raise ValueError(f"Configuration for provider '{provider_name}' (required by model '{model_id}') not found in 'providers' section of your config.")
 
-    if 'api_key' not in actual_provider_config or not actual_provider_config['api_key']:
+    # The offline replay provider does not need an API key
+    if provider_name != 'replay' and ('api_key' not in actual_provider_config or not actual_provider_config['api_key']):
         raise ValueError(f"API key for provider '{provider_name}' (required by model '{model_id}') is missing or empty. Please check 'providers.{provider_name}.api_key' in your config.")
 
     # Pass the full config to the API client factory for rate limiting
     return APIClientFactory.get_client(actual_provider_config, provider_name, cfg)
+
+def resolve_fallback_model(model_id: str, cfg: dict):
+    """
+    Find the fallback for a reviewer model.
+
+    The fallback is the model's 'fallback' setting if present, otherwise the first
+    other model in the 'models' list (the list searched after 'reviewer_models').
+
+    Args:
+        model_id (str): The primary reviewer model ID.
+        cfg (dict): The application configuration dictionary.
+
+    Returns:
+        str or None: The fallback model ID, or None if there is none.
+    """
+    model_config = next(
+        (m for m in cfg.get('reviewer_models', []) + cfg.get('models', []) if m.get('id') == model_id), {}
+    )
+    return model_config.get('fallback') or next(
+        (m['id'] for m in cfg.get('models', []) if m.get('id') != model_id), None
+    )
+
+def create_fallback_router(reviewer_client, model_id: str, cfg: dict):
+    """
+    Wrap a reviewer client so that requests go to the fallback model while the reviewer's circuit is open.
+
+    Args:
+        reviewer_client (APIClient): Client for the primary reviewer model.
+        model_id (str): The primary reviewer model ID.
+        cfg (dict): The application configuration dictionary.
+
+    Returns:
+        APIClient: A FallbackRouter, or reviewer_client unchanged if circuit breakers are
+            disabled or no fallback is available.
+    """
+    circuit_breakers = get_circuit_breakers(cfg)
+    fallback_id = resolve_fallback_model(model_id, cfg)
+    if not circuit_breakers or not fallback_id:
+        return reviewer_client
+    fallback_client = create_api_client(fallback_id, cfg, purpose="reviewer")
+    return FallbackRouter(reviewer_client, model_id, fallback_client, fallback_id, circuit_breakers)
+
+def create_hedged_client(reviewer_client, model_id: str, cfg: dict):
+    """
+    Wrap a reviewer client so that slow requests are hedged to a fallback model.
+
+    Args:
+        reviewer_client (APIClient): Client for the primary reviewer model.
+        model_id (str): The primary reviewer model ID.
+        cfg (dict): The application configuration dictionary.
+
+    Returns:
+        APIClient: A HedgedClient, or reviewer_client unchanged if no fallback is available.
+    """
+    hedge_cfg = cfg.get('hedging', {})
+    fallback_id = resolve_fallback_model(model_id, cfg)
+    if not fallback_id:
+        logger.warning(f"No fallback model available to hedge {model_id}; hedging disabled")
+        return reviewer_client
+
+    fallback_client = create_api_client(fallback_id, cfg, purpose="reviewer")
+    # The metrics log holds generation latencies, which say little about the much larger
+    # review prompts, so the hedge delay comes from this reviewer's own requests only
+    return HedgedClient(
+        reviewer_client, model_id, fallback_client, fallback_id,
+        LatencyEstimator(None),
+        percentile=hedge_cfg.get('percentile', 95),
+        max_hedge_ratio=hedge_cfg.get('max_hedge_ratio', 0.1),
+        min_delay_seconds=hedge_cfg.get('min_delay_seconds', 1.0),
+        min_samples=hedge_cfg.get('min_samples', 20),
+        default_delay_seconds=hedge_cfg.get('default_delay_seconds', 120.0)
+    )
+
+def print_hedge_stats(reviewer_client):
+    """Print hedging statistics if the reviewer client hedges requests."""
+    if isinstance(reviewer_client, HedgedClient):
+        stats = reviewer_client.get_hedge_stats()
+        console.print(f"Hedging: {stats['hedges']}/{stats['requests']} requests hedged to "
+                      f"{reviewer_client.fallback_model}, {stats['hedge_wins']} answered first by the fallback")
+
+def close_hedged_client(reviewer_client):
+    """Shut down the worker threads of a hedging reviewer client."""
+    if isinstance(reviewer_client, HedgedClient):
+        reviewer_client.close()
+
+def print_content_cache_stats():
+    """Print how often datasheet reads were served from the shared content cache."""
+    stats = get_content_cache().stats()
+    if stats['hits'] or stats['misses']:
+        console.print(f"[dim]Datasheet cache: {stats['hits']} hits, {stats['misses']} reads from disk, "
+                      f"{stats['reloads']} reloads of changed files ({stats['entries']} files, "
+                      f"{stats['size_bytes'] / 1024:.0f} KiB cached)[/dim]")
+        logger.info(f"Content cache stats: {stats}")
+
 @click.group()
 def cli():
     """LLM Sensor Knowledge Comparison Tool"""
@@ -177,129 +290,261 @@ def cli():
 @cli.command()
 @click.option('--config', default='config/config.yaml', help='Path to configuration file')
 @click.option('--convert-pdf', is_flag=True, help='Convert the last generated output to PDF after comparison')
-def run(config, convert_pdf):
+@click.option('--bypass-cache', is_flag=True, help='Ignore cached LLM responses (fresh responses are still cached)')
+@click.option('--resume', is_flag=True, help='Resume the most recent run, sending only the requests that did not finish')
+@click.option('--stream', is_flag=True, help='Stream responses to disk as tokens arrive and log time-to-first-token and decode throughput')
+@click.option('--async', 'use_async', is_flag=True, help='Send requests with the asyncio clients, keeping many in flight on one event loop')
+def run(config, convert_pdf, bypass_cache, resume, stream, use_async):
     """Run the comparison tool with interactive selection."""
+    if stream and use_async:
+        console.print("[bold red]--stream and --async cannot be combined.[/bold red]")
+        return
+    
     # Load configuration
     cfg = load_config(config)
+    apply_cache_bypass(cfg, bypass_cache)
+    journals_path = cfg.get('journals_path', 'logs/journals/')
     
     # Initialize components
     prompt_gen = PromptGenerator(cfg['prompt_template_path'])
     result_proc = ResultProcessor(cfg['results_base_path'])
     metrics_logger = MetricsLogger(cfg['metrics_log_path'])
     
-    # Create API clients for each provider
+    # Create API clients for each provider (sharing the global rate limiter)
     clients = {}
     for provider_name, provider_config in cfg['providers'].items():
-        clients[provider_name] = APIClientFactory.get_client(provider_config, provider_name)
-    
-    # Load sensor data
-    sensors_df = pd.read_csv(cfg['data_path'])
+        clients[provider_name] = APIClientFactory.get_client(provider_config, provider_name, cfg)
     
     console.print("[bold green]Welcome to LLM Sensor Knowledge Comparison Tool[/bold green]")
     console.print("")
     
-    # Display and select sensors
-    display_sensors(sensors_df)
-    sensor_indices = click.prompt("Select sensor indices (comma-separated, or 'all')", default="all")
-    if sensor_indices.lower() == 'all':
-        selected_sensors = sensors_df
+    if resume:
+        journal = RunJournal.latest(journals_path, 'run')
+        if journal is None:
+            console.print(f"[bold red]No run journal found in {journals_path}. Nothing to resume.[/bold red]")
+            return
+        selected_sensor_pairs = [tuple(pair) for pair in journal.args.get('sensors', [])]
+        selected_models = journal.args.get('models', [])
+        console.print(f"[bold]Resuming run from {journal.path}[/bold] ({journal.summary()})")
     else:
-        indices = [int(i.strip()) for i in sensor_indices.split(',')]
-        selected_sensors = sensors_df.iloc[indices]
+        # Load sensor data
+        sensors_df = pd.read_csv(cfg['data_path'])
+        
+        # Display and select sensors
+        display_sensors(sensors_df)
+        sensor_indices = click.prompt("Select sensor indices (comma-separated, or 'all')", default="all")
+        if sensor_indices.lower() == 'all':
+            selected_sensors = sensors_df
+        else:
+            indices = [int(i.strip()) for i in sensor_indices.split(',')]
+            selected_sensors = sensors_df.iloc[indices]
+        selected_sensor_pairs = [(row['Brand'], row['Type']) for _, row in selected_sensors.iterrows()]
+        
+        # Display and select models
+        display_models(cfg['models'])
+        model_indices = click.prompt("Select model indices (comma-separated, or 'all')", default="all")
+        if model_indices.lower() == 'all':
+            selected_models = cfg['models']
+        else:
+            indices = [int(i.strip()) for i in model_indices.split(',')]
+            selected_models = [cfg['models'][i] for i in indices]
+        
+        console.print(f"[bold]Selected Sensors:[/bold] {len(selected_sensor_pairs)}")
+        console.print(f"[bold]Selected Models:[/bold] {len(selected_models)}")
+        if not click.confirm("Proceed with comparison?"):
+            console.print("[bold red]Aborted.[/bold red]")
+            return
+        
+        journal = RunJournal.create(journals_path, 'run', {
+            'sensors': [list(pair) for pair in selected_sensor_pairs],
+            'models': [{'id': m['id'], 'provider': m['provider']} for m in selected_models]
+        })
     
-    # Display and select models
-    display_models(cfg['models'])
-    model_indices = click.prompt("Select model indices (comma-separated, or 'all')", default="all")
-    if model_indices.lower() == 'all':
-        selected_models = cfg['models']
-    else:
-        indices = [int(i.strip()) for i in model_indices.split(',')]
-        selected_models = [cfg['models'][i] for i in indices]
+    # Build one job per sensor x model pair that has not completed yet,
+    # with its expected duration taken from the metrics history
+    latency_estimator = LatencyEstimator(cfg['metrics_log_path'])
+    jobs = []
+    for sensor_brand, sensor_type in selected_sensor_pairs:
+        # Generate prompt for this sensor (no datasheet content needed as per updated requirements)
+        prompt = prompt_gen.generate_prompt(sensor_brand, sensor_type, "")
+        
+        for model_info in selected_models:
+            model_id = model_info['id']
+            provider = model_info['provider']
+            job_key = f"{sensor_brand}_{sensor_type}|{model_id}"
+            if journal.is_done(job_key):
+                continue
+            if provider not in clients:
+                console.print(f"[red]✗ Skipping {sensor_brand} {sensor_type} with {model_id}: No client found for provider {provider}[/red]")
+                journal.record(job_key, RunJournal.FAILED, error=f"No client found for provider {provider}")
+                continue
+            journal.record(job_key, RunJournal.PENDING)
+            jobs.append(Job(
+                job_key, provider, model_id,
+                {'sensor_brand': sensor_brand, 'sensor_type': sensor_type, 'prompt': prompt},
+                expected_seconds=latency_estimator.expected_seconds(model_id, sensor_brand, sensor_type)
+            ))
     
-    console.print(f"[bold]Selected Sensors:[/bold] {len(selected_sensors)}")
-    console.print(f"[bold]Selected Models:[/bold] {len(selected_models)}")
-    if not click.confirm("Proceed with comparison?"):
-        console.print("[bold red]Aborted.[/bold red]")
-        return
+    total_requests = len(jobs)
+    max_workers = cfg.get('max_concurrent_requests', 4)
+    if use_async:
+        # The asyncio clients share the rate limiter, response cache and circuit breakers of the blocking ones
+        try:
+            async_clients = {
+                provider: APIClientFactory.get_async_client(cfg['providers'][provider], provider, cfg)
+                for provider in {job.provider for job in jobs}
+            }
+        except ValueError as e:
+            console.print(f"[bold red]Cannot use --async: {str(e)}. Resume without --async to send the pending requests.[/bold red]")
+            journal.close()
+            return
+        max_workers = cfg.get('max_concurrent_async_requests', 100)
+    console.print(f"[bold blue]Processing {total_requests} requests (up to {max_workers} concurrently)...[/bold blue]")
+    
+    def send_job(job):
+        """Send a single job's prompt and time the round-trip (runs in a worker thread)."""
+        client = clients[job.provider]
+        journal.record(job.key, RunJournal.IN_FLIGHT)
+        start_time = datetime.now()
+        response = client.send_request(job.model_id, job.payload['prompt'])
+        response_time = (datetime.now() - start_time).total_seconds()
+        return response, response_time
     
-    # Process each sensor with each model
-    total_requests = len(selected_sensors) * len(selected_models)
-    console.print(f"[bold blue]Processing {total_requests} requests...[/bold blue]")
+    async def send_job_async(job):
+        """Send a single job's prompt on the event loop and time the round-trip."""
+        client = async_clients[job.provider]
+        # Journal records are fsync'ed, so keep them off the event loop
+        await asyncio.to_thread(journal.record, job.key, RunJournal.IN_FLIGHT)
+        start_time = datetime.now()
+        response = await client.send_request(job.model_id, job.payload['prompt'])
+        response_time = (datetime.now() - start_time).total_seconds()
+        return response, response_time
+    
+    async def close_async_clients():
+        for client in async_clients.values():
+            await client.aclose()
+    
+    def stream_job(job):
+        """Stream a single job's response straight into its result file (runs in a worker thread)."""
+        client = clients[job.provider]
+        journal.record(job.key, RunJournal.IN_FLIGHT)
+        usage = {}
+        response_length = 0
+        first_token_time = None
+        result_filename, result_file = result_proc.open_result_stream(
+            job.payload['sensor_brand'], job.payload['sensor_type'], job.model_id
+        )
+        start_time = time.monotonic()
+        try:
+            with result_file:
+                for chunk in client.stream_request(job.model_id, job.payload['prompt'], usage=usage):
+                    if first_token_time is None and chunk:
+                        first_token_time = time.monotonic()
+                    result_file.write(chunk)
+                    result_file.flush()
+                    response_length += len(chunk)
+        except Exception:
+            # Do not leave a truncated datasheet behind for the review commands
+            os.remove(result_filename)
+            raise
+        response_time = time.monotonic() - start_time
+        
+        # Fall back to a character-based estimate if the provider did not report usage
+        output_tokens = usage.get('output_tokens') or -(-response_length // CHARS_PER_TOKEN)
+        time_to_first_token = None if first_token_time is None else first_token_time - start_time
+        decode_tokens_per_second = None
+        if first_token_time is not None and response_time > time_to_first_token:
+            decode_tokens_per_second = round(output_tokens / (response_time - time_to_first_token), 2)
+        response = {
+            'result_path': result_filename,
+            'input_tokens': usage.get('input_tokens', 0),
+            'output_tokens': output_tokens,
+            'response_length': response_length,
+            'time_to_first_token': None if time_to_first_token is None else round(time_to_first_token, 3),
+            'decode_tokens_per_second': decode_tokens_per_second
+        }
+        return response, response_time
+    
+    scheduler = JobScheduler(get_rate_limiter(cfg), max_workers=max_workers)
+    if use_async:
+        outcomes = scheduler.run_async(jobs, send_job_async, cleanup=close_async_clients)
+    else:
+        outcomes = scheduler.run(jobs, stream_job if stream else send_job)
     
     with console.status("[bold green]Working on requests...[/bold green]") as status:
         completed = 0
-        for _, sensor in selected_sensors.iterrows():
-            sensor_brand = sensor['Brand']
-            sensor_type = sensor['Type']
-            # Generate prompt for this sensor (no datasheet content needed as per updated requirements)
-            prompt = prompt_gen.generate_prompt(sensor_brand, sensor_type, "")
+        for job, outcome, error in outcomes:
+            completed += 1
+            sensor_brand = job.payload['sensor_brand']
+            sensor_type = job.payload['sensor_type']
+            model_id = job.model_id
+            status.update(f"[bold green]Finished {completed}/{total_requests}: {sensor_brand} {sensor_type} with {model_id} via {job.provider}[/bold green]")
+            
+            if error is not None:
+                error_msg = f"Error on {completed}/{total_requests}: {sensor_brand} {sensor_type} with {model_id}: {str(error)}"
+                console.print(f"[red]✗ {error_msg}[/red]")
+                # Log detailed error with traceback to file
+                import traceback
+                detailed_error = f"API Error on {completed}/{total_requests}: {sensor_brand} {sensor_type} with {model_id}\n{''.join(traceback.format_exception(error))}"
+                log_error(detailed_error, cfg.get('logs_path', 'logs/'))
+                journal.record(job.key, RunJournal.FAILED, error=str(error)[:500])
+                continue
             
-            for model_info in selected_models:
-                model_id = model_info['id']
-                provider = model_info['provider']
-                completed += 1
-                status.update(f"[bold green]Processing request {completed}/{total_requests}: {sensor_brand} {sensor_type} with {model_id} via {provider}[/bold green]")
+            try:
+                response, response_time = outcome
+                input_tokens = response.get('input_tokens', 0)
+                output_tokens = response.get('output_tokens', 0)
                 
-                # Select the appropriate client based on provider
-                client = clients.get(provider)
-                if not client:
-                    console.print(f"[red]✗ Error on {completed}/{total_requests}: No client found for provider {provider}[/red]")
+                if response.get('cached'):
+                    # A cache hit is the response of an earlier run: point the journal at the
+                    # datasheet that run saved instead of writing a duplicate, and keep the
+                    # near-zero lookup time out of the latency history
+                    response_text = response.get('text', '')
+                    result_filename = result_proc.find_result(sensor_brand, sensor_type, model_id, response_text)
+                    if result_filename is None:
+                        result_filename = result_proc.save_result(sensor_brand, sensor_type, model_id, response_text)
+                    journal.record(job.key, RunJournal.DONE, result=result_filename, cached=True)
+                    console.print(f"[green]✓ Completed {completed}/{total_requests}: {sensor_brand} {sensor_type} with {model_id} (cached response, {result_filename})[/green]")
                     continue
                 
-                # Send request to model
-                start_time = datetime.now()
-                try:
-                    response = client.send_request(model_id, prompt)
-                    end_time = datetime.now()
-                    
-                    response_time = (end_time - start_time).total_seconds()
-                    input_tokens = response.get('input_tokens', 0)
-                    output_tokens = response.get('output_tokens', 0)
+                if 'result_path' in response:
+                    # Streamed responses were already written to disk by the worker
+                    result_filename = response['result_path']
+                    response_length = response['response_length']
+                else:
                     response_text = response.get('text', '')
                     response_length = len(response_text)
                     
                     # Save result
                     result_filename = result_proc.save_result(sensor_brand, sensor_type, model_id, response_text)
-                    
-                    # Log metrics
-                    metrics_logger.log_metrics(
-                        sensor_brand, sensor_type, model_id,
-                        response_time, input_tokens, output_tokens, response_length
-                    )
-                    
-                    console.print(f"[green]✓ Completed {completed}/{total_requests}: {sensor_brand} {sensor_type} with {model_id} (saved to {result_filename})[/green]")
-                except Exception as e:
-                    error_msg = f"Error on {completed}/{total_requests}: {sensor_brand} {sensor_type} with {model_id}: {str(e)}"
-                    console.print(f"[red]✗ {error_msg}[/red]")
-                    # Log detailed error with traceback to file
-                    import traceback
-                    detailed_error = f"API Error on {completed}/{total_requests}: {sensor_brand} {sensor_type} with {model_id}\n{traceback.format_exc()}"
-                    log_error(detailed_error, cfg.get('logs_path', 'logs/'))
-
-            # Check if there are more sensors to process and apply delay if configured
-            # Log types and values for debugging
-            console.print(f"[debug]sensor.index type: {type(sensor.index)}, value: {sensor.index}")
-            console.print(f"[debug]selected_sensors.index[-1] type: {type(selected_sensors.index[-1])}, value: {selected_sensors.index[-1]}")
-            try:
-                # Check if this is not the last sensor by comparing indices
-                is_not_last = sensor.name != selected_sensors.index[-1]
-                if is_not_last:  # If this is not the last sensor
-                    delay_seconds = cfg.get('sensor_delay_seconds', 0)
-                    if delay_seconds > 0:
-                        console.print(f"[bold yellow]Waiting {delay_seconds} seconds before processing the next sensor...[/bold yellow]")
-                        for remaining in range(delay_seconds, 0, -1):
-                            console.print(f"[yellow]Countdown: {remaining} seconds remaining...[/yellow]", end='\r')
-                            import time
-                            time.sleep(1)
-                        console.print("")  # New line after countdown
+                
+                # Log metrics
+                metrics_logger.log_metrics(
+                    sensor_brand, sensor_type, model_id,
+                    response_time, input_tokens, output_tokens, response_length,
+                    time_to_first_token=response.get('time_to_first_token'),
+                    decode_tokens_per_second=response.get('decode_tokens_per_second')
+                )
+                
+                journal.record(job.key, RunJournal.DONE, result=result_filename)
+                console.print(f"[green]✓ Completed {completed}/{total_requests}: {sensor_brand} {sensor_type} with {model_id} (saved to {result_filename})[/green]")
             except Exception as e:
-                console.print(f"[red]Error in sensor index comparison: {str(e)}[/red]")
-                log_error(f"Index comparison error: {str(e)}", cfg['logs_path'])
-                # Failsafe: Assume it's not the last sensor to continue processing
-                is_not_last = True
+                error_msg = f"Error on {completed}/{total_requests}: {sensor_brand} {sensor_type} with {model_id}: {str(e)}"
+                console.print(f"[red]✗ {error_msg}[/red]")
+                import traceback
+                log_error(f"Result handling error: {error_msg}\n{traceback.format_exc()}", cfg.get('logs_path', 'logs/'))
+                journal.record(job.key, RunJournal.FAILED, error=str(e)[:500])
+    
+    journal.close()
     
     console.print("[bold green]All requests completed![/bold green]")
     
+    # Report how well the HTTP connection pools were reused
+    for provider_name, client in clients.items():
+        stats = client.get_connection_stats()
+        if stats and stats['requests']:
+            console.print(f"[dim]{provider_name}: {stats['reused']}/{stats['requests']} requests reused a pooled connection ({stats['new_connections']} new connections)[/dim]")
+    
     # Start PDF conversion process for generated .md files
     logger.info("PDF conversion is about to start for all files.")
     console.print("[bold blue]Starting PDF conversion of .md files using pandoc...[/bold blue]")
@@ -314,6 +559,120 @@ def convert_pdf(config):
     console.print("[bold blue]Starting manual PDF conversion of .md files...[/bold blue]")
     convert_to_pdf(cfg)
 
+@cli.command()
+@click.option('--config', default='config/config.yaml', help='Path to configuration file')
+@click.option('--output', help="Directory to write the CSVs to (defaults to 'review_results_path')")
+def export_reviews(config, output):
+    """Export the review database to per-reviewer, per-sensor CSV files."""
+    cfg = load_config(config)
+    review_logger = ReviewScoreLogger(cfg.get('review_results_path', 'results/reviews/'), cfg)
+    if not isinstance(review_logger.store, SQLiteReviewStore):
+        console.print("[yellow]Reviews are already stored as CSV files ('review_store.type' is not 'sqlite'). Nothing to export.[/yellow]")
+        return
+    output = output or review_logger.base_path
+    written = review_logger.store.export_csv(output)
+    review_logger.close()
+    console.print(f"[green]Exported reviews to {len(written)} CSV files under {output}[/green]")
+
+@cli.command()
+@click.option('--config', default='config/config.yaml', help='Path to configuration file')
+@click.option('--source', help="Directory holding the review CSVs (defaults to 'review_results_path')")
+def import_reviews(config, source):
+    """Import existing review CSV files into the review database."""
+    cfg = load_config(config)
+    review_logger = ReviewScoreLogger(cfg.get('review_results_path', 'results/reviews/'), cfg)
+    if not isinstance(review_logger.store, SQLiteReviewStore):
+        console.print("[red]Set 'review_store.type: sqlite' in the config to import reviews into a database.[/red]")
+        return
+    imported = review_logger.store.import_csv(source or review_logger.base_path)
+    review_logger.close()
+    console.print(f"[green]Imported {imported} reviews into {review_logger.store.path}[/green]")
+
+def format_mean_ci(mean, low, high):
+    """Format a mean and its confidence interval for a table cell."""
+    if pd.isna(mean):
+        return "N/A"
+    if pd.isna(low):
+        return f"{mean:.2f}"
+    return f"{mean:.2f} [{low:.2f}, {high:.2f}]"
+
+def format_variance(variance):
+    """Format a variance for a table cell."""
+    return "N/A" if pd.isna(variance) else f"{variance:.2f}"
+
+def display_leaderboard(leaderboard, confidence):
+    """Display the model, domain and criterion tables of a leaderboard."""
+    ci_label = f"{confidence:.0%} CI"
+    table = Table(title="Generator Leaderboard (mean Pn score)")
+    table.add_column("Rank", style="cyan")
+    table.add_column("Generator Model", style="magenta")
+    table.add_column("Reviews", justify="right")
+    table.add_column(f"Pn Mean [{ci_label}]", justify="right", style="green")
+    table.add_column("Pn Var", justify="right")
+    table.add_column(f"Overall [{ci_label}]", justify="right", style="green")
+    for row in leaderboard['models'].itertuples(index=False):
+        table.add_row(str(row.Rank), row.Generator_Model, str(row.Reviews),
+                      format_mean_ci(row.Mean, row.CI_Low, row.CI_High), format_variance(row.Variance),
+                      format_mean_ci(row.Overall_Mean, row.Overall_CI_Low, row.Overall_CI_High))
+    console.print(table)
+
+    table = Table(title="By Sensor Domain (mean Pn score)")
+    table.add_column("Domain", style="magenta")
+    table.add_column("Reviews", justify="right")
+    table.add_column(f"Mean [{ci_label}]", justify="right", style="green")
+    table.add_column("Var", justify="right")
+    for row in leaderboard['domains'].itertuples(index=False):
+        table.add_row(row.Domain, str(row.Reviews), format_mean_ci(row.Mean, row.CI_Low, row.CI_High),
+                      format_variance(row.Variance))
+    console.print(table)
+
+    table = Table(title="By Criterion")
+    table.add_column("Criterion", style="magenta")
+    table.add_column("Reviews", justify="right")
+    table.add_column(f"Mean [{ci_label}]", justify="right", style="green")
+    table.add_column("Var", justify="right")
+    for row in leaderboard['criteria'].itertuples(index=False):
+        table.add_row(row.Criterion, str(row.Reviews), format_mean_ci(row.Mean, row.CI_Low, row.CI_High),
+                      format_variance(row.Variance))
+    console.print(table)
+
+@cli.command()
+@click.option('--config', default='config/config.yaml', help='Path to configuration file')
+@click.option('--reviewer', help='Only count reviews by this reviewer model (e.g. gpt-4o)')
+@click.option('--bootstrap', default=1000, show_default=True, help='Bootstrap resamples per confidence interval (0 to skip)')
+@click.option('--confidence', default=0.95, show_default=True, help='Confidence level of the intervals')
+@click.option('--seed', default=0, show_default=True, help='Random seed of the bootstrap')
+@click.option('--output', help='Directory to also write the leaderboard tables to as CSV files')
+def leaderboard(config, reviewer, bootstrap, confidence, seed, output):
+    """Rank generator models across all logged reviews, by model, sensor domain and criterion."""
+    cfg = load_config(config)
+    review_logger = ReviewScoreLogger(cfg.get('review_results_path', 'results/reviews/'), cfg)
+    filters = {'reviewer_model': reviewer} if reviewer else {}
+
+    start_time = time.perf_counter()
+    review_scores = load_review_scores(review_logger, load_domains(cfg['data_path']), **filters)
+    load_seconds = time.perf_counter() - start_time
+    review_logger.close()
+    if review_scores is None:
+        console.print("[yellow]No reviews found.[/yellow]")
+        return
+
+    start_time = time.perf_counter()
+    board = build_leaderboard(review_scores, n_boot=bootstrap, confidence=confidence, seed=seed)
+    compute_seconds = time.perf_counter() - start_time
+    logger.info(f"Leaderboard over {len(review_scores)} reviews: loaded in {load_seconds:.2f}s, computed in {compute_seconds:.2f}s")
+
+    display_leaderboard(board, confidence)
+    console.print(f"[dim]{len(review_scores)} reviews loaded in {load_seconds:.2f}s, statistics computed in {compute_seconds:.2f}s[/dim]")
+
+    if output:
+        os.makedirs(output, exist_ok=True)
+        for name in ['models', 'domains', 'criteria']:
+            board[name].to_csv(os.path.join(output, f"leaderboard_{name}.csv"), index=False)
+        board['model_criteria'].to_csv(os.path.join(output, "leaderboard_model_criteria.csv"),
+                                       index_label='Generator_Model')
+        console.print(f"[green]Wrote leaderboard CSVs to {output}[/green]")
+
 def convert_to_pdf(cfg, convert_last_only=False):
     """Convert .md files to PDF using pandoc."""
     import subprocess
@@ -385,417 +744,516 @@ def log_error(error_msg, logs_path):
 @click.option('--config', default='config/config.yaml', help='Path to configuration file')
 @click.option('--reviewer', help="Specific reviewer model. If omitted, you'll be prompted to select from a list (defaults to config setting).")
 @click.option('--sensor', help="Sensor to review (Brand_Type format). If omitted, you'll be prompted to select from a list (supports 'all').")
-def review(config, reviewer, sensor):
+@click.option('--bypass-cache', is_flag=True, help='Ignore cached LLM responses (fresh responses are still cached)')
+@click.option('--resume', is_flag=True, help='Resume the most recent review, skipping datasheets it already reviewed')
+@click.option('--hedge', is_flag=True, help='Send a duplicate request to the fallback model when the reviewer runs past its p95 latency')
+@click.option('--force', is_flag=True, help='Review every datasheet again, even ones this reviewer already scored with the same contents')
+def review(config, reviewer, sensor, bypass_cache, resume, hedge, force):
     """Review and score generated datasheets against official ones.
     This command reviews all found generated datasheets for a given sensor.
     """
     # Load configuration
     cfg = load_config(config)
+    apply_cache_bypass(cfg, bypass_cache)
     # Load sensor data for selection
     sensors_df = pd.read_csv(cfg['data_path'])
+    
+    journals_path = cfg.get('journals_path', 'logs/journals/')
+    journal = None
+    review_logger = None
+    reviewer_client = None
+    try:
+        if resume:
+            journal = RunJournal.latest(journals_path, 'review')
+            if journal is None:
+                console.print(f"[bold red]No review journal found in {journals_path}. Nothing to resume.[/bold red]")
+                return
+            sensor = journal.args.get('sensor')
+            reviewer = journal.args.get('reviewer')
+            console.print(f"[bold]Resuming review from {journal.path}[/bold] ({journal.summary()})")
 
-    if sensor is None:
-        console.print("[bold blue]Select a sensor to review:[/bold blue]")
-        display_sensors(sensors_df)
-        
-        while True:
-            try:
-                sensor_choice_str = click.prompt("Enter the number for the sensor (0 for All Sensors)", type=str)
-                sensor_choice = int(sensor_choice_str)
-                
-                if sensor_choice == 0:
-                    sensor = "ALL_SENSORS" # Special value for all sensors
-                    console.print(f"Selected: [bold cyan]All Sensors[/bold cyan]")
-                    break
-                # Adjust for 1-based indexing for specific sensors (user inputs 1, df index is 0)
-                elif 1 <= sensor_choice <= len(sensors_df):
-                    # Convert 1-based input to 0-based DataFrame index
-                    selected_sensor_row = sensors_df.iloc[sensor_choice - 1]
-                    sensor = f"{selected_sensor_row['Brand']}_{selected_sensor_row['Type']}"
-                    console.print(f"Selected sensor: [bold cyan]{sensor}[/bold cyan]")
-                    break
-                else:
-                    console.print(f"[bold red]Invalid selection. Please enter a valid number from the list.[/bold red]")
-            except ValueError:
-                console.print("[bold red]Invalid input. Please enter a number.[/bold red]")
-            except IndexError: # Should not happen with iloc if length check is correct
-                 console.print(f"[bold red]Invalid index. Please enter a valid number from the list.[/bold red]")
-            except Exception as e:
-                console.print(f"[bold red]An error occurred during sensor selection: {e}. Please try again.[/bold red]")
-    else:
-        # If sensor is provided via CLI, use it directly.
-        console.print(f"Using sensor from CLI: [bold cyan]{sensor}[/bold cyan]")
-
-    # Reviewer model selection
-    # Generator model selection is removed; all found datasheets for a sensor will be processed.
-    if reviewer is None:  # If --reviewer CLI option was not used
-        console.print("\n[bold blue]Select a reviewer model:[/bold blue]")
-        # Assuming reviewer models are listed in the main 'models' section of the config
-        available_reviewer_models = cfg.get('reviewer_models', cfg.get('models', []))
-        
-        if display_reviewer_models(available_reviewer_models, console):
+        if sensor is None:
+            console.print("[bold blue]Select a sensor to review:[/bold blue]")
+            display_sensors(sensors_df)
+            
             while True:
                 try:
-                    reviewer_choice_str = click.prompt(
-                        "Enter the number for the reviewer model (or press Enter to use default/config setting)",
-                        default="", show_default=False, type=str
-                    )
-                    if not reviewer_choice_str:  # User pressed Enter
-                        console.print("[italic]No reviewer selected interactively, will use default/config setting if available.[/italic]")
-                        # 'reviewer' remains None, will be handled by subsequent logic
-                        break
-                    
-                    reviewer_choice = int(reviewer_choice_str)
+                    sensor_choice_str = click.prompt("Enter the number for the sensor (0 for All Sensors)", type=str)
+                    sensor_choice = int(sensor_choice_str)
                     
-                    # Adjust for 1-based indexing
-                    if 1 <= reviewer_choice <= len(available_reviewer_models):
-                        selected_reviewer_info = available_reviewer_models[reviewer_choice - 1]
-                        reviewer = selected_reviewer_info['id']  # Update 'reviewer' variable
-                        console.print(f"Selected reviewer model: [bold cyan]{reviewer}[/bold cyan]")
+                    if sensor_choice == 0:
+                        sensor = "ALL_SENSORS" # Special value for all sensors
+                        console.print(f"Selected: [bold cyan]All Sensors[/bold cyan]")
+                        break
+                    # Adjust for 1-based indexing for specific sensors (user inputs 1, df index is 0)
+                    elif 1 <= sensor_choice <= len(sensors_df):
+                        # Convert 1-based input to 0-based DataFrame index
+                        selected_sensor_row = sensors_df.iloc[sensor_choice - 1]
+                        sensor = f"{selected_sensor_row['Brand']}_{selected_sensor_row['Type']}"
+                        console.print(f"Selected sensor: [bold cyan]{sensor}[/bold cyan]")
                         break
                     else:
                         console.print(f"[bold red]Invalid selection. Please enter a valid number from the list.[/bold red]")
                 except ValueError:
-                    console.print("[bold red]Invalid input. Please enter a number or press Enter.[/bold red]")
+                    console.print("[bold red]Invalid input. Please enter a number.[/bold red]")
+                except IndexError: # Should not happen with iloc if length check is correct
+                     console.print(f"[bold red]Invalid index. Please enter a valid number from the list.[/bold red]")
                 except Exception as e:
-                    console.print(f"[bold red]An error occurred during reviewer model selection: {e}. Please try again.[/bold red]")
+                    console.print(f"[bold red]An error occurred during sensor selection: {e}. Please try again.[/bold red]")
         else:
-            # display_reviewer_models printed "No reviewer models configured." or similar
-            console.print("[yellow]No reviewer models available for interactive selection. Will use default/config if set.[/yellow]")
-            # 'reviewer' remains None
-    else:
-        console.print(f"Using reviewer model from CLI: [bold cyan]{reviewer}[/bold cyan]")
+            # If sensor is provided via CLI, use it directly.
+            console.print(f"Using sensor from CLI: [bold cyan]{sensor}[/bold cyan]")
 
-    # Initialize components
-    datasheet_loader = OfficialDatasheetLoader(cfg['data_path'])
-    review_logger = ReviewScoreLogger(cfg['reviews_base_path'])
-    
-    # Determine the final reviewer model ID and get its configuration
-    final_reviewer_model_id = reviewer  # This is from CLI, interactive selection, or still None
-    if final_reviewer_model_id is None:
-        final_reviewer_model_id = cfg.get('default_reviewer_model') # Fallback to default from config
+        # Reviewer model selection
+        # Generator model selection is removed; all found datasheets for a sensor will be processed.
+        if reviewer is None:  # If --reviewer CLI option was not used
+            console.print("\n[bold blue]Select a reviewer model:[/bold blue]")
+            # Assuming reviewer models are listed in the main 'models' section of the config
+            available_reviewer_models = cfg.get('reviewer_models', cfg.get('models', []))
+            
+            if display_reviewer_models(available_reviewer_models, console):
+                while True:
+                    try:
+                        reviewer_choice_str = click.prompt(
+                            "Enter the number for the reviewer model (or press Enter to use default/config setting)",
+                            default="", show_default=False, type=str
+                        )
+                        if not reviewer_choice_str:  # User pressed Enter
+                            console.print("[italic]No reviewer selected interactively, will use default/config setting if available.[/italic]")
+                            # 'reviewer' remains None, will be handled by subsequent logic
+                            break
+                        
+                        reviewer_choice = int(reviewer_choice_str)
+                        
+                        # Adjust for 1-based indexing
+                        if 1 <= reviewer_choice <= len(available_reviewer_models):
+                            selected_reviewer_info = available_reviewer_models[reviewer_choice - 1]
+                            reviewer = selected_reviewer_info['id']  # Update 'reviewer' variable
+                            console.print(f"Selected reviewer model: [bold cyan]{reviewer}[/bold cyan]")
+                            break
+                        else:
+                            console.print(f"[bold red]Invalid selection. Please enter a valid number from the list.[/bold red]")
+                    except ValueError:
+                        console.print("[bold red]Invalid input. Please enter a number or press Enter.[/bold red]")
+                    except Exception as e:
+                        console.print(f"[bold red]An error occurred during reviewer model selection: {e}. Please try again.[/bold red]")
+            else:
+                # display_reviewer_models printed "No reviewer models configured." or similar
+                console.print("[yellow]No reviewer models available for interactive selection. Will use default/config if set.[/yellow]")
+                # 'reviewer' remains None
+        else:
+            console.print(f"Using reviewer model from CLI: [bold cyan]{reviewer}[/bold cyan]")
 
-    if not final_reviewer_model_id:
-        console.print("[red]No reviewer model specified, selected, or found in config as default. Cannot proceed with review.[/red]")
-        return
-    
-    try:
-        reviewer_client = create_api_client(final_reviewer_model_id, cfg, purpose="reviewer")
+        # Determine the final reviewer model ID and get its configuration
+        final_reviewer_model_id = reviewer  # This is from CLI, interactive selection, or still None
+        if final_reviewer_model_id is None:
+            final_reviewer_model_id = cfg.get('default_reviewer_model') # Fallback to default from config
+
+        if not final_reviewer_model_id:
+            console.print("[red]No reviewer model specified, selected, or found in config as default. Cannot proceed with review.[/red]")
+            return
         
-        # The create_api_client function has already found and validated the model.
-        # We need reviewer_config primarily for the print statement that follows.
-        # We'll retrieve it using the same logic as create_api_client for 'reviewer' purpose.
-        _model_conf = None
-        _primary_list = cfg.get('reviewer_models', [])
-        for m_cfg_iter in _primary_list:
-            if m_cfg_iter.get('id') == final_reviewer_model_id:
-                _model_conf = m_cfg_iter
-                break
-        if not _model_conf:
-            _fallback_list = cfg.get('models', [])
-            for m_cfg_iter in _fallback_list:
+        try:
+            reviewer_client = create_api_client(final_reviewer_model_id, cfg, purpose="reviewer")
+            
+            # The create_api_client function has already found and validated the model.
+            # We need reviewer_config primarily for the print statement that follows.
+            # We'll retrieve it using the same logic as create_api_client for 'reviewer' purpose.
+            _model_conf = None
+            _primary_list = cfg.get('reviewer_models', [])
+            for m_cfg_iter in _primary_list:
                 if m_cfg_iter.get('id') == final_reviewer_model_id:
                     _model_conf = m_cfg_iter
                     break
-        
-        reviewer_config = _model_conf
-        if not reviewer_config:
-            console.print(f"[yellow]Warning: Could not re-fetch reviewer_config for '{final_reviewer_model_id}' for printing, though client creation succeeded.[/yellow]")
-            reviewer_config = {'provider': 'unknown'} # Fallback for print
+            if not _model_conf:
+                _fallback_list = cfg.get('models', [])
+                for m_cfg_iter in _fallback_list:
+                    if m_cfg_iter.get('id') == final_reviewer_model_id:
+                        _model_conf = m_cfg_iter
+                        break
+            
+            reviewer_config = _model_conf
+            if not reviewer_config:
+                console.print(f"[yellow]Warning: Could not re-fetch reviewer_config for '{final_reviewer_model_id}' for printing, though client creation succeeded.[/yellow]")
+                reviewer_config = {'provider': 'unknown'} # Fallback for print
 
-    except ValueError as e:
-        console.print(f"[red]Failed to initialize reviewer API client for '{final_reviewer_model_id}': {e}[/red]")
-        return
-    except Exception as e:
-        console.print(f"[red]An unexpected error occurred while creating API client for reviewer '{final_reviewer_model_id}': {e}[/red]")
-        return
+        except ValueError as e:
+            console.print(f"[red]Failed to initialize reviewer API client for '{final_reviewer_model_id}': {e}[/red]")
+            return
+        except Exception as e:
+            console.print(f"[red]An unexpected error occurred while creating API client for reviewer '{final_reviewer_model_id}': {e}[/red]")
+            return
+            
+        console.print(f"Using reviewer: [bold magenta]{final_reviewer_model_id}[/bold magenta] via provider [bold green]{reviewer_config['provider']}[/bold green]")
+        reviewer_client = create_fallback_router(reviewer_client, final_reviewer_model_id, cfg)
+        if hedge or cfg.get('hedging', {}).get('enabled', False):
+            reviewer_client = create_hedged_client(reviewer_client, final_reviewer_model_id, cfg)
+        if journal is None:
+            journal = RunJournal.create(journals_path, 'review', {'sensor': sensor, 'reviewer': final_reviewer_model_id})
+        # Process reviews
+        logger.info("Starting review process...")
+
+        # 1. Initialization (continued)
+        # The spec implies 'datasheet_path' and 'review_results_path' from cfg, or hardcoded defaults.
         
-    console.print(f"Using reviewer: [bold magenta]{final_reviewer_model_id}[/bold magenta] via provider [bold green]{reviewer_config['provider']}[/bold green]")
-    # Process reviews
-    logger.info("Starting review process...")
-
-    # 1. Initialization (continued)
-    # Note: datasheet_loader and review_logger were initialized earlier (lines 496-497)
-    # We need to ensure they use the correct paths as per spec if different from initial config.
-    # The spec implies 'datasheet_path' and 'review_results_path' from cfg, or hardcoded defaults.
-    
-    official_datasheet_root_path = cfg.get('datasheet_path', 'datasheet/')
-    # Re-initialize or update path if necessary. Assuming OfficialDatasheetLoader can be re-init or path updated.
-    # For simplicity, let's assume re-initialization is fine.
-    datasheet_loader = OfficialDatasheetLoader(official_datasheet_root_path)
-    logger.info(f"OfficialDatasheetLoader re-initialized with specific path: {official_datasheet_root_path}")
+        # Official datasheets are resolved through the shared datasheet index ('datasheet_path' searched first)
+        official_datasheet_roots = datasheet_roots(cfg)
+        content_cache = get_content_cache(cfg)
+        datasheet_loader = OfficialDatasheetLoader(official_datasheet_roots)
+        logger.info(f"OfficialDatasheetLoader initialized with roots: {official_datasheet_roots}")
 
-    review_results_base_path = cfg.get('review_results_path', 'results/reviews/')
-    review_logger = ReviewScoreLogger(review_results_base_path) # Re-initialize
-    logger.info(f"ReviewScoreLogger re-initialized with specific path: {review_results_base_path}")
+        review_results_base_path = cfg.get('review_results_path', 'results/reviews/')
+        review_logger = ReviewScoreLogger(review_results_base_path, cfg)
+        logger.info(f"ReviewScoreLogger initialized with path: {review_results_base_path}")
 
-    try:
-        with open("prompts/review_criteria_prompt.txt", 'r', encoding='utf-8') as f:
-            review_prompt_template = f.read()
-        logger.info("Successfully loaded review_criteria_prompt.txt")
-    except FileNotFoundError:
-        logger.error("prompts/review_criteria_prompt.txt not found.")
-        console.print("[bold red]Error: prompts/review_criteria_prompt.txt not found. Aborting review.[/bold red]")
-        return
-    except Exception as e:
-        logger.error(f"Error loading prompts/review_criteria_prompt.txt: {e}", exc_info=True)
-        console.print(f"[bold red]Error loading review prompt: {e}. Aborting review.[/bold red]")
-        return
-
-    # 2. Determine Sensors to Process
-    # sensors_df is loaded at the beginning of the review function (line 388)
-    sensors_to_process_list = []
-    if sensor == "ALL_SENSORS":
-        if sensors_df is not None and not sensors_df.empty:
-            for _, row_data in sensors_df.iterrows():
-                sensors_to_process_list.append({'brand': row_data['Brand'], 'type': row_data['Type']})
-            logger.info(f"Processing all {len(sensors_to_process_list)} sensors from sensors.csv.")
-        else:
-            logger.warning("ALL_SENSORS selected, but no sensor data loaded (sensors_df is empty or None).")
-            console.print("[yellow]Warning: ALL_SENSORS selected, but no sensor data found in sensors.csv.[/yellow]")
-    else:
-        # Specific sensor 'Brand_Type'
         try:
-            brand_val, sensor_type_val = sensor.split('_', 1)
-            sensors_to_process_list.append({'brand': brand_val, 'type': sensor_type_val})
-            logger.info(f"Processing selected sensor: Brand={brand_val}, Type={sensor_type_val}")
-        except ValueError:
-            logger.error(f"Invalid sensor format: {sensor}. Expected Brand_Type.")
-            console.print(f"[bold red]Error: Invalid sensor format '{sensor}'. Expected Brand_Type. Aborting review.[/bold red]")
+            review_prompt_template = load_template("prompts/review_criteria_prompt.txt")
+            logger.info("Successfully loaded review_criteria_prompt.txt")
+        except FileNotFoundError:
+            logger.error("prompts/review_criteria_prompt.txt not found.")
+            console.print("[bold red]Error: prompts/review_criteria_prompt.txt not found. Aborting review.[/bold red]")
+            return
+        except Exception as e:
+            logger.error(f"Error loading prompts/review_criteria_prompt.txt: {e}", exc_info=True)
+            console.print(f"[bold red]Error loading review prompt: {e}. Aborting review.[/bold red]")
             return
-    
-    if not sensors_to_process_list:
-        console.print("[yellow]No sensors to process. Exiting review.[/yellow]")
-        logger.info("No sensors to process. Exiting review.")
-        return
-
-    # 3. Iterate Through Sensors
-    for sensor_info_item in sensors_to_process_list:
-        current_brand = sensor_info_item['brand']
-        current_sensor_type = sensor_info_item['type']
-        logger.info(f"Reviewing sensor: {current_brand}_{current_sensor_type}")
-        console.print(f"\n[bold blue]Reviewing Sensor: {current_brand} {current_sensor_type}[/bold blue]")
 
-        official_datasheet_content = None
-        official_datasheet_status = "Not Loaded"
-        try:
-            # datasheet_loader was initialized with official_datasheet_root_path
-            official_datasheet_content, official_datasheet_status = datasheet_loader.load_datasheet(current_brand, current_sensor_type)
-            if official_datasheet_content is None:
-                logger.warning(f"Official datasheet not found or failed to load for {current_brand}_{current_sensor_type}. Status: {official_datasheet_status}")
-                console.print(f"  [yellow]Warning: Official datasheet for {current_brand}_{current_sensor_type} not loaded. Status: {official_datasheet_status}. Reviews will note this.[/yellow]")
+        # 2. Determine Sensors to Process
+        # sensors_df is loaded at the beginning of the review function (line 388)
+        sensors_to_process_list = []
+        if sensor == "ALL_SENSORS":
+            if sensors_df is not None and not sensors_df.empty:
+                for _, row_data in sensors_df.iterrows():
+                    sensors_to_process_list.append({'brand': row_data['Brand'], 'type': row_data['Type']})
+                logger.info(f"Processing all {len(sensors_to_process_list)} sensors from sensors.csv.")
             else:
-                logger.info(f"Successfully loaded official datasheet for {current_brand}_{current_sensor_type}. Length: {len(official_datasheet_content)} chars. Status: {official_datasheet_status}")
-        except Exception as e:
-            logger.error(f"Error loading official datasheet for {current_brand}_{current_sensor_type}: {e}", exc_info=True)
-            console.print(f"  [red]Error loading official datasheet for {current_brand}_{current_sensor_type}: {e}. Reviews will note this.[/red]")
-            official_datasheet_status = f"Error loading: {str(e)}"
+                logger.warning("ALL_SENSORS selected, but no sensor data loaded (sensors_df is empty or None).")
+                console.print("[yellow]Warning: ALL_SENSORS selected, but no sensor data found in sensors.csv.[/yellow]")
+        else:
+            # Specific sensor 'Brand_Type'
+            try:
+                brand_val, sensor_type_val = sensor.split('_', 1)
+                sensors_to_process_list.append({'brand': brand_val, 'type': sensor_type_val})
+                logger.info(f"Processing selected sensor: Brand={brand_val}, Type={sensor_type_val}")
+            except ValueError:
+                logger.error(f"Invalid sensor format: {sensor}. Expected Brand_Type.")
+                console.print(f"[bold red]Error: Invalid sensor format '{sensor}'. Expected Brand_Type. Aborting review.[/bold red]")
+                return
         
-        # 4. Find and Iterate Through Generated Datasheets for the Current Sensor
-        sensor_directory_name = f"{current_brand}_{current_sensor_type}"
-        generated_datasheets_dir = os.path.join(cfg.get('results_base_path', 'results/'), sensor_directory_name)
-        search_pattern = os.path.join(generated_datasheets_dir, '*.md')
-        logger.info(f"Searching for generated datasheets in: {generated_datasheets_dir} with pattern: *.md")
-        found_generated_datasheets_paths = glob.glob(search_pattern)
-
-        if not found_generated_datasheets_paths:
-            logger.warning(f"No generated datasheets found in {generated_datasheets_dir} for sensor {current_brand}_{current_sensor_type}")
-            console.print(f"  [yellow]No generated datasheets found in {generated_datasheets_dir}. Skipping review for this sensor.[/yellow]")
-            continue # To the next sensor_info_item
-
-        for gen_ds_path in found_generated_datasheets_paths:
-            filename = os.path.basename(gen_ds_path)
-            logger.info(f"Reviewing generated datasheet: {gen_ds_path}")
-            console.print(f"    [cyan]File: {filename}[/cyan]")
-
-            # Parse filename to extract GeneratorProvider and GeneratorModelName
-            # Filename convention: [GeneratorProvider]_[GeneratorModelName]_[Timestamp...].md
-            filename_stem = filename[:-3] # Remove .md extension
-            parts = filename_stem.split('_')
-
-            if len(parts) < 2: # Need at least Provider_Model
-                logger.warning(f"Filename '{filename}' does not conform to 'Provider_Model[_Timestamp...].md' pattern. Skipping.")
-                console.print(f"      [yellow]Could not parse provider and model from filename '{filename}'. Skipping.[/yellow]")
-                continue # To the next gen_ds_path
-
-            generated_model_provider = parts[0]
-            # Assuming model name is the second part, as per example "openrouter_claude-3.5-haiku_..."
-            generated_model_name_simple = parts[1]
-
-            logger.info(f"Parsed from filename '{filename}': Provider='{generated_model_provider}', ModelName='{generated_model_name_simple}'")
-            console.print(f"    [bold magenta]Generator: {generated_model_provider} - {generated_model_name_simple}[/bold magenta]")
-            
-            generated_datasheet_content = ""
+        if not sensors_to_process_list:
+            console.print("[yellow]No sensors to process. Exiting review.[/yellow]")
+            logger.info("No sensors to process. Exiting review.")
+            return
+
+        # 3. Iterate Through Sensors
+        for sensor_info_item in sensors_to_process_list:
+            current_brand = sensor_info_item['brand']
+            current_sensor_type = sensor_info_item['type']
+            logger.info(f"Reviewing sensor: {current_brand}_{current_sensor_type}")
+            console.print(f"\n[bold blue]Reviewing Sensor: {current_brand} {current_sensor_type}[/bold blue]")
+
+            official_datasheet_content = None
+            official_datasheet_status = "Not Loaded"
+            official_sha256 = ""
             try:
-                with open(gen_ds_path, 'r', encoding='utf-8') as f_gen:
-                    generated_datasheet_content = f_gen.read()
-                logger.info(f"Successfully read generated datasheet: {gen_ds_path}")
+                # datasheet_loader was initialized with official_datasheet_roots
+                official_datasheet_content, official_datasheet_status = datasheet_loader.load_datasheet(current_brand, current_sensor_type)
+                if official_datasheet_content is None:
+                    logger.warning(f"Official datasheet not found or failed to load for {current_brand}_{current_sensor_type}. Status: {official_datasheet_status}")
+                    console.print(f"  [yellow]Warning: Official datasheet for {current_brand}_{current_sensor_type} not loaded. Status: {official_datasheet_status}. Reviews will note this.[/yellow]")
+                else:
+                    logger.info(f"Successfully loaded official datasheet for {current_brand}_{current_sensor_type}. Length: {len(official_datasheet_content)} chars. Status: {official_datasheet_status}")
+                    # Hashed through the content cache, like chunked-review, so both commands key the review index identically
+                    official_entry = datasheet_loader.index.lookup(current_brand, current_sensor_type)
+                    official_sha256 = content_cache.sha256(official_entry.path) if official_entry is not None else ""
             except Exception as e:
-                logger.error(f"Error reading generated datasheet {gen_ds_path}: {e}", exc_info=True)
-                console.print(f"      [red]Error reading file {filename}: {e}. Skipping.[/red]")
-                continue # Next gen_ds_path
+                logger.error(f"Error loading official datasheet for {current_brand}_{current_sensor_type}: {e}", exc_info=True)
+                console.print(f"  [red]Error loading official datasheet for {current_brand}_{current_sensor_type}: {e}. Reviews will note this.[/red]")
+                official_datasheet_status = f"Error loading: {str(e)}"
             
-            # Prepare base log data, common for all outcomes for this file
-            log_data_base = {
-                "Sensor_Brand": current_brand, "Sensor_Type": current_sensor_type,
-                "Generated_Datasheet_LLM_Provider": generated_model_provider, # Parsed from filename
-                "Generated_Datasheet_LLM_Model": generated_model_name_simple,    # Parsed from filename
-                "Generated_Datasheet_Filename": filename,
-                "Official_Datasheet_Status": official_datasheet_status,
-                "Review_Timestamp": datetime.now().isoformat(),
-            }
-            # Reviewer LLM Provider and Model (final_reviewer_model_id is set)
-            reviewer_llm_provider_name_val = "N/A"
-            reviewer_llm_model_name_simple_val = final_reviewer_model_id # Fallback
-            if reviewer_config and reviewer_config.get('provider') != 'unknown':
-                reviewer_llm_provider_name_val = reviewer_config['provider']
-                if final_reviewer_model_id.startswith(reviewer_llm_provider_name_val + '_'):
-                     reviewer_llm_model_name_simple_val = final_reviewer_model_id[len(reviewer_llm_provider_name_val)+1:]
-            
-            log_data_base["Reviewer_LLM_Provider"] = reviewer_llm_provider_name_val
-            log_data_base["Reviewer_LLM_Model"] = reviewer_llm_model_name_simple_val
-
-            if official_datasheet_content is None:
-                logger.warning(f"Skipping LLM review for {gen_ds_path} as official datasheet content is missing.")
-                console.print(f"      [yellow]Skipping LLM review as official datasheet content is missing. Logging status.[/yellow]")
-                log_data_missing_official = {**log_data_base}
-                for i in range(1, 17): # P1-P16
-                    log_data_missing_official[f'P{i}_Score'] = "N/A"
-                    log_data_missing_official[f'P{i}_Justification'] = "Official datasheet content was not available for comparison."
-                log_data_missing_official["Overall_Score"] = "N/A"
-                log_data_missing_official["Overall_Justification"] = "Official datasheet content was not available for comparison."
-                log_data_missing_official["Average_Pn_Score"] = "N/A"
+            # 4. Find and Iterate Through Generated Datasheets for the Current Sensor
+            sensor_directory_name = f"{current_brand}_{current_sensor_type}"
+            generated_datasheets_dir = os.path.join(cfg.get('results_base_path', 'results/'), sensor_directory_name)
+            search_pattern = os.path.join(generated_datasheets_dir, '*.md')
+            logger.info(f"Searching for generated datasheets in: {generated_datasheets_dir} with pattern: *.md")
+            found_generated_datasheets_paths = glob.glob(search_pattern)
+
+            if not found_generated_datasheets_paths:
+                logger.warning(f"No generated datasheets found in {generated_datasheets_dir} for sensor {current_brand}_{current_sensor_type}")
+                console.print(f"  [yellow]No generated datasheets found in {generated_datasheets_dir}. Skipping review for this sensor.[/yellow]")
+                continue # To the next sensor_info_item
+
+            for gen_ds_path in found_generated_datasheets_paths:
+                if not journal.is_done(gen_ds_path):
+                    journal.record(gen_ds_path, RunJournal.PENDING)
+
+            for gen_ds_path in found_generated_datasheets_paths:
+                filename = os.path.basename(gen_ds_path)
+                if journal.is_done(gen_ds_path):
+                    logger.info(f"Skipping {gen_ds_path}: already reviewed according to journal {journal.path}")
+                    console.print(f"    [dim]Skipping {filename} (already reviewed)[/dim]")
+                    continue
+                journal.record(gen_ds_path, RunJournal.IN_FLIGHT)
+                logger.info(f"Reviewing generated datasheet: {gen_ds_path}")
+                console.print(f"    [cyan]File: {filename}[/cyan]")
+
+                # Parse filename to extract GeneratorProvider and GeneratorModelName
+                # Filename convention: [GeneratorProvider]_[GeneratorModelName]_[Timestamp...].md
+                filename_stem = filename[:-3] # Remove .md extension
+                parts = filename_stem.split('_')
+
+                if len(parts) < 2: # Need at least Provider_Model
+                    logger.warning(f"Filename '{filename}' does not conform to 'Provider_Model[_Timestamp...].md' pattern. Skipping.")
+                    console.print(f"      [yellow]Could not parse provider and model from filename '{filename}'. Skipping.[/yellow]")
+                    journal.record(gen_ds_path, RunJournal.FAILED, error="Unparseable filename")
+                    continue # To the next gen_ds_path
+
+                generated_model_provider = parts[0]
+                # Assuming model name is the second part, as per example "openrouter_claude-3.5-haiku_..."
+                generated_model_name_simple = parts[1]
+
+                logger.info(f"Parsed from filename '{filename}': Provider='{generated_model_provider}', ModelName='{generated_model_name_simple}'")
+                console.print(f"    [bold magenta]Generator: {generated_model_provider} - {generated_model_name_simple}[/bold magenta]")
+                
+                generated_datasheet_content = ""
                 try:
-                    scores_dict = {}
-                    just_dict = {}
-                    for i in range(1, 17):
-                        scores_dict[f'P{i}'] = "N/A"
-                        just_dict[f'P{i}'] = "Official datasheet content was not available for comparison."
-                    scores_dict['Overall'] = "N/A"
-                    just_dict['Overall'] = "Official datasheet content was not available for comparison."
-
-                    review_logger.log_review(
-                        reviewer_provider=log_data_missing_official['Reviewer_LLM_Provider'],
-                        reviewer_model=log_data_missing_official['Reviewer_LLM_Model'],
-                        sensor_brand=log_data_missing_official['Sensor_Brand'],
-                        sensor_type=log_data_missing_official['Sensor_Type'],
-                        generator_provider=log_data_missing_official['Generated_Datasheet_LLM_Provider'],
-                        generator_model=log_data_missing_official['Generated_Datasheet_LLM_Model'],
-                        official_datasheet_status=log_data_missing_official['Official_Datasheet_Status'],
-                        scores=scores_dict,
-                        justifications=just_dict
-                    )
-                except Exception as log_e:
-                    logger.error(f"Failed to log missing official datasheet info for {gen_ds_path}: {log_e}", exc_info=True)
-                continue # Next gen_ds_path
-
-            full_review_prompt = review_prompt_template.replace("{{OFFICIAL_DATASHEET_CONTENT}}", official_datasheet_content)
-            full_review_prompt = full_review_prompt.replace("{{GENERATED_DATASHEET_CONTENT}}", generated_datasheet_content)
-            
-            # Add these lines to replace the sensor brand and model placeholders
-            full_review_prompt = full_review_prompt.replace("{{SENSOR_BRAND}}", current_brand)
-            full_review_prompt = full_review_prompt.replace("{{SENSOR_MODEL}}", current_sensor_type)
-            
-            review_response_json_str = None
-            review_response_data = {}
-            try:
-                logger.info(f"Sending review request to {final_reviewer_model_id} for {gen_ds_path}. Prompt length: {len(full_review_prompt)}")
+                    generated_datasheet_content = content_cache.read(gen_ds_path)
+                    generated_sha256 = content_cache.sha256(gen_ds_path)
+                    logger.info(f"Successfully read generated datasheet: {gen_ds_path}")
+                except Exception as e:
+                    logger.error(f"Error reading generated datasheet {gen_ds_path}: {e}", exc_info=True)
+                    console.print(f"      [red]Error reading file {filename}: {e}. Skipping.[/red]")
+                    journal.record(gen_ds_path, RunJournal.FAILED, error=str(e)[:500])
+                    continue # Next gen_ds_path
                 
-                # Add retry mechanism for API calls
-                max_retries = 3
-                retry_delay = 5  # seconds
-                last_error = None
+                # Incremental review: skip files this reviewer already scored against the same official datasheet
+                if not force and review_logger.has_review(final_reviewer_model_id, generated_sha256, official_sha256):
+                    logger.info(f"Skipping {gen_ds_path}: already reviewed by {final_reviewer_model_id} with identical contents")
+                    console.print(f"      [dim]Skipping (already reviewed by {final_reviewer_model_id}; contents unchanged)[/dim]")
+                    journal.record(gen_ds_path, RunJournal.DONE, skipped="unchanged")
+                    continue # Next gen_ds_path
                 
-                for retry_attempt in range(max_retries):
+                # Prepare base log data, common for all outcomes for this file
+                log_data_base = {
+                    "Sensor_Brand": current_brand, "Sensor_Type": current_sensor_type,
+                    "Generated_Datasheet_LLM_Provider": generated_model_provider, # Parsed from filename
+                    "Generated_Datasheet_LLM_Model": generated_model_name_simple,    # Parsed from filename
+                    "Generated_Datasheet_Filename": filename,
+                    "Official_Datasheet_Status": official_datasheet_status,
+                    "Review_Timestamp": datetime.now().isoformat(),
+                }
+                # Reviewer LLM Provider and Model (final_reviewer_model_id is set)
+                reviewer_llm_provider_name_val = "N/A"
+                reviewer_llm_model_name_simple_val = final_reviewer_model_id # Fallback
+                if reviewer_config and reviewer_config.get('provider') != 'unknown':
+                    reviewer_llm_provider_name_val = reviewer_config['provider']
+                    if final_reviewer_model_id.startswith(reviewer_llm_provider_name_val + '_'):
+                         reviewer_llm_model_name_simple_val = final_reviewer_model_id[len(reviewer_llm_provider_name_val)+1:]
+                
+                log_data_base["Reviewer_LLM_Provider"] = reviewer_llm_provider_name_val
+                log_data_base["Reviewer_LLM_Model"] = reviewer_llm_model_name_simple_val
+
+                if official_datasheet_content is None:
+                    logger.warning(f"Skipping LLM review for {gen_ds_path} as official datasheet content is missing.")
+                    console.print(f"      [yellow]Skipping LLM review as official datasheet content is missing. Logging status.[/yellow]")
+                    log_data_missing_official = {**log_data_base}
+                    for i in range(1, 17): # P1-P16
+                        log_data_missing_official[f'P{i}_Score'] = "N/A"
+                        log_data_missing_official[f'P{i}_Justification'] = "Official datasheet content was not available for comparison."
+                    log_data_missing_official["Overall_Score"] = "N/A"
+                    log_data_missing_official["Overall_Justification"] = "Official datasheet content was not available for comparison."
+                    log_data_missing_official["Average_Pn_Score"] = "N/A"
                     try:
-                        if retry_attempt > 0:
-                            logger.info(f"Retry attempt {retry_attempt}/{max_retries} for {gen_ds_path}")
-                            console.print(f"      [yellow]Retry attempt {retry_attempt}/{max_retries}...[/yellow]")
-                            time.sleep(retry_delay * retry_attempt)  # Exponential backoff
-                            
-                        api_response = reviewer_client.send_request(model=final_reviewer_model_id, prompt=full_review_prompt)
-                        
-                        if isinstance(api_response, dict) and 'text' in api_response:
-                            review_response_json_str = api_response['text']
-                        elif isinstance(api_response, str):
-                            review_response_json_str = api_response
-                        else:
-                            logger.warning(f"Unexpected response type from reviewer LLM: {type(api_response)}. Attempting to stringify.")
-                            review_response_json_str = str(api_response)
-                        
-                        logger.info(f"Received review from {final_reviewer_model_id} for {gen_ds_path}. Response length: {len(review_response_json_str if review_response_json_str else '')}")
-                        
-                        # Break out of retry loop on success
-                        break
-                        
-                    except Exception as retry_e:
-                        last_error = retry_e
-                        logger.warning(f"API call attempt {retry_attempt+1}/{max_retries} failed: {str(retry_e)}")
-                        if retry_attempt == max_retries - 1:
-                            # Re-raise the exception on the last retry attempt
-                            raise last_error
+                        scores_dict = {}
+                        just_dict = {}
+                        for i in range(1, 17):
+                            scores_dict[f'P{i}'] = "N/A"
+                            just_dict[f'P{i}'] = "Official datasheet content was not available for comparison."
+                        scores_dict['Overall'] = "N/A"
+                        just_dict['Overall'] = "Official datasheet content was not available for comparison."
+
+                        review_logger.log_review(
+                            reviewer_provider=log_data_missing_official['Reviewer_LLM_Provider'],
+                            reviewer_model=log_data_missing_official['Reviewer_LLM_Model'],
+                            sensor_brand=log_data_missing_official['Sensor_Brand'],
+                            sensor_type=log_data_missing_official['Sensor_Type'],
+                            generator_provider=log_data_missing_official['Generated_Datasheet_LLM_Provider'],
+                            generator_model=log_data_missing_official['Generated_Datasheet_LLM_Model'],
+                            official_datasheet_status=log_data_missing_official['Official_Datasheet_Status'],
+                            scores=scores_dict,
+                            justifications=just_dict,
+                            generated_filename=filename,
+                            generated_sha256=generated_sha256,
+                            official_sha256=official_sha256,
+                            # Indexed with an empty official hash, so the file is reviewed once an official datasheet appears
+                            reviewer_model_id=final_reviewer_model_id
+                        )
+                        journal.record(gen_ds_path, RunJournal.DONE, official_datasheet_status=official_datasheet_status)
+                    except Exception as log_e:
+                        logger.error(f"Failed to log missing official datasheet info for {gen_ds_path}: {log_e}", exc_info=True)
+                        journal.record(gen_ds_path, RunJournal.FAILED, error=str(log_e)[:500])
+                    continue # Next gen_ds_path
+
+                full_review_prompt = review_prompt_template.render(
+                    official_datasheet=official_datasheet_content,
+                    generated_datasheet=generated_datasheet_content,
+                    SENSOR_BRAND=current_brand,
+                    SENSOR_MODEL=current_sensor_type
+                )
                 
-            except Exception as e:
-                logger.error(f"Error calling reviewer LLM for {gen_ds_path}: {e}", exc_info=True)
-                console.print(f"      [red]Error calling reviewer LLM: {e}. Skipping this file.[/red]")
-                log_data_failed_review = {**log_data_base}
-                for i in range(1, 17): log_data_failed_review[f'P{i}_Score'] = "LLM_Error"; log_data_failed_review[f'P{i}_Justification'] = f"LLM API Error: {str(e)[:250]}"
-                log_data_failed_review["Overall_Score"] = "LLM_Error"; log_data_failed_review["Overall_Justification"] = f"LLM API Error: {str(e)[:250]}"
-                log_data_failed_review["Average_Pn_Score"] = "LLM_Error"
+                review_response_json_str = None
+                review_response_data = {}
+                api_response = None
                 try:
-                    scores_dict = {}
-                    just_dict = {}
-                    for i in range(1, 17):
-                        scores_dict[f'P{i}'] = "LLM_Error"
-                        just_dict[f'P{i}'] = f"LLM API Error: {str(e)[:250]}"
-                    scores_dict['Overall'] = "LLM_Error"
-                    just_dict['Overall'] = f"LLM API Error: {str(e)[:250]}"
-
-                    review_logger.log_review(
-                        reviewer_provider=log_data_failed_review.get('Reviewer_LLM_Provider'),
-                        reviewer_model=log_data_failed_review.get('Reviewer_LLM_Model'),
-                        sensor_brand=log_data_failed_review.get('Sensor_Brand'),
-                        sensor_type=log_data_failed_review.get('Sensor_Type'),
-                        generator_provider=log_data_failed_review.get('Generated_Datasheet_LLM_Provider'),
-                        generator_model=log_data_failed_review.get('Generated_Datasheet_LLM_Model'),
-                        official_datasheet_status=log_data_failed_review.get('Official_Datasheet_Status', 'Error during review'),
-                        scores={},
-                        justifications={}
-                    )
-                except Exception as log_e: logger.error(f"Failed to log API error info for {gen_ds_path}: {log_e}", exc_info=True)
-                continue # Next gen_ds_path
-            
-            if review_response_json_str:
-                try:
-                    # Use our new robust JSON parser instead of manual JSON parsing
-                    sensor_info = f"{current_brand}_{current_sensor_type}"
-                    model_info = f"{generated_model_provider}_{generated_model_name_simple}"
+                    logger.info(f"Sending review request to {final_reviewer_model_id} for {gen_ds_path}. Prompt length: {len(full_review_prompt)}")
                     
-                    scores_dict, justifications_dict, error_msg = extract_json_from_llm_response(
-                        review_response_json_str, 
-                        sensor_info=sensor_info,
-                        model_info=model_info
-                    )
+                    # Add retry mechanism for API calls
+                    max_retries = 3
+                    retry_delay = 5  # seconds
+                    last_error = None
                     
-                    if error_msg:
-                        logger.warning(f"Warning while parsing review for {gen_ds_path}: {error_msg}")
-                        console.print(f"      [yellow]Warning while parsing review: {error_msg}[/yellow]")
+                    for retry_attempt in range(max_retries):
+                        try:
+                            if retry_attempt > 0:
+                                logger.info(f"Retry attempt {retry_attempt}/{max_retries} for {gen_ds_path}")
+                                console.print(f"      [yellow]Retry attempt {retry_attempt}/{max_retries}...[/yellow]")
+                                time.sleep(retry_delay * retry_attempt)  # Exponential backoff
+                                
+                            api_response = reviewer_client.send_request(model=final_reviewer_model_id, prompt=full_review_prompt)
+                            
+                            if isinstance(api_response, dict) and 'text' in api_response:
+                                review_response_json_str = api_response['text']
+                            elif isinstance(api_response, str):
+                                review_response_json_str = api_response
+                            else:
+                                logger.warning(f"Unexpected response type from reviewer LLM: {type(api_response)}. Attempting to stringify.")
+                                review_response_json_str = str(api_response)
+                            
+                            # Hedged or circuit-routed requests may be answered by the fallback model; log the review under it
+                            if isinstance(api_response, dict) and api_response.get('model', final_reviewer_model_id) != final_reviewer_model_id:
+                                reviewer_llm_provider_name_val = api_response['provider']
+                                reviewer_llm_model_name_simple_val = api_response['model']
+                            
+                            logger.info(f"Received review from {final_reviewer_model_id} for {gen_ds_path}. Response length: {len(review_response_json_str if review_response_json_str else '')}")
+                            
+                            # Break out of retry loop on success
+                            break
+                            
+                        except CircuitOpenError:
+                            # Retrying cannot help while the circuit is open
+                            raise
+                        except Exception as retry_e:
+                            last_error = retry_e
+                            logger.warning(f"API call attempt {retry_attempt+1}/{max_retries} failed: {str(retry_e)}")
+                            if retry_attempt == max_retries - 1:
+                                # Re-raise the exception on the last retry attempt
+                                raise last_error
                     
-                    # Handle API errors gracefully
-                    if not scores_dict and error_msg and error_msg.startswith("API error:"):
-                        logger.error(f"API error for {gen_ds_path}: {error_msg}")
-                        console.print(f"      [red]API error detected: {error_msg}. Logging with N/A values.[/red]")
-                        
-                        # Create empty scores with 'API_Error' as values
+                except Exception as e:
+                    logger.error(f"Error calling reviewer LLM for {gen_ds_path}: {e}", exc_info=True)
+                    console.print(f"      [red]Error calling reviewer LLM: {e}. Skipping this file.[/red]")
+                    log_data_failed_review = {**log_data_base}
+                    for i in range(1, 17): log_data_failed_review[f'P{i}_Score'] = "LLM_Error"; log_data_failed_review[f'P{i}_Justification'] = f"LLM API Error: {str(e)[:250]}"
+                    log_data_failed_review["Overall_Score"] = "LLM_Error"; log_data_failed_review["Overall_Justification"] = f"LLM API Error: {str(e)[:250]}"
+                    log_data_failed_review["Average_Pn_Score"] = "LLM_Error"
+                    try:
                         scores_dict = {}
-                        justifications_dict = {}
+                        just_dict = {}
+                        for i in range(1, 17):
+                            scores_dict[f'P{i}'] = "LLM_Error"
+                            just_dict[f'P{i}'] = f"LLM API Error: {str(e)[:250]}"
+                        scores_dict['Overall'] = "LLM_Error"
+                        just_dict['Overall'] = f"LLM API Error: {str(e)[:250]}"
+
+                        review_logger.log_review(
+                            reviewer_provider=log_data_failed_review.get('Reviewer_LLM_Provider'),
+                            reviewer_model=log_data_failed_review.get('Reviewer_LLM_Model'),
+                            sensor_brand=log_data_failed_review.get('Sensor_Brand'),
+                            sensor_type=log_data_failed_review.get('Sensor_Type'),
+                            generator_provider=log_data_failed_review.get('Generated_Datasheet_LLM_Provider'),
+                            generator_model=log_data_failed_review.get('Generated_Datasheet_LLM_Model'),
+                            official_datasheet_status=log_data_failed_review.get('Official_Datasheet_Status', 'Error during review'),
+                            scores={},
+                            justifications={},
+                            generated_filename=filename,
+                            generated_sha256=generated_sha256,
+                            official_sha256=official_sha256
+                        )
+                    except Exception as log_e: logger.error(f"Failed to log API error info for {gen_ds_path}: {log_e}", exc_info=True)
+                    journal.record(gen_ds_path, RunJournal.FAILED, error=str(e)[:500])
+                    continue # Next gen_ds_path
+                
+                if review_response_json_str:
+                    try:
+                        # Use our new robust JSON parser instead of manual JSON parsing
+                        sensor_info = f"{current_brand}_{current_sensor_type}"
+                        model_info = f"{generated_model_provider}_{generated_model_name_simple}"
+                        
+                        scores_dict, justifications_dict, error_msg = extract_json_from_llm_response(
+                            review_response_json_str, 
+                            sensor_info=sensor_info,
+                            model_info=model_info
+                        )
+                        
+                        if error_msg:
+                            logger.warning(f"Warning while parsing review for {gen_ds_path}: {error_msg}")
+                            console.print(f"      [yellow]Warning while parsing review: {error_msg}[/yellow]")
+                        
+                        # Handle API errors gracefully
+                        if not scores_dict and error_msg and error_msg.startswith("API error:"):
+                            logger.error(f"API error for {gen_ds_path}: {error_msg}")
+                            console.print(f"      [red]API error detected: {error_msg}. Logging with N/A values.[/red]")
+                            
+                            # Create empty scores with 'API_Error' as values
+                            scores_dict = {}
+                            justifications_dict = {}
+                            for i in range(1, 17):
+                                scores_dict[f'P{i}'] = "API_Error"
+                                justifications_dict[f'P{i}'] = f"API Error: {error_msg}"
+                            scores_dict['Overall'] = "API_Error"
+                            justifications_dict['Overall'] = f"API Error: {error_msg}"
+                            
+                            # Still log the review with error indicators
+                            review_logger.log_review(
+                                reviewer_provider=reviewer_llm_provider_name_val,
+                                reviewer_model=reviewer_llm_model_name_simple_val,
+                                sensor_brand=current_brand,
+                                sensor_type=current_sensor_type,
+                                generator_provider=generated_model_provider,
+                                generator_model=generated_model_name_simple,
+                                official_datasheet_status=official_datasheet_status,
+                                scores=scores_dict,
+                                justifications=justifications_dict,
+                                generated_filename=filename,
+                                generated_sha256=generated_sha256,
+                                official_sha256=official_sha256
+                            )
+                            console.print(f"      [yellow]Review logged with API_Error indicators.[/yellow]")
+                            # Do not let the next run get the same unusable reply back from the response cache
+                            discard_cached_response(api_response)
+                            journal.record(gen_ds_path, RunJournal.FAILED, error=error_msg[:500])
+                            continue  # Move to next datasheet
+                            
+                        elif not scores_dict:
+                            # If no scores could be extracted and it wasn't an API error, raise exception
+                            discard_cached_response(api_response)
+                            raise ValueError("Failed to extract any scores from the LLM response")
+                            
+                        logger.info(f"Successfully parsed review data with {len(scores_dict)} scores for {gen_ds_path}")
+                        
+                        # Calculate Average_Pn_Score
+                        p_scores = []
                         for i in range(1, 17):
-                            scores_dict[f'P{i}'] = "API_Error"
-                            justifications_dict[f'P{i}'] = f"API Error: {error_msg}"
-                        scores_dict['Overall'] = "API_Error"
-                        justifications_dict['Overall'] = f"API Error: {error_msg}"
+                            p_key = f"P{i}"
+                            if p_key in scores_dict and isinstance(scores_dict[p_key], (int, float)):
+                                p_scores.append(scores_dict[p_key])
                         
-                        # Still log the review with error indicators
+                        if p_scores:
+                            average_pn_score = sum(p_scores) / len(p_scores)
+                            scores_dict['Average_Pn_Score'] = round(average_pn_score, 2)
+                        else:
+                            scores_dict['Average_Pn_Score'] = "N/A"
+
                         review_logger.log_review(
                             reviewer_provider=reviewer_llm_provider_name_val,
                             reviewer_model=reviewer_llm_model_name_simple_val,
@@ -805,57 +1263,47 @@ def review(config, reviewer, sensor):
                             generator_model=generated_model_name_simple,
                             official_datasheet_status=official_datasheet_status,
                             scores=scores_dict,
-                            justifications=justifications_dict
+                            justifications=justifications_dict,
+                            generated_filename=filename,
+                            generated_sha256=generated_sha256,
+                            official_sha256=official_sha256,
+                            reviewer_model_id=final_reviewer_model_id
                         )
-                        console.print(f"      [yellow]Review logged with API_Error indicators.[/yellow]")
-                        continue  # Move to next datasheet
-                        
-                    elif not scores_dict:
-                        # If no scores could be extracted and it wasn't an API error, raise exception
-                        raise ValueError("Failed to extract any scores from the LLM response")
-                        
-                    logger.info(f"Successfully parsed review data with {len(scores_dict)} scores for {gen_ds_path}")
-                    
-                    # Calculate Average_Pn_Score
-                    p_scores = []
-                    for i in range(1, 17):
-                        p_key = f"P{i}"
-                        if p_key in scores_dict and isinstance(scores_dict[p_key], (int, float)):
-                            p_scores.append(scores_dict[p_key])
-                    
-                    if p_scores:
-                        average_pn_score = sum(p_scores) / len(p_scores)
-                        scores_dict['Average_Pn_Score'] = round(average_pn_score, 2)
-                    else:
-                        scores_dict['Average_Pn_Score'] = "N/A"
-
-                    review_logger.log_review(
-                        reviewer_provider=reviewer_llm_provider_name_val,
-                        reviewer_model=reviewer_llm_model_name_simple_val,
-                        sensor_brand=current_brand,
-                        sensor_type=current_sensor_type,
-                        generator_provider=generated_model_provider,
-                        generator_model=generated_model_name_simple,
-                        official_datasheet_status=official_datasheet_status,
-                        scores=scores_dict,
-                        justifications=justifications_dict
-                    )
-                    console.print(f"      [green]✓ Review scores extracted and logged successfully.[/green]")
-                except Exception as e:
-                    logger.error(f"Error processing review data for {gen_ds_path}: {e}", exc_info=True)
-                    console.print(f"      [red]Error processing review data: {e}.[/red]")
-
-    console.print("\n[bold green]Review process completed for all selected sensors and models.[/bold green]")
-    logger.info("Review process finished.")
+                        console.print(f"      [green]✓ Review scores extracted and logged successfully.[/green]")
+                        journal.record(gen_ds_path, RunJournal.DONE)
+                    except Exception as e:
+                        logger.error(f"Error processing review data for {gen_ds_path}: {e}", exc_info=True)
+                        console.print(f"      [red]Error processing review data: {e}.[/red]")
+                        journal.record(gen_ds_path, RunJournal.FAILED, error=str(e)[:500])
+                else:
+                    discard_cached_response(api_response)
+                    journal.record(gen_ds_path, RunJournal.FAILED, error="Empty response from reviewer")
+        print_hedge_stats(reviewer_client)
+        print_content_cache_stats()
+        console.print("\n[bold green]Review process completed for all selected sensors and models.[/bold green]")
+        logger.info("Review process finished.")
+    finally:
+        # Early returns and errors still close the journal and review store and stop the hedging threads
+        if journal is not None:
+            journal.close()
+        if review_logger is not None:
+            review_logger.close()
+        close_hedged_client(reviewer_client)
 
 @cli.command()
 @click.option('--config', default='config/config.yaml', help='Path to configuration file')
 @click.option('--reviewer', help="Specific reviewer model to use. If omitted, you'll be prompted to select from available models.")
 @click.option('--sensor', help="Sensor to review (Brand_Type format). If omitted, you'll be prompted to select from a list (supports 'all').")
-def chunked_review(config, reviewer, sensor):
+@click.option('--bypass-cache', is_flag=True, help='Ignore cached LLM responses (fresh responses are still cached)')
+@click.option('--resume', is_flag=True, help='Resume the most recent chunked review, skipping datasheets it already reviewed')
+@click.option('--hedge', is_flag=True, help='Send a duplicate request to the fallback model when the reviewer runs past its p95 latency')
+@click.option('--force', is_flag=True, help='Review every datasheet again, even ones this reviewer already scored with the same contents')
+def chunked_review(config, reviewer, sensor, bypass_cache, resume, hedge, force):
     """Review sensor datasheets by breaking the task into smaller chunks.
     This command handles large datasheets without hitting API token limits by processing reviews in 3 chunks.
     """
+    journal = None
+    reviewer_client = None
     try:
         logger.info("Starting chunked_review command")
         # Create logs directory if it doesn't exist
@@ -873,12 +1321,23 @@ def chunked_review(config, reviewer, sensor):
         # Load configuration
         logger.debug(f"Loading config from {config}")
         cfg = load_config(config)
+        apply_cache_bypass(cfg, bypass_cache)
         logger.debug("Config loaded successfully")
         
         # Load sensor data for selection
         logger.debug(f"Loading sensor data from {cfg.get('data_path')}")
         sensors_df = pd.read_csv(cfg['data_path'])
         logger.debug(f"Loaded {len(sensors_df)} sensors from CSV")
+        
+        journals_path = cfg.get('journals_path', 'logs/journals/')
+        if resume:
+            journal = RunJournal.latest(journals_path, 'chunked-review')
+            if journal is None:
+                console.print(f"[bold red]No chunked-review journal found in {journals_path}. Nothing to resume.[/bold red]")
+                return
+            sensor = journal.args.get('sensor')
+            reviewer = journal.args.get('reviewer')
+            console.print(f"[bold]Resuming chunked review from {journal.path}[/bold] ({journal.summary()})")
 
         if sensor is None:
             logger.debug("No sensor provided via CLI, prompting for selection")
@@ -996,6 +1455,9 @@ def chunked_review(config, reviewer, sensor):
             return
             
         console.print(f"Using reviewer: [bold magenta]{final_reviewer_model_id}[/bold magenta] via provider [bold green]{reviewer_config['provider']}[/bold green]")
+        reviewer_client = create_fallback_router(reviewer_client, final_reviewer_model_id, cfg)
+        if hedge or cfg.get('hedging', {}).get('enabled', False):
+            reviewer_client = create_hedged_client(reviewer_client, final_reviewer_model_id, cfg)
         
         # Initialize ChunkedReviewer
         logger.info("Initializing ChunkedReviewer")
@@ -1024,6 +1486,9 @@ def chunked_review(config, reviewer, sensor):
                 
             chunked_reviewer = ChunkedReviewer(reviewer_client, cfg, logger)
             logger.debug("ChunkedReviewer initialized successfully")
+            
+            if journal is None:
+                journal = RunJournal.create(journals_path, 'chunked-review', {'sensor': sensor, 'reviewer': final_reviewer_model_id})
         except Exception as e:
             logger.error(f"Error initializing ChunkedReviewer: {e}", exc_info=True)
             console.print(f"[red]Error initializing ChunkedReviewer: {e}[/red]")
@@ -1081,10 +1546,22 @@ def chunked_review(config, reviewer, sensor):
                     continue
                     
                 console.print(f"  [green]Found {len(found_datasheets)} generated datasheets to review[/green]")
+                for datasheet_path in found_datasheets:
+                    if not journal.is_done(datasheet_path):
+                        journal.record(datasheet_path, RunJournal.PENDING)
                 
                 # Process each generated datasheet
                 for datasheet_path in found_datasheets:
                     filename = os.path.basename(datasheet_path)
+                    if journal.is_done(datasheet_path):
+                        logger.info(f"Skipping {datasheet_path}: already reviewed according to journal {journal.path}")
+                        console.print(f"    [dim]Skipping {filename} (already reviewed)[/dim]")
+                        continue
+                    if not force and chunked_reviewer.already_reviewed(final_reviewer_model_id, current_brand, current_sensor_type, datasheet_path):
+                        logger.info(f"Skipping {datasheet_path}: already reviewed by {final_reviewer_model_id} with identical contents")
+                        console.print(f"    [dim]Skipping {filename} (already reviewed; contents unchanged)[/dim]")
+                        journal.record(datasheet_path, RunJournal.DONE, skipped="unchanged")
+                        continue
                     logger.info(f"Processing datasheet: {datasheet_path}")
                     console.print(f"    [cyan]Processing: {filename}[/cyan]")
                     
@@ -1095,11 +1572,13 @@ def chunked_review(config, reviewer, sensor):
                     if len(parts) < 2:
                         logger.warning(f"Could not parse provider and model from filename '{filename}'")
                         console.print(f"      [yellow]Could not parse provider and model from filename '{filename}'. Skipping.[/yellow]")
+                        journal.record(datasheet_path, RunJournal.FAILED, error="Unparseable filename")
                         continue
                     
                     # Process review in chunks
                     try:
                         logger.info("Starting chunked review process")
+                        journal.record(datasheet_path, RunJournal.IN_FLIGHT)
                         review = chunked_reviewer.review_sensor(
                             final_reviewer_model_id, 
                             current_brand, 
@@ -1111,12 +1590,15 @@ def chunked_review(config, reviewer, sensor):
                             logger.info(f"Successfully completed chunked review with overall score {review.overall_score}")
                             console.print(f"      [green]✓ Successfully completed chunked review[/green]")
                             console.print(f"      [green]✓ Overall score: {review.overall_score}[/green]")
+                            journal.record(datasheet_path, RunJournal.DONE, overall_score=review.overall_score)
                         else:
                             logger.error("Failed to complete review")
                             console.print(f"      [red]✗ Failed to complete review[/red]")
+                            journal.record(datasheet_path, RunJournal.FAILED, error="Failed to complete review")
                     except Exception as e:
                         logger.error(f"Error during chunked review: {str(e)}", exc_info=True)
                         console.print(f"      [red]✗ Error during chunked review: {str(e)}[/red]")
+                        journal.record(datasheet_path, RunJournal.FAILED, error=str(e)[:500])
                     
                 # Add delay between sensors if more sensors to process
                 if idx < len(sensors_to_process_list) - 1:
@@ -1126,6 +1608,8 @@ def chunked_review(config, reviewer, sensor):
                         console.print(f"  [yellow]Waiting {delay_seconds} seconds before next sensor...[/yellow]")
                         time.sleep(delay_seconds)
         
+        print_hedge_stats(reviewer_client)
+        print_content_cache_stats()
         logger.info("Chunked review process completed!")
         console.print("\n[bold green]Chunked review process completed![/bold green]")
         
@@ -1134,6 +1618,11 @@ def chunked_review(config, reviewer, sensor):
         console.print(f"[bold red]An unexpected error occurred: {str(e)}[/bold red]")
         import traceback
         console.print(f"[dim]{traceback.format_exc()}[/dim]")
+    finally:
+        # Early returns and errors still close the journal and stop the hedging threads
+        if journal is not None:
+            journal.close()
+        close_hedged_client(reviewer_client)
 
 
 if __name__ == "__main__":
@@ -7,6 +7,12 @@ import csv
 from datetime import datetime
 
 class MetricsLogger:
+    FIELD_NAMES = [
+        'Timestamp', 'SensorBrand', 'SensorType', 'Model', 
+        'ResponseTimeSeconds', 'InputTokens', 'OutputTokens', 'ResponseLengthChars',
+        'TimeToFirstTokenSeconds', 'DecodeTokensPerSecond'
+    ]
+    
     def __init__(self, log_path):
         """
         Initialize the metrics logger.
@@ -21,12 +27,27 @@ class MetricsLogger:
         if not os.path.exists(log_path):
             with open(log_path, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow([
-                    'Timestamp', 'SensorBrand', 'SensorType', 'Model', 
-                    'ResponseTimeSeconds', 'InputTokens', 'OutputTokens', 'ResponseLengthChars'
-                ])
+                writer.writerow(self.FIELD_NAMES)
+        else:
+            self._upgrade_header()
+    
+    def _upgrade_header(self):
+        """Rewrite a log created with an older header so that every row has the current columns."""
+        with open(self.log_path, 'r', newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        if not rows or rows[0] == self.FIELD_NAMES:
+            return
+        padding = len(self.FIELD_NAMES) - len(rows[0])
+        if padding <= 0:
+            return
+        with open(self.log_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.FIELD_NAMES)
+            for row in rows[1:]:
+                writer.writerow(row + [''] * padding)
     
-    def log_metrics(self, sensor_brand, sensor_type, model, response_time, input_tokens, output_tokens, response_length):
+    def log_metrics(self, sensor_brand, sensor_type, model, response_time, input_tokens, output_tokens, response_length,
+                    time_to_first_token=None, decode_tokens_per_second=None):
         """
         Log performance metrics for an LLM response.
         
@@ -34,15 +55,19 @@ class MetricsLogger:
             sensor_brand (str): Brand of the sensor
             sensor_type (str): Type/model of the sensor
             model (str): Model identifier (e.g., "openai/gpt-4")
-            response_time (float): Response time in seconds
+            response_time (float): Total response time in seconds
             input_tokens (int): Number of input tokens
             output_tokens (int): Number of output tokens
             response_length (int): Length of response in characters
+            time_to_first_token (float, optional): Seconds until the first streamed token arrived
+            decode_tokens_per_second (float, optional): Output tokens per second after the first token
         """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         with open(self.log_path, 'a', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow([
                 timestamp, sensor_brand, sensor_type, model, 
-                response_time, input_tokens, output_tokens, response_length
+                response_time, input_tokens, output_tokens, response_length,
+                '' if time_to_first_token is None else time_to_first_token,
+                '' if decode_tokens_per_second is None else decode_tokens_per_second
             ])
\ No newline at end of file
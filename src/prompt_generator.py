@@ -2,16 +2,17 @@
 Module for generating prompts from templates and sensor data.
 """
 
+from src.prompt_template import load_template, FORMAT
+
 class PromptGenerator:
     def __init__(self, template_path):
         """
         Initialize the prompt generator with a template file.
         
         Args:
-            template_path (str): Path to the prompt template file
+            template_path (str): Path to the prompt template file ({name} placeholders, as in str.format)
         """
-        with open(template_path, 'r', encoding='utf-8') as f:
-            self.template = f.read()
+        self.template = load_template(template_path, style=FORMAT)
     
     def generate_prompt(self, sensor_brand, sensor_type, datasheet_content):
         """
@@ -25,7 +26,7 @@ class PromptGenerator:
         Returns:
             str: Generated prompt text
         """
-        return self.template.format(
+        return self.template.render(
             sensor_brand=sensor_brand,
             sensor_type=sensor_type,
             datasheet_content=datasheet_content
@@ -0,0 +1,151 @@
+"""
+Compiled prompt templates rendered in a single pass.
+
+A template is parsed once into literal text and placeholder slots. Rendering
+joins the pieces with the values in one pass, so multi-kilobyte datasheets are
+copied exactly once (into the final prompt) instead of once per placeholder as
+with chained str.replace calls. Values are never re-scanned for placeholders.
+"""
+
+import os
+import re
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# {{name}} placeholders (review prompts)
+MUSTACHE = "mustache"
+# {name} placeholders with {{ / }} escapes, as in str.format (generation prompts)
+FORMAT = "format"
+
+_MUSTACHE_PATTERN = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+_FORMAT_PATTERN = re.compile(r"\{\{|\}\}|\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+# Compiled templates loaded from files: (path, style) -> (mtime_ns, size, PromptTemplate)
+_template_cache = {}
+_template_cache_lock = threading.Lock()
+
+
+class PromptTemplate:
+    """A template compiled into literal segments and placeholder slots."""
+
+    def __init__(self, text, style=MUSTACHE, name=None):
+        """
+        Compile a template.
+
+        Args:
+            text (str): Template text
+            style (str): MUSTACHE for {{name}} placeholders or FORMAT for str.format-style {name}
+            name (str, optional): Name used in error messages (e.g. the template path)
+
+        Raises:
+            ValueError: If the style is unknown
+        """
+        if style not in (MUSTACHE, FORMAT):
+            raise ValueError(f"Unknown template style: {style}")
+        self.source = text
+        self.style = style
+        self.name = name or "<template>"
+        self.parts, self.slots = self._compile(text, style)
+        self.placeholders = frozenset(self.slots)
+
+    @staticmethod
+    def _compile(text, style):
+        """
+        Split the text into parts.
+
+        Returns:
+            tuple: (parts, slots) - parts holds literal strings and None for each
+                placeholder; slots maps placeholder name -> indexes into parts
+        """
+        parts = []
+        slots = {}
+        literal = []
+        position = 0
+        pattern = _MUSTACHE_PATTERN if style == MUSTACHE else _FORMAT_PATTERN
+        for match in pattern.finditer(text):
+            literal.append(text[position:match.start()])
+            position = match.end()
+            token = match.group(0)
+            if style == FORMAT and token in ("{{", "}}"):
+                literal.append(token[0])
+                continue
+            parts.append("".join(literal))
+            literal = []
+            slots.setdefault(match.group(1), []).append(len(parts))
+            parts.append(None)
+        literal.append(text[position:])
+        parts.append("".join(literal))
+        return parts, slots
+
+    def render(self, **values):
+        """
+        Fill in every placeholder in one pass.
+
+        Args:
+            **values: Placeholder name -> text
+
+        Returns:
+            str: The rendered prompt
+
+        Raises:
+            KeyError: If a placeholder has no value
+        """
+        parts = list(self.parts)
+        for name, indexes in self.slots.items():
+            try:
+                value = values[name]
+            except KeyError:
+                raise KeyError(f"No value for placeholder '{name}' in {self.name}") from None
+            value = str(value)
+            for index in indexes:
+                parts[index] = value
+        return "".join(parts)
+
+    def with_suffix(self, text):
+        """
+        Return a compiled copy of this template with literal text appended.
+
+        Args:
+            text (str): Text appended as-is (it is not scanned for placeholders)
+
+        Returns:
+            PromptTemplate: The extended template
+        """
+        extended = PromptTemplate.__new__(PromptTemplate)
+        extended.source = self.source + text
+        extended.style = self.style
+        extended.name = self.name
+        extended.parts = self.parts[:-1] + [self.parts[-1] + text]
+        extended.slots = self.slots
+        extended.placeholders = self.placeholders
+        return extended
+
+
+def load_template(path, style=MUSTACHE):
+    """
+    Load and compile a template file, reusing the compiled template until the file changes.
+
+    Args:
+        path (str): Path to the template file
+        style (str): MUSTACHE or FORMAT
+
+    Returns:
+        PromptTemplate: The compiled template
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    key = (os.path.abspath(path), style)
+    stat = os.stat(path)
+    with _template_cache_lock:
+        cached = _template_cache.get(key)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+    with open(path, 'r', encoding='utf-8') as f:
+        template = PromptTemplate(f.read(), style, name=path)
+    with _template_cache_lock:
+        _template_cache[key] = (stat.st_mtime_ns, stat.st_size, template)
+    logger.info(f"Compiled prompt template {path} (placeholders: {', '.join(sorted(template.placeholders))})")
+    return template
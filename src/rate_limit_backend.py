@@ -0,0 +1,322 @@
+"""
+Storage backends for rate-limit token buckets.
+
+The in-memory backend keeps buckets per process. The SQLite backend keeps them
+in a database file so that every process on the machine (e.g. `run` and
+`chunked-review` in separate terminals, or several shards) draws from the same
+budget per provider and model.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _refill(tokens, updated, now, rpm, capacity):
+    """Return the token balance after refilling at rpm/60 per second since 'updated'."""
+    return min(capacity, tokens + max(0.0, now - updated) * rpm / 60.0)
+
+
+def _wait_for(tokens, rpm):
+    """Return the seconds until a (possibly negative) balance is paid back."""
+    return 0.0 if tokens >= 0 else -tokens * 60.0 / rpm
+
+
+class TokenBucket:
+    """
+    Token bucket for one rate-limit key.
+
+    Tokens refill continuously at rpm/60 per second up to the burst capacity.
+    A reservation always takes a token, letting the balance go negative; the
+    deficit tells the caller how long to wait, so concurrent callers are spaced
+    out without anyone sleeping while holding the lock.
+    """
+
+    def __init__(self, rpm, capacity=1):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rpm (float): Sustained requests per minute
+            capacity (int): Burst size (requests that may be sent back to back)
+        """
+        self.rpm = rpm
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = _refill(self.tokens, self.updated, now, self.rpm, self.capacity)
+        self.updated = now
+
+    def reserve(self, amount=1):
+        """
+        Take tokens.
+
+        Args:
+            amount (float): Tokens to take; a negative amount returns tokens (never beyond capacity)
+
+        Returns:
+            float: Seconds to wait before the request may be sent (0 if the tokens were available)
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.capacity, self.tokens - amount)
+            return max(_wait_for(self.tokens, self.rpm), self.blocked_until - now)
+
+    def set_rate(self, rpm, capacity=None):
+        """Change the refill rate (and optionally the capacity), keeping the tokens accumulated so far."""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rpm = rpm
+            if capacity is not None:
+                self.capacity = max(1, capacity)
+
+    def block_for(self, seconds):
+        """Hold off all requests for this key (e.g. for a Retry-After) and drop any saved burst."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def drain(self):
+        """Drop any saved burst so the next request waits a full interval."""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0)
+
+
+class InMemoryRateLimitBackend:
+    """
+    Keeps one TokenBucket per key in this process.
+
+    Every operation names the bucket by key together with the caller's current
+    limit (rpm and burst capacity), so adaptive limit changes take effect on the
+    next call. Daily usage counters are kept per process as well.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.daily_usage = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, key, rpm, capacity):
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(rpm, capacity)
+                self.buckets[key] = bucket
+                return bucket
+        if bucket.rpm != rpm or bucket.capacity != max(1, capacity):
+            bucket.set_rate(rpm, capacity)
+        return bucket
+
+    def reserve(self, key, rpm, capacity, amount=1):
+        """
+        Take tokens from a bucket.
+
+        Args:
+            key (str): Rate-limit key (model ID or "provider_<name>")
+            rpm (float): Current refill rate per minute for the key
+            capacity (int): Burst capacity for the key
+            amount (float): Tokens to take (negative to give tokens back)
+
+        Returns:
+            float: Seconds to wait before the request may be sent
+        """
+        return self._bucket(key, rpm, capacity).reserve(amount)
+
+    def block(self, key, rpm, capacity, seconds):
+        """Hold off all requests for a key for the given number of seconds."""
+        self._bucket(key, rpm, capacity).block_for(seconds)
+
+    def drain(self, key, rpm, capacity):
+        """Drop any saved burst of a key."""
+        self._bucket(key, rpm, capacity).drain()
+
+    def add_daily_usage(self, key, day, tokens):
+        """
+        Add to a key's usage for a day.
+
+        Args:
+            key (str): Budget key
+            day (str): Day the usage counts towards (YYYY-MM-DD, UTC)
+            tokens (int): Tokens to add (negative to correct an over-estimate)
+
+        Returns:
+            int: The key's total usage for the day
+        """
+        with self.lock:
+            usage_day, total = self.daily_usage.get(key, (day, 0))
+            total = (total if usage_day == day else 0) + tokens
+            self.daily_usage[key] = (day, total)
+            return total
+
+    def close(self):
+        pass
+
+
+class SQLiteRateLimitBackend:
+    """
+    Keeps the token buckets in a SQLite database shared by all processes on the machine.
+
+    Every operation is a short read-modify-write in a BEGIN IMMEDIATE transaction,
+    which takes the database write lock up front, so two processes can never
+    spend the same token. Times are wall-clock (time.time()) because monotonic
+    clocks are not comparable across processes. Nobody sleeps while holding the
+    lock; the wait is returned to the caller.
+    """
+
+    def __init__(self, path):
+        """
+        Open (or create) the shared bucket database.
+
+        Args:
+            path (str): Path to the SQLite database file
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL,
+                updated REAL,
+                blocked_until REAL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS daily_usage (
+                key TEXT,
+                day TEXT,
+                tokens INTEGER,
+                PRIMARY KEY (key, day)
+            )
+        """)
+        logger.info(f"Shared rate-limit state at {path}")
+
+    def _update(self, key, rpm, capacity, change):
+        """
+        Refill a bucket, apply change(tokens, blocked_until, now) -> (tokens, blocked_until, result)
+        and store it, all inside one write transaction.
+        """
+        capacity = max(1, capacity)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self.conn.execute(
+                    "SELECT tokens, updated, blocked_until FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    tokens, blocked_until = float(capacity), 0.0
+                else:
+                    tokens = _refill(row[0], row[1], now, rpm, capacity)
+                    blocked_until = row[2]
+                tokens, blocked_until, result = change(tokens, blocked_until, now)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated, blocked_until) VALUES (?, ?, ?, ?)",
+                    (key, tokens, now, blocked_until)
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def reserve(self, key, rpm, capacity, amount=1):
+        """
+        Take tokens from a shared bucket.
+
+        Args:
+            key (str): Rate-limit key (model ID or "provider_<name>")
+            rpm (float): Current refill rate per minute for the key
+            capacity (int): Burst capacity for the key
+            amount (float): Tokens to take (negative to give tokens back)
+
+        Returns:
+            float: Seconds to wait before the request may be sent
+        """
+        def take(tokens, blocked_until, now):
+            tokens = min(max(1, capacity), tokens - amount)
+            return tokens, blocked_until, max(_wait_for(tokens, rpm), blocked_until - now)
+        return self._update(key, rpm, capacity, take)
+
+    def block(self, key, rpm, capacity, seconds):
+        """Hold off all requests for a key, in every process, for the given number of seconds."""
+        self._update(key, rpm, capacity,
+                     lambda tokens, blocked_until, now: (min(tokens, 0.0), max(blocked_until, now + seconds), None))
+
+    def drain(self, key, rpm, capacity):
+        """Drop any saved burst of a key."""
+        self._update(key, rpm, capacity,
+                     lambda tokens, blocked_until, now: (min(tokens, 0.0), blocked_until, None))
+
+    def add_daily_usage(self, key, day, tokens):
+        """
+        Add to a key's usage for a day, as seen by every process.
+
+        Args:
+            key (str): Budget key
+            day (str): Day the usage counts towards (YYYY-MM-DD, UTC)
+            tokens (int): Tokens to add (negative to correct an over-estimate)
+
+        Returns:
+            int: The key's total usage for the day
+        """
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "INSERT INTO daily_usage (key, day, tokens) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key, day) DO UPDATE SET tokens = tokens + excluded.tokens",
+                    (key, day, tokens)
+                )
+                total = self.conn.execute(
+                    "SELECT tokens FROM daily_usage WHERE key = ? AND day = ?", (key, day)
+                ).fetchone()[0]
+                self.conn.execute("DELETE FROM daily_usage WHERE day < ?", (day,))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return total
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def create_rate_limit_backend(config):
+    """
+    Create the backend selected by the 'rate_limit_backend' config section.
+
+    Args:
+        config (dict): Configuration dictionary
+
+    Returns:
+        InMemoryRateLimitBackend or SQLiteRateLimitBackend: The bucket store
+
+    Raises:
+        ValueError: If the backend type is unknown
+    """
+    backend_config = config.get('rate_limit_backend', {})
+    backend_type = backend_config.get('type', 'memory')
+    if backend_type == 'memory':
+        return InMemoryRateLimitBackend()
+    if backend_type == 'sqlite':
+        return SQLiteRateLimitBackend(backend_config.get('path', 'logs/rate_limits.sqlite3'))
+    raise ValueError(f"Unknown rate limit backend: {backend_type}")
@@ -1,14 +1,105 @@
+import os
+import re
+import json
 import time
+import atexit
 import threading
 import logging
-from datetime import datetime, timedelta
+from contextlib import contextmanager
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from src.rate_limit_backend import create_rate_limit_backend
 
 logger = logging.getLogger(__name__)
 
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header value.
+    
+    Args:
+        value (str): Either a number of seconds or an HTTP date
+        
+    Returns:
+        float or None: Seconds to wait, or None if the value is missing or unreadable
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now().astimezone()).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def parse_rate_limit_headers(headers):
+    """
+    Read the X-RateLimit-* headers of a response.
+    
+    X-RateLimit-Reset may be a delay in seconds or an epoch timestamp in
+    seconds or milliseconds (OpenRouter uses milliseconds).
+    
+    Args:
+        headers (Mapping): Response headers (case-insensitive or as sent)
+        
+    Returns:
+        dict: Any of "limit" (requests per minute), "remaining" and "reset_seconds" that were present
+    """
+    normalized = {str(k).lower(): v for k, v in (headers or {}).items()}
+    info = {}
+    for name, key in (("x-ratelimit-limit", "limit"), ("x-ratelimit-remaining", "remaining")):
+        try:
+            if name in normalized:
+                info[key] = int(float(normalized[name]))
+        except (TypeError, ValueError):
+            pass
+    try:
+        if "x-ratelimit-reset" in normalized:
+            reset = float(normalized["x-ratelimit-reset"])
+            if reset > 1e12:
+                reset = reset / 1000.0 - time.time()
+            elif reset > 1e9:
+                reset = reset - time.time()
+            info["reset_seconds"] = max(0.0, reset)
+    except (TypeError, ValueError):
+        pass
+    return info
+
+def parse_retry_delay(error_text):
+    """
+    Extract the suggested retry delay from a Gemini quota error message.
+    
+    Handles "retry_delay { seconds: 23 }" and "Please retry in 23.5s".
+    
+    Args:
+        error_text (str): The error message
+        
+    Returns:
+        float or None: Seconds to wait, or None if the message has no delay
+    """
+    match = re.search(r"retry_delay\s*\{\s*seconds:\s*(\d+)", error_text) or \
+        re.search(r"retry in\s*([\d.]+)\s*s", error_text, re.IGNORECASE)
+    if match:
+        return float(match.group(1))
+    return None
+
+class DailyTokenBudgetExceeded(Exception):
+    """Raised instead of sending a request that would exceed a daily token budget."""
+
 class RateLimiter:
     """
-    Implements a token bucket rate limiter for API requests.
-    Allows for model-specific rate limiting.
+    Per-key token bucket rate limiter for API requests.
+    Allows for model-specific rate limiting: a model with its own limit uses
+    its own bucket, other models share their provider's bucket. The buckets
+    live in a backend (see src/rate_limit_backend.py), which may be shared by
+    several processes.
+    
+    Besides requests per minute, a provider or model may have a budget of input
+    tokens per minute and of total tokens per (UTC) day. Each request is charged
+    its estimated prompt tokens up front; record_usage() reconciles the charge
+    with the usage the API reports.
     """
     
     def __init__(self, config):
@@ -21,7 +112,11 @@ class RateLimiter:
         self.config = config
         self.provider_limits = {}
         self.model_limits = {}
-        self.last_request_times = {}
+        self.provider_burst = {}
+        self.model_burst = {}
+        # One bucket per key ("provider_<name>" or model ID), kept by the backend.
+        # self.lock only guards the dictionaries and is never held while sleeping.
+        self.backend = create_rate_limit_backend(config)
         self.lock = threading.Lock()
         
         # Initialize provider rate limits
@@ -29,85 +124,345 @@ class RateLimiter:
             if 'rate_limit' in provider_config:
                 rpm = provider_config['rate_limit'].get('requests_per_minute', 5)
                 self.provider_limits[provider_name] = rpm
+                self.provider_burst[provider_name] = int(provider_config['rate_limit'].get('burst', 1))
         
         # Initialize model-specific rate limits
         for model_id, rpm in config.get('model_rate_limits', {}).items():
             self.model_limits[model_id] = rpm
-            self.last_request_times[model_id] = datetime.now() - timedelta(minutes=1)
+        for model_id, burst in config.get('model_burst_limits', {}).items():
+            self.model_burst[model_id] = int(burst)
+        
+        # Initialize token budgets (tokens_per_minute counts input tokens, tokens_per_day all tokens)
+        self.provider_token_limits = {}
+        self.model_token_limits = {}
+        for provider_name, provider_config in config.get('providers', {}).items():
+            rate_config = provider_config.get('rate_limit', {})
+            limits = {k: rate_config[k] for k in ('tokens_per_minute', 'tokens_per_day') if rate_config.get(k)}
+            if limits:
+                self.provider_token_limits[provider_name] = limits
+        for model_id, limits in config.get('model_token_limits', {}).items():
+            self.model_token_limits[model_id] = limits
+        
+        # Initialize concurrency caps (maximum number of in-flight requests)
+        self.provider_concurrency = {}
+        self.model_concurrency = {}
+        self.in_flight = {}
+        self.slot_condition = threading.Condition()
+        
+        for provider_name, provider_config in config.get('providers', {}).items():
+            max_concurrent = provider_config.get('rate_limit', {}).get('max_concurrent')
+            if max_concurrent:
+                self.provider_concurrency[provider_name] = max(1, int(max_concurrent))
+        
+        for model_id, max_concurrent in config.get('model_concurrency_limits', {}).items():
+            self.model_concurrency[model_id] = max(1, int(max_concurrent))
+        
+        # Adaptive limits: additive increase on success, multiplicative decrease on 429.
+        # Learned limits are kept apart from the configured ones, keyed like the buckets
+        # ("provider_<name>" or model ID), so a 429 lowers the bucket the model actually uses.
+        adaptive_config = config.get('adaptive_rate_limits', {})
+        self.adaptive = adaptive_config.get('enabled', True)
+        self.increase_rpm = adaptive_config.get('increase_rpm', 1.0)
+        self.decrease_factor = adaptive_config.get('decrease_factor', 0.5)
+        self.min_rpm = adaptive_config.get('min_rpm', 1.0)
+        self.max_rpm = adaptive_config.get('max_rpm', 600.0)
+        self.learned_limits_path = adaptive_config.get('path', 'logs/rate_limits.json')
+        self.learned_limits = {}
+        # Limits advertised by the provider (X-RateLimit-Limit) act as a ceiling for the increase
+        self.advertised_limits = {}
+        self.last_saved = 0.0
+        self.unsaved_changes = False
+        if self.adaptive:
+            self._load_learned_limits()
+            atexit.register(self.save_learned_limits)
     
-    def wait_if_needed(self, provider_name, model_id):
+    def wait_if_needed(self, provider_name, model_id, tokens=0):
         """
         Check if a request can be made or if we need to wait due to rate limits.
         Will block until the request can be made.
         
+        The token is taken from the bucket under that bucket's lock only; the
+        sleep happens outside any lock, so waiting on one model's limit never
+        delays requests for other models or providers.
+        
         Args:
             provider_name (str): The provider name (e.g., "openrouter", "google_gemini")
             model_id (str): The model ID (e.g., "google/gemini-2.5-pro-exp-03-25")
+            tokens (int): Estimated prompt tokens charged against the token budgets
             
         Returns:
             float: The amount of time waited in seconds
-        """
-        with self.lock:
-            # Check if we have a model-specific rate limit
-            if model_id in self.model_limits:
-                rpm = self.model_limits[model_id]
-                wait_seconds = self._calculate_wait_time(model_id, rpm)
-                
-                if wait_seconds > 0:
-                    logger.info(f"Rate limiting: waiting {wait_seconds:.2f}s for model {model_id} (limit: {rpm} rpm)")
-                    time.sleep(wait_seconds)
-                    self.last_request_times[model_id] = datetime.now()
-                    return wait_seconds
-                
-                self.last_request_times[model_id] = datetime.now()
-            
-            # If no model-specific limit or no wait needed, check provider limit
-            elif provider_name in self.provider_limits:
-                rpm = self.provider_limits[provider_name]
-                provider_key = f"provider_{provider_name}"
-                
-                if provider_key not in self.last_request_times:
-                    self.last_request_times[provider_key] = datetime.now() - timedelta(minutes=1)
-                
-                wait_seconds = self._calculate_wait_time(provider_key, rpm)
-                
-                if wait_seconds > 0:
-                    logger.info(f"Rate limiting: waiting {wait_seconds:.2f}s for provider {provider_name} (limit: {rpm} rpm)")
-                    time.sleep(wait_seconds)
-                    self.last_request_times[provider_key] = datetime.now()
-                    return wait_seconds
-                
-                self.last_request_times[provider_key] = datetime.now()
             
-        return 0
+        Raises:
+            DailyTokenBudgetExceeded: If the request would exceed a daily token budget
+        """
+        wait_seconds = self.reserve(provider_name, model_id, tokens)
+        if wait_seconds > 0:
+            key = self._limit_key(provider_name, model_id)
+            logger.info(f"Rate limiting: waiting {wait_seconds:.2f}s for {key} (limit: {self._current_rpm(provider_name, model_id)} rpm, request tokens: {tokens})")
+            time.sleep(wait_seconds)
+        return wait_seconds
     
-    def _calculate_wait_time(self, key, rpm):
+    def reserve(self, provider_name, model_id, tokens=0):
         """
-        Calculate how long to wait based on the last request time and rate limit.
+        Book the next request slot without sleeping.
+        The caller is responsible for waiting the returned number of seconds
+        (e.g. with asyncio.sleep) before sending the request.
         
         Args:
-            key (str): The key to check in last_request_times
-            rpm (int): Requests per minute limit
+            provider_name (str): The provider name (e.g., "openrouter", "google_gemini")
+            model_id (str): The model ID (e.g., "google/gemini-2.5-pro-exp-03-25")
+            tokens (int): Estimated prompt tokens charged against the token budgets
             
         Returns:
-            float: Number of seconds to wait (0 if no wait needed)
-        """
-        if key not in self.last_request_times:
-            return 0
+            float: Number of seconds to wait before sending the request
             
-        # Calculate seconds per request based on RPM
-        seconds_per_request = 60.0 / rpm
+        Raises:
+            DailyTokenBudgetExceeded: If the request would exceed a daily token budget
+        """
+        budget = self._token_budget_for(provider_name, model_id)
+        if budget is not None and tokens:
+            self._charge_daily(budget, tokens)
+        
+        wait_seconds = 0
+        bucket = self._bucket_for(provider_name, model_id)
+        if bucket is not None:
+            wait_seconds = self.backend.reserve(*bucket)
+        if budget is not None and tokens and budget[1].get('tokens_per_minute'):
+            tpm = budget[1]['tokens_per_minute']
+            wait_seconds = max(wait_seconds, self.backend.reserve(f"tpm:{budget[0]}", tpm, tpm, tokens))
+        return wait_seconds
+    
+    def record_usage(self, provider_name, model_id, estimated_tokens, input_tokens=None, output_tokens=None):
+        """
+        Reconcile the tokens charged before a request with the usage the API reported.
         
-        # Calculate time since last request
-        time_since_last = (datetime.now() - self.last_request_times[key]).total_seconds()
+        The per-minute budget is corrected by the difference between the actual and
+        the estimated input tokens; the daily budget additionally gets the output tokens.
+        Missing counts fall back to the estimate.
         
-        # If we need to wait, return the wait time
-        if time_since_last < seconds_per_request:
-            return seconds_per_request - time_since_last
+        Args:
+            provider_name (str): The provider name
+            model_id (str): The model ID
+            estimated_tokens (int): Tokens charged by wait_if_needed/reserve
+            input_tokens (int, optional): Input tokens reported by the API
+            output_tokens (int, optional): Output tokens reported by the API
+        """
+        budget = self._token_budget_for(provider_name, model_id)
+        if budget is None:
+            return
+        key, limits = budget
+        input_delta = (input_tokens or estimated_tokens) - estimated_tokens
+        if input_delta and limits.get('tokens_per_minute'):
+            tpm = limits['tokens_per_minute']
+            self.backend.reserve(f"tpm:{key}", tpm, tpm, input_delta)
+        daily_delta = input_delta + (output_tokens or 0)
+        if daily_delta and limits.get('tokens_per_day'):
+            self.backend.add_daily_usage(f"tpd:{key}", self._today(), daily_delta)
+        logger.debug(f"Token usage for {model_id}: estimated {estimated_tokens}, input {input_tokens}, output {output_tokens}")
+    
+    def _token_budget_for(self, provider_name, model_id):
+        """Return the (key, limits) of the token budget governing a request, or None if it has none."""
+        if model_id in self.model_token_limits:
+            return model_id, self.model_token_limits[model_id]
+        if provider_name in self.provider_token_limits:
+            return f"provider_{provider_name}", self.provider_token_limits[provider_name]
+        return None
+    
+    @staticmethod
+    def _today():
+        return time.strftime('%Y-%m-%d', time.gmtime())
+    
+    def _charge_daily(self, budget, tokens):
+        """Charge tokens to the daily budget, undoing the charge and raising if it would be exceeded."""
+        key, limits = budget
+        tokens_per_day = limits.get('tokens_per_day')
+        if not tokens_per_day:
+            return
+        day = self._today()
+        total = self.backend.add_daily_usage(f"tpd:{key}", day, tokens)
+        if total > tokens_per_day:
+            self.backend.add_daily_usage(f"tpd:{key}", day, -tokens)
+            raise DailyTokenBudgetExceeded(
+                f"Daily token budget for {key} exhausted ({total - tokens}/{tokens_per_day} tokens used, "
+                f"request needs about {tokens}); not sending request"
+            )
+    
+    def _bucket_for(self, provider_name, model_id):
+        """Return the (key, rpm, capacity) of the bucket governing a request, or None if it is not rate limited."""
+        key = self._limit_key(provider_name, model_id)
+        with self.lock:
+            rpm = self._current_rpm(provider_name, model_id)
+            if rpm is None:
+                return None
+            capacity = self.model_burst.get(model_id) if key == model_id else self.provider_burst.get(provider_name)
+            return key, rpm, capacity or 1
+    
+    def _limit_key(self, provider_name, model_id):
+        """Return the key whose limit governs a request (the model if it has its own limit)."""
+        if model_id in self.model_limits or provider_name not in self.provider_limits:
+            return model_id
+        return f"provider_{provider_name}"
+    
+    def _configured_rpm(self, key):
+        """Return the configured limit of a bucket key, or None if the configuration sets none."""
+        if key in self.model_limits:
+            return self.model_limits[key]
+        if key.startswith("provider_"):
+            return self.provider_limits.get(key[len("provider_"):])
+        return None
+    
+    def _current_rpm(self, provider_name, model_id):
+        key = self._limit_key(provider_name, model_id)
+        if key in self.learned_limits:
+            return self.learned_limits[key]
+        return self._configured_rpm(key)
+    
+    def record_success(self, provider_name, model_id, headers=None):
+        """
+        Record a successful request: additively raise a limit lowered by earlier 429s,
+        back up to the configured limit (or, without one, to max_rpm), never beyond
+        the limit advertised by the provider. A limit back at its configured value
+        is no longer a learned adjustment.
+        
+        Args:
+            provider_name (str): The provider name
+            model_id (str): The model ID
+            headers (Mapping, optional): Response headers with X-RateLimit-* information
+        """
+        info = parse_rate_limit_headers(headers)
+        if info.get("remaining") == 0 and "reset_seconds" in info:
+            # Quota used up for this window: hold off until it resets
+            bucket = self._bucket_for(provider_name, model_id)
+            if bucket is not None:
+                self.backend.block(*bucket, info["reset_seconds"])
+        key = self._limit_key(provider_name, model_id)
+        with self.lock:
+            if "limit" in info:
+                self.advertised_limits[key] = info["limit"]
+            if not self.adaptive or key not in self.learned_limits:
+                return
+            rpm = self.learned_limits[key]
+            configured = self._configured_rpm(key)
+            ceiling = configured if configured is not None else self.max_rpm
+            ceiling = min(ceiling, self.advertised_limits.get(key, ceiling))
+            # Spread the increase over a minute's worth of requests: about +increase_rpm per minute at full rate
+            new_rpm = min(ceiling, rpm + self.increase_rpm / max(rpm, 1.0))
+            if configured is not None and new_rpm >= configured:
+                del self.learned_limits[key]
+                self.unsaved_changes = True
+                logger.info(f"Rate limit for {key} recovered to its configured {configured} rpm")
+            elif new_rpm != rpm:
+                self.learned_limits[key] = new_rpm
+                self.unsaved_changes = True
+        self._maybe_save()
+    
+    def record_rate_limited(self, provider_name, model_id, retry_after=None, headers=None):
+        """
+        Record a 429 response: multiplicatively decrease the limit of the bucket the
+        model uses (its own, or the one it shares with its provider) and honour the
+        provider's requested delay.
+        
+        Args:
+            provider_name (str): The provider name
+            model_id (str): The model ID
+            retry_after (float, optional): Seconds the provider asked us to wait
+            headers (Mapping, optional): Response headers with X-RateLimit-* information
             
-        return 0
+        Returns:
+            float or None: Seconds to wait before retrying, if the provider said so. The
+                bucket is blocked for that long, so a retry paced by the limiter waits it out
+        """
+        info = parse_rate_limit_headers(headers)
+        wait_seconds = retry_after if retry_after is not None else info.get("reset_seconds")
+        key = self._limit_key(provider_name, model_id)
+        with self.lock:
+            if "limit" in info:
+                self.advertised_limits[key] = info["limit"]
+            if self.adaptive:
+                rpm = self._current_rpm(provider_name, model_id) or self.max_rpm
+                new_rpm = max(self.min_rpm, rpm * self.decrease_factor)
+                if "limit" in info:
+                    new_rpm = min(new_rpm, info["limit"])
+                if new_rpm != rpm:
+                    self.learned_limits[key] = new_rpm
+                    self.unsaved_changes = True
+                    logger.warning(f"Rate limited on {model_id}: lowering limit of {key} from {rpm:.1f} to {new_rpm:.1f} rpm")
+        bucket = self._bucket_for(provider_name, model_id)
+        if bucket is not None:
+            if wait_seconds is not None:
+                self.backend.block(*bucket, wait_seconds)
+            else:
+                self.backend.drain(*bucket)
+        # Debounced like record_success, so a burst of 429s does not rewrite the file each time
+        self._maybe_save()
+        return wait_seconds
+    
+    def _load_learned_limits(self):
+        """
+        Load the limits learned by earlier runs.
+        
+        Each entry records the configured limit it was learned against. If the
+        configuration has changed since, the configured limit wins and the entry
+        is dropped; otherwise the learned limit applies and the override is logged.
+        """
+        if not self.learned_limits_path or not os.path.exists(self.learned_limits_path):
+            return
+        try:
+            with open(self.learned_limits_path, 'r', encoding='utf-8') as f:
+                learned = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read learned rate limits from {self.learned_limits_path}: {str(e)}")
+            return
+        # Files written before entries recorded their configured limit hold a flat {key: entry} map
+        entries = learned.get("limits", {}) if "limits" in learned else learned
+        for key, entry in entries.items():
+            configured = self._configured_rpm(key)
+            if entry.get("configured_rpm") != configured:
+                logger.info(f"Ignoring learned limit of {entry.get('rpm')} rpm for {key}: the configured limit "
+                            f"changed from {entry.get('configured_rpm')} to {configured} rpm since it was learned")
+                self.unsaved_changes = True
+                continue
+            self.learned_limits[key] = entry["rpm"]
+            if entry.get("advertised_limit"):
+                self.advertised_limits[key] = entry["advertised_limit"]
+            if configured is not None:
+                logger.info(f"Using learned limit of {entry['rpm']} rpm for {key} instead of the configured {configured} rpm")
+        logger.info(f"Loaded learned rate limits for {len(self.learned_limits)} keys from {self.learned_limits_path}")
+    
+    def _maybe_save(self, min_interval=30):
+        if self.unsaved_changes and time.time() - self.last_saved >= min_interval:
+            self.save_learned_limits()
+    
+    def save_learned_limits(self):
+        """Persist the learned limits (not the configured ones) so the next run starts from them."""
+        if not self.adaptive or not self.learned_limits_path:
+            return
+        with self.lock:
+            if not self.unsaved_changes:
+                return
+            learned = {"limits": {
+                key: {
+                    "rpm": round(rpm, 3),
+                    "advertised_limit": self.advertised_limits.get(key),
+                    "configured_rpm": self._configured_rpm(key)
+                }
+                for key, rpm in self.learned_limits.items()
+            }}
+            self.unsaved_changes = False
+            self.last_saved = time.time()
+        try:
+            directory = os.path.dirname(self.learned_limits_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.learned_limits_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(learned, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.learned_limits_path)
+        except OSError as e:
+            logger.warning(f"Could not save learned rate limits to {self.learned_limits_path}: {str(e)}")
     
-    def update_rate_limit(self, model_id, new_rpm):
+    def update_rate_limit(self, model_id, new_rpm, provider_name=None):
         """
         Update the rate limit for a specific model based on API responses.
         Useful when receiving 429 responses with rate limit information.
@@ -115,7 +470,82 @@ class RateLimiter:
         Args:
             model_id (str): The model ID to update
             new_rpm (int): The new requests per minute limit
+            provider_name (str, optional): The model's provider; when given, the bucket the
+                model shares with its provider is updated instead of a limit of its own
         """
+        key = self._limit_key(provider_name, model_id) if provider_name else model_id
         with self.lock:
-            self.model_limits[model_id] = new_rpm
-            logger.info(f"Updated rate limit for {model_id} to {new_rpm} rpm")
\ No newline at end of file
+            self.learned_limits[key] = new_rpm
+            self.unsaved_changes = True
+            logger.info(f"Updated rate limit for {key} to {new_rpm} rpm")
+    
+    def _slot_keys(self, provider_name, model_id):
+        """Return the (key, limit) pairs that cap concurrency for a request."""
+        keys = []
+        if provider_name in self.provider_concurrency:
+            keys.append((f"provider_{provider_name}", self.provider_concurrency[provider_name]))
+        if model_id in self.model_concurrency:
+            keys.append((model_id, self.model_concurrency[model_id]))
+        return keys
+    
+    def try_acquire_slot(self, provider_name, model_id):
+        """
+        Try to reserve an in-flight slot for a request without blocking.
+        
+        Args:
+            provider_name (str): The provider name (e.g., "openrouter", "google_gemini")
+            model_id (str): The model ID
+            
+        Returns:
+            bool: True if a slot was reserved, False if a concurrency cap is reached
+        """
+        with self.slot_condition:
+            keys = self._slot_keys(provider_name, model_id)
+            if any(self.in_flight.get(key, 0) >= limit for key, limit in keys):
+                return False
+            for key, _ in keys:
+                self.in_flight[key] = self.in_flight.get(key, 0) + 1
+            return True
+    
+    def acquire_slot(self, provider_name, model_id, timeout=None):
+        """
+        Reserve an in-flight slot for a request, blocking until one is free.
+        
+        Args:
+            provider_name (str): The provider name
+            model_id (str): The model ID
+            timeout (float, optional): Maximum number of seconds to wait
+            
+        Returns:
+            bool: True if a slot was reserved, False if the timeout expired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.slot_condition:
+            while not self.try_acquire_slot(provider_name, model_id):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.slot_condition.wait(remaining)
+            return True
+    
+    def release_slot(self, provider_name, model_id):
+        """
+        Release an in-flight slot previously reserved with acquire_slot/try_acquire_slot.
+        
+        Args:
+            provider_name (str): The provider name
+            model_id (str): The model ID
+        """
+        with self.slot_condition:
+            for key, _ in self._slot_keys(provider_name, model_id):
+                self.in_flight[key] = max(0, self.in_flight.get(key, 0) - 1)
+            self.slot_condition.notify_all()
+    
+    @contextmanager
+    def concurrency_slot(self, provider_name, model_id):
+        """Context manager holding an in-flight slot for the duration of a request."""
+        self.acquire_slot(provider_name, model_id)
+        try:
+            yield
+        finally:
+            self.release_slot(provider_name, model_id)
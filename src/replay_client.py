@@ -0,0 +1,366 @@
+"""
+Offline 'replay' provider that serves recorded or synthetic responses.
+
+Used to load-test the run, review and chunked-review pipelines without network
+access or spending tokens. Latency, rate-limit (429) and timeout behaviour are
+drawn from configurable distributions.
+"""
+
+import os
+import re
+import json
+import time
+import random
+import sqlite3
+import threading
+import logging
+
+import pandas as pd
+
+from src.api_client import APIClient
+from src.response_cache import ResponseCache
+from src.review_logger import ReviewScoreLogger
+from src.utils import estimate_tokens, CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# Matches the keys of the JSON template at the end of a review prompt
+_JSON_BLOCK_PATTERN = re.compile(r"```json\s*(\{.*?\})\s*```", re.DOTALL)
+_JSON_KEY_PATTERN = re.compile(r'"(\w+)"\s*:')
+_CRITERION_KEY_PATTERN = re.compile(r'p(\d+)_(?:score|justification)$')
+
+_FILLER_LINES = [
+    "| Parameter | Min | Typ | Max | Unit |",
+    "|-----------|-----|-----|-----|------|",
+    "| Supply voltage | 2.7 | 3.3 | 5.5 | V |",
+    "| Operating temperature | -40 | 25 | 85 | °C |",
+    "The sensor communicates over a digital interface and reports calibrated measurements.",
+    "Refer to the manufacturer documentation for the complete register map and timing diagrams.",
+]
+
+
+class ReplayTimeout(Exception):
+    """Simulated request timeout."""
+
+
+class ReplayClient(APIClient):
+    """
+    API client that never touches the network.
+
+    Responses come from recordings when available: a JSON-lines file of
+    {"model", "text", "input_tokens", "output_tokens", "prompt_sha256"} records,
+    or a response cache database (see ResponseCache; entries stored before the
+    cache recorded prompt hashes are only served as samples of their model).
+    Otherwise a synthetic response is generated whose length follows the
+    OutputTokens recorded for the model in the metrics log. Review prompts get a
+    synthetic JSON review with the keys their template asks for (every criterion
+    when the template elides some with "..."), so the review parsers accept it.
+    """
+
+    def __init__(self, recordings_path=None, metrics_log_path=None, latency=None,
+                 rate_limit_probability=0.0, timeout_probability=0.0, timeout=120,
+                 time_scale=1.0, seed=None):
+        """
+        Initialize the replay client.
+
+        Args:
+            recordings_path (str, optional): JSON-lines recordings file or response cache database
+            metrics_log_path (str, optional): Metrics CSV used to size synthetic responses and
+                (for the "history" latency distribution) to sample response times
+            latency (dict, optional): Latency distribution. "distribution" is one of
+                "history" (default), "fixed" (seconds), "uniform" (min_seconds, max_seconds)
+                or "lognormal" (median_seconds, sigma)
+            rate_limit_probability (float): Probability that an attempt is answered with a 429
+            timeout_probability (float): Probability that an attempt times out
+            timeout (float): Simulated request timeout in seconds
+            time_scale (float): Multiplier applied to every simulated delay (e.g. 0.01 for fast tests)
+            seed (int, optional): Seed for reproducible latencies, failures and responses
+        """
+        super().__init__()
+        self.provider_name = "replay"
+        self.latency = latency or {}
+        self.rate_limit_probability = float(rate_limit_probability)
+        self.timeout_probability = float(timeout_probability)
+        self.timeout = timeout
+        self.time_scale = float(time_scale)
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+
+        # (model, prompt_sha256) -> response, and model -> list of responses
+        self.exact_recordings = {}
+        self.model_recordings = {}
+        if recordings_path:
+            self._load_recordings(recordings_path)
+
+        # model -> list of observed output token counts / response times
+        self.output_token_samples = {}
+        self.response_time_samples = {}
+        if metrics_log_path and os.path.exists(metrics_log_path):
+            self._load_metrics(metrics_log_path)
+
+        logger.info(f"ReplayClient initialized with {len(self.exact_recordings)} recordings, "
+                    f"latency: {self.latency.get('distribution', 'history')}, "
+                    f"429 probability: {self.rate_limit_probability}, timeout probability: {self.timeout_probability}")
+
+    def _load_recordings(self, path):
+        if not os.path.exists(path):
+            logger.warning(f"Replay recordings not found at {path}; serving synthetic responses only")
+            return
+        records = []
+        if path.endswith('.jsonl'):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        records.append(json.loads(line))
+        else:
+            conn = sqlite3.connect(path)
+            try:
+                for model, payload in conn.execute("SELECT model, payload FROM responses"):
+                    records.append({"model": model, **json.loads(payload)})
+            finally:
+                conn.close()
+        for record in records:
+            response = {
+                "text": record.get("text", ""),
+                "input_tokens": record.get("input_tokens", 0),
+                "output_tokens": record.get("output_tokens", 0)
+            }
+            if record.get("prompt_sha256"):
+                self.exact_recordings[(record["model"], record["prompt_sha256"])] = response
+            self.model_recordings.setdefault(record["model"], []).append(response)
+        logger.info(f"Loaded {len(records)} replay recordings from {path}")
+
+    def _load_metrics(self, path):
+        try:
+            df = pd.read_csv(path)
+            for model, group in df.groupby('Model'):
+                self.output_token_samples[model] = group['OutputTokens'].dropna().astype(int).tolist()
+                self.response_time_samples[model] = group['ResponseTimeSeconds'].dropna().astype(float).tolist()
+        except Exception as e:
+            logger.warning(f"Could not load replay metrics from {path}: {str(e)}")
+
+    def _sample_from(self, samples_by_model, model):
+        samples = samples_by_model.get(model) or [s for values in samples_by_model.values() for s in values]
+        if not samples:
+            return None
+        with self.random_lock:
+            return self.random.choice(samples)
+
+    def _sample_latency(self, model):
+        """Draw the response time of one attempt, in (unscaled) seconds."""
+        distribution = self.latency.get('distribution', 'history')
+        with self.random_lock:
+            if distribution == 'fixed':
+                seconds = float(self.latency.get('seconds', 1.0))
+            elif distribution == 'uniform':
+                seconds = self.random.uniform(float(self.latency.get('min_seconds', 0.5)),
+                                              float(self.latency.get('max_seconds', 5.0)))
+            elif distribution == 'lognormal':
+                median = float(self.latency.get('median_seconds', 10.0))
+                seconds = self.random.lognormvariate(0.0, float(self.latency.get('sigma', 0.5))) * median
+            else:
+                seconds = None
+        if seconds is None:
+            seconds = self._sample_from(self.response_time_samples, model)
+            if seconds is None:
+                seconds = float(self.latency.get('seconds', 1.0))
+        return seconds
+
+    def _sleep(self, seconds):
+        time.sleep(max(0.0, seconds * self.time_scale))
+
+    def _roll(self, probability):
+        with self.random_lock:
+            return self.random.random() < probability
+
+    @staticmethod
+    def _review_keys(template):
+        """
+        List the keys a review template asks for.
+
+        A template that elides criteria with "..." (e.g. p1, p2, ..., p16) stands
+        for every criterion, so all of them are returned in criterion order.
+        """
+        template_keys = list(dict.fromkeys(_JSON_KEY_PATTERN.findall(template)))
+        if '...' not in template:
+            return template_keys
+        criteria = [f"p{i}_{suffix}" for i in range(1, len(ReviewScoreLogger.P_CRITERIA_BASE_NAMES) + 1)
+                    for suffix in ('score', 'justification')]
+        keys = []
+        for key in template_keys:
+            if _CRITERION_KEY_PATTERN.match(key):
+                if criteria:
+                    keys.extend(criteria)
+                    criteria = []
+            else:
+                keys.append(key)
+        return keys
+
+    def _synthetic_review(self, template_keys):
+        review = {}
+        with self.random_lock:
+            for key in template_keys:
+                if key == 'sensor_evaluated':
+                    review[key] = "REPLAY SENSOR"
+                elif key == 'overall_score':
+                    review[key] = self.random.randint(1, 5)
+                elif key.endswith('_score'):
+                    review[key] = "N/A" if self.random.random() < 0.1 else self.random.randint(1, 5)
+                elif key == 'confirmation':
+                    review[key] = "This review is exclusively for the REPLAY SENSOR sensor."
+                else:
+                    review[key] = f"Synthetic replay justification for {key.split('_')[0].upper()}."
+        return "```json\n" + json.dumps(review, indent=2) + "\n```"
+
+    def _synthetic_text(self, model):
+        output_tokens = self._sample_from(self.output_token_samples, model) or 1000
+        target_chars = max(1, int(output_tokens)) * CHARS_PER_TOKEN
+        lines = [f"# Replay datasheet ({model})", ""]
+        length = sum(len(line) + 1 for line in lines)
+        while length < target_chars:
+            line = _FILLER_LINES[len(lines) % len(_FILLER_LINES)]
+            lines.append(line)
+            length += len(line) + 1
+        return "\n".join(lines)[:target_chars]
+
+    def _build_response(self, model, prompt):
+        """Pick a recorded response for the prompt, or synthesize one."""
+        recorded = self.exact_recordings.get((model, ResponseCache.prompt_sha256(prompt)))
+        if recorded is not None:
+            return dict(recorded)
+
+        # Review prompts end with the JSON structure the reviewer must return
+        blocks = _JSON_BLOCK_PATTERN.findall(prompt)
+        if blocks:
+            template_keys = self._review_keys(blocks[-1])
+            if any(key.endswith('_score') for key in template_keys):
+                text = self._synthetic_review(template_keys)
+                return {"text": text, "input_tokens": estimate_tokens(prompt), "output_tokens": estimate_tokens(text)}
+
+        recorded = self._sample_from(self.model_recordings, model) if model in self.model_recordings else None
+        if recorded is not None:
+            return dict(recorded)
+
+        text = self._synthetic_text(model)
+        return {"text": text, "input_tokens": estimate_tokens(prompt), "output_tokens": estimate_tokens(text)}
+
+    def _attempt(self, model):
+        """
+        Simulate the network part of one attempt.
+
+        Returns:
+            float: Simulated response time, or None if the attempt was rate limited
+
+        Raises:
+            ReplayTimeout: If the attempt timed out
+        """
+        if self._roll(self.timeout_probability):
+            self._sleep(self.timeout)
+            raise ReplayTimeout()
+        if self._roll(self.rate_limit_probability):
+            # 429 responses come back quickly
+            self._sleep(min(0.2, self._sample_latency(model)))
+            return None
+        latency = min(self._sample_latency(model), self.timeout)
+        return latency
+
+    def _send_with_retries(self, model):
+        """Run the simulated attempts with the same retry ladder as OpenRouterClient."""
+        max_retries = 3
+        retry_count = 0
+        while retry_count < max_retries:
+            self._check_circuit(model)
+            try:
+                latency = self._attempt(model)
+            except ReplayTimeout:
+                self._record_circuit(model, False)
+                if retry_count < max_retries - 1:
+                    retry_count += 1
+                    backoff = min(60, (2 ** retry_count) + random.uniform(0, 1))
+                    logger.warning(f"Replay - Request timed out. Retrying in {backoff * self.time_scale:.2f}s (attempt {retry_count}/{max_retries})")
+                    self._sleep(backoff)
+                    continue
+                logger.error(f"Replay - Request timed out after {self.timeout} seconds for model {model} (all retries exhausted)")
+                raise Exception(f"API request to replay timed out after {self.timeout} seconds.")
+            # A 429 still shows the service is up
+            self._record_circuit(model, True)
+            if latency is None:
+                retry_count += 1
+                if self.rate_limiter:
+                    self.rate_limiter.record_rate_limited(self.provider_name, model)
+                backoff = min(60, (2 ** retry_count) + random.uniform(0, 1))
+                logger.warning(f"Replay - Rate limit exceeded for {model}. Retrying in {backoff * self.time_scale:.2f}s (attempt {retry_count}/{max_retries})")
+                self._sleep(backoff)
+                continue
+            if self.rate_limiter:
+                self.rate_limiter.record_success(self.provider_name, model)
+            return latency
+        raise Exception(f"API request to replay failed: rate limit exceeded for {model} after {max_retries} attempts")
+
+    def send_request(self, model, prompt):
+        """
+        Serve a replayed response after a simulated delay.
+
+        Args:
+            model (str): Model identifier
+            prompt (str): The prompt text
+
+        Returns:
+            dict: Response data including text and token counts
+
+        Raises:
+            Exception: If the simulated request exhausts its retries
+        """
+        cached = self._get_cached_response(model, prompt)
+        if cached is not None:
+            return cached
+
+        wait_time = self._apply_rate_limiting(model, prompt)
+        if wait_time > 0:
+            logger.info(f"Replay - Rate limited: waited {wait_time:.2f}s before sending request for {model}")
+
+        latency = self._send_with_retries(model)
+        self._sleep(latency)
+        result = self._build_response(model, prompt)
+        logger.info(f"Replay - Request successful. Input tokens: {result['input_tokens']}, Output tokens: {result['output_tokens']}")
+        self._record_usage(model, prompt, result['input_tokens'], result['output_tokens'])
+        self._store_cached_response(model, prompt, result)
+        return result
+
+    def stream_request(self, model, prompt, usage=None):
+        """
+        Stream a replayed response, spreading the simulated delay over the chunks.
+
+        Args:
+            model (str): Model identifier
+            prompt (str): The prompt text
+            usage (dict, optional): Filled with "input_tokens" and "output_tokens" when the stream ends
+
+        Yields:
+            str: Chunks of the response text
+
+        Raises:
+            Exception: If the simulated request exhausts its retries
+        """
+        wait_time = self._apply_rate_limiting(model, prompt)
+        if wait_time > 0:
+            logger.info(f"Replay - Rate limited: waited {wait_time:.2f}s before sending request for {model}")
+
+        latency = self._send_with_retries(model)
+        result = self._build_response(model, prompt)
+        self._record_usage(model, prompt, result['input_tokens'], result['output_tokens'])
+        text = result["text"]
+        first_token_fraction = float(self.latency.get('first_token_fraction', 0.1))
+        self._sleep(latency * first_token_fraction)
+
+        chunk_chars = 16 * CHARS_PER_TOKEN
+        chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)] or [""]
+        per_chunk = latency * (1 - first_token_fraction) / len(chunks)
+        for index, chunk in enumerate(chunks):
+            if index:
+                self._sleep(per_chunk)
+            yield chunk
+
+        if usage is not None:
+            usage["input_tokens"] = result["input_tokens"]
+            usage["output_tokens"] = result["output_tokens"]
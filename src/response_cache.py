@@ -0,0 +1,213 @@
+"""
+Disk-backed, content-addressed cache of LLM responses.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Caches successful LLM responses in a SQLite database.
+
+    Entries are keyed by provider, model, generation parameters and a hash of
+    the prompt. Expired entries (older than the TTL) are dropped, and when the
+    cache grows past its size limit the least recently used entries are evicted.
+    """
+
+    def __init__(self, path, ttl_seconds=None, max_bytes=None, bypass=False):
+        """
+        Initialize the response cache.
+
+        Args:
+            path (str): Path to the SQLite database file
+            ttl_seconds (float, optional): Maximum age of an entry; None keeps entries forever
+            max_bytes (int, optional): Maximum total size of cached responses; None means unbounded
+            bypass (bool): If True, lookups always miss (fresh responses are still stored)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT,
+                model TEXT,
+                created_at REAL,
+                last_access REAL,
+                size INTEGER,
+                payload TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        self.conn.commit()
+        self.evict()
+        logger.info(f"Response cache opened at {path} (ttl: {ttl_seconds}s, max size: {max_bytes} bytes, bypass: {bypass})")
+
+    @staticmethod
+    def prompt_sha256(prompt):
+        """
+        Hash a prompt the way cache keys and replay recordings identify it.
+
+        Args:
+            prompt (str): The prompt text
+
+        Returns:
+            str: Hex digest of the UTF-8 prompt
+        """
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_key(provider, model, params, prompt):
+        """
+        Build the cache key for a request.
+
+        Args:
+            provider (str): Provider name
+            model (str): Model identifier
+            params (dict): Generation parameters that affect the response
+            prompt (str): The prompt text
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        material = json.dumps({
+            "provider": provider,
+            "model": model,
+            "params": params,
+            "prompt_sha256": ResponseCache.prompt_sha256(prompt)
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            dict or None: The cached response (text and token counts), or None on a miss
+        """
+        if self.bypass:
+            return None
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT created_at, payload FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl_seconds is not None and now - row[0] > self.ttl_seconds):
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+        response = json.loads(row[1])
+        response.pop("prompt_sha256", None)
+        return response
+
+    def put(self, key, provider, model, response, prompt_sha256=None):
+        """
+        Store a response.
+
+        Args:
+            key (str): Cache key from make_key
+            provider (str): Provider name
+            model (str): Model identifier
+            response (dict): Response with "text", "input_tokens" and "output_tokens"
+            prompt_sha256 (str, optional): Hash of the prompt (see prompt_sha256), stored so the
+                replay provider can serve the entry for the exact same prompt
+        """
+        record = {
+            "text": response.get("text", ""),
+            "input_tokens": response.get("input_tokens", 0),
+            "output_tokens": response.get("output_tokens", 0)
+        }
+        if prompt_sha256:
+            record["prompt_sha256"] = prompt_sha256
+        payload = json.dumps(record)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, model, created_at, last_access, size, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, now, now, len(payload.encode('utf-8')), payload)
+            )
+            self.conn.commit()
+        if self.max_bytes is not None:
+            self.evict()
+
+    def delete(self, key):
+        """
+        Remove a response, e.g. one its caller could not use, so the next lookup misses.
+
+        Args:
+            key (str): Cache key from make_key
+
+        Returns:
+            bool: True if an entry was removed
+        """
+        with self.lock:
+            cursor = self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.conn.commit()
+        return cursor.rowcount > 0
+
+    def evict(self):
+        """
+        Remove expired entries, then least recently used ones until the size limit is met.
+
+        Returns:
+            int: Number of entries removed
+        """
+        removed = 0
+        with self.lock:
+            if self.ttl_seconds is not None:
+                cursor = self.conn.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                )
+                removed += cursor.rowcount
+            if self.max_bytes is not None:
+                total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    victims = []
+                    for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+                        if total <= self.max_bytes:
+                            break
+                        victims.append((key,))
+                        total -= size
+                    self.conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+                    removed += len(victims)
+            self.conn.commit()
+        if removed:
+            logger.info(f"Response cache evicted {removed} entries")
+        return removed
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: entries, size_bytes, hits and misses
+        """
+        with self.lock:
+            entries, size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {"entries": entries, "size_bytes": size, "hits": self.hits, "misses": self.misses}
@@ -3,6 +3,7 @@ Module for processing and saving results from LLM responses.
 """
 
 import os
+import glob
 from datetime import datetime
 
 class ResultProcessor:
@@ -17,6 +18,23 @@ class ResultProcessor:
         if not os.path.exists(base_path):
             os.makedirs(base_path)
     
+    def _result_path(self, sensor_brand, sensor_type, model):
+        """Build the timestamped result file path, creating the sensor directory if needed."""
+        # Create a clean model name for the filename
+        model_name = model.replace('/', '_')
+        
+        # Create sensor-specific directory
+        sensor_dir = os.path.join(self.base_path, f"{sensor_brand}_{sensor_type}")
+        if not os.path.exists(sensor_dir):
+            os.makedirs(sensor_dir, exist_ok=True)
+        
+        # Create a timestamp for uniqueness
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # Construct filename
+        filename = f"{model_name}_{timestamp}.md"
+        return os.path.join(sensor_dir, filename)
+    
     def save_result(self, sensor_brand, sensor_type, model, response_text):
         """
         Save the LLM response to a markdown file.
@@ -30,23 +48,53 @@ class ResultProcessor:
         Returns:
             str: Path to the saved file
         """
-        # Create a clean model name for the filename
-        model_name = model.replace('/', '_')
-        
-        # Create sensor-specific directory
-        sensor_dir = os.path.join(self.base_path, f"{sensor_brand}_{sensor_type}")
-        if not os.path.exists(sensor_dir):
-            os.makedirs(sensor_dir)
-        
-        # Create a timestamp for uniqueness
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Construct filename
-        filename = f"{model_name}_{timestamp}.md"
-        filepath = os.path.join(sensor_dir, filename)
+        filepath = self._result_path(sensor_brand, sensor_type, model)
         
         # Save the response
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(response_text)
             
-        return filepath
\ No newline at end of file
+        return filepath
+    
+    def find_result(self, sensor_brand, sensor_type, model, response_text):
+        """
+        Find an earlier result file of this sensor and model holding exactly this response.
+        
+        Args:
+            sensor_brand (str): Brand of the sensor
+            sensor_type (str): Type/model of the sensor
+            model (str): Model identifier (e.g., "openai/gpt-4")
+            response_text (str): Response text from the LLM
+            
+        Returns:
+            str or None: Path of the most recent matching file, or None if there is none
+        """
+        model_name = model.replace('/', '_')
+        pattern = os.path.join(glob.escape(os.path.join(self.base_path, f"{sensor_brand}_{sensor_type}")),
+                               f"{glob.escape(model_name)}_*.md")
+        expected_size = len(response_text.encode('utf-8'))
+        for filepath in sorted(glob.glob(pattern), reverse=True):
+            try:
+                if os.path.getsize(filepath) != expected_size:
+                    continue
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    if f.read() == response_text:
+                        return filepath
+            except (OSError, UnicodeDecodeError):
+                continue
+        return None
+    
+    def open_result_stream(self, sensor_brand, sensor_type, model):
+        """
+        Open the markdown result file for writing a streamed response incrementally.
+        
+        Args:
+            sensor_brand (str): Brand of the sensor
+            sensor_type (str): Type/model of the sensor
+            model (str): Model identifier (e.g., "openai/gpt-4")
+            
+        Returns:
+            tuple: (filepath, file object opened for writing)
+        """
+        filepath = self._result_path(sensor_brand, sensor_type, model)
+        return filepath, open(filepath, 'w', encoding='utf-8')
@@ -4,11 +4,113 @@ Module for logging and managing LLM review scores.
 """
 
 import os
-import csv
-import pandas as pd
+import json
+import threading
 import logging
 from datetime import datetime
 
+from src.review_store import create_review_store
+from src.run_journal import truncate_partial_line
+
+
+class ReviewIndex:
+    """
+    Index of completed reviews keyed by reviewer model and datasheet content hashes.
+
+    Each review is one JSON line appended (and fsync'ed) to the index file, so a
+    rerun can tell which generated datasheets the same reviewer has already
+    scored against the same official datasheet and skip them. Errored reviews
+    are never added, so they are retried.
+    """
+
+    def __init__(self, path):
+        """
+        Open the index file, loading any reviews it already holds.
+
+        Args:
+            path (str): Path to the index (.jsonl) file
+        """
+        self.path = path
+        self.reviews = {}
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        if os.path.exists(path):
+            self._load()
+
+    @staticmethod
+    def make_key(reviewer_model_id, generated_sha256, official_sha256):
+        """
+        Build the key identifying a review.
+
+        Args:
+            reviewer_model_id (str): Reviewer model identifier as requested (e.g. 'google_gemini-1.5-pro')
+            generated_sha256 (str): SHA-256 of the generated datasheet
+            official_sha256 (str or None): SHA-256 of the official datasheet, None if there was none
+
+        Returns:
+            tuple: The key
+        """
+        return (reviewer_model_id, generated_sha256, official_sha256 or "")
+
+    def _load(self):
+        truncate_partial_line(self.path)
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                    key = self.make_key(record['reviewer'], record['generated_sha256'], record['official_sha256'])
+                except (json.JSONDecodeError, KeyError):
+                    self.logger.warning(f"Skipping unreadable line {line_number} in review index {self.path}")
+                    continue
+                self.reviews[key] = record
+
+    def has_review(self, reviewer_model_id, generated_sha256, official_sha256):
+        """
+        Check whether this reviewer has already reviewed this pair of datasheets.
+
+        Returns:
+            bool: True if a successful review is indexed
+        """
+        with self.lock:
+            return self.make_key(reviewer_model_id, generated_sha256, official_sha256) in self.reviews
+
+    def get(self, reviewer_model_id, generated_sha256, official_sha256):
+        """
+        Get the indexed record for a review.
+
+        Returns:
+            dict or None: The record (including where the review was written), or None
+        """
+        with self.lock:
+            return self.reviews.get(self.make_key(reviewer_model_id, generated_sha256, official_sha256))
+
+    def add(self, reviewer_model_id, generated_sha256, official_sha256, **details):
+        """
+        Record a successful review.
+
+        Args:
+            reviewer_model_id (str): Reviewer model identifier as requested
+            generated_sha256 (str): SHA-256 of the generated datasheet
+            official_sha256 (str or None): SHA-256 of the official datasheet
+            **details: Extra JSON-serialisable fields (e.g. generated file name, output path)
+        """
+        record = {
+            "reviewer": reviewer_model_id,
+            "generated_sha256": generated_sha256,
+            "official_sha256": official_sha256 or "",
+            "timestamp": datetime.now().isoformat(),
+            **details
+        }
+        with self.lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.reviews[self.make_key(reviewer_model_id, generated_sha256, official_sha256)] = record
+
 class ReviewScoreLogger:
     """Class to log and manage LLM review scores for datasheets."""
 
@@ -63,24 +165,36 @@ class ReviewScoreLogger:
         'P15_Basic_Usage_Justification',
         'P16_Compliance_Certifications_Justification',
         'Overall_Justification',
-        'Review_Timestamp'
+        'Review_Timestamp',
+        'Generated_Datasheet_Filename',
+        'Generated_Datasheet_SHA256',
+        'Official_Datasheet_SHA256'
     ]
     
-    def __init__(self, base_path):
+    INDEX_FILENAME = 'review_index.jsonl'
+    
+    def __init__(self, base_path, config=None):
         """Initialize the review score logger.
         
         Args:
             base_path (str): Base directory for storing review logs
+            config (dict, optional): Configuration dictionary; its 'review_store' section selects
+                where rows are stored (per-sensor CSVs by default)
         """
         self.base_path = base_path
         if not os.path.exists(base_path):
             os.makedirs(base_path)
         self.logger = logging.getLogger(__name__)
+        self.store = create_review_store(config or {}, base_path, self.ORDERED_FIELD_NAMES)
+        self.index = ReviewIndex(os.path.join(base_path, self.INDEX_FILENAME))
+        # Index entries of reviews still buffered by the store; written once the rows are
+        self.pending_index = []
     
     def log_review(self, reviewer_provider, reviewer_model, sensor_brand, sensor_type, 
                    generator_provider, generator_model, official_datasheet_status, 
-                   scores, justifications):
-        """Log a review to the appropriate CSV file.
+                   scores, justifications, generated_filename='', generated_sha256='',
+                   official_sha256='', reviewer_model_id=None):
+        """Log a review to the review store.
         
         Args:
             reviewer_provider (str): Provider of the reviewer LLM (e.g., 'google')
@@ -92,22 +206,16 @@ class ReviewScoreLogger:
             official_datasheet_status (str): Status of official datasheet fetching
             scores (dict): Dictionary containing scores for each criteria
             justifications (dict): Dictionary containing justifications for each score
+            generated_filename (str): File name of the generated datasheet
+            generated_sha256 (str): SHA-256 of the generated datasheet's contents
+            official_sha256 (str): SHA-256 of the official datasheet's contents ('' if there was none)
+            reviewer_model_id (str, optional): Reviewer model as requested; if given (with
+                generated_sha256), the review is added to the index once it is stored, so
+                reruns skip it. Leave unset for errored reviews.
             
         Returns:
-            str: Path to the CSV file where review was logged
+            str: Where the review was logged (CSV file or review database)
         """
-        # Create directory structure: reviews/[ReviewerLLMProvider]_[ReviewerLLMModel]/
-        reviewer_dir = f"{reviewer_provider}_{reviewer_model}"
-        review_dir = os.path.join(self.base_path, reviewer_dir)
-        os.makedirs(review_dir, exist_ok=True)
-        
-        # CSV file path: [ReviewerLLMProvider]_[ReviewerLLMModel]/[SensorBrand]_[SensorType].csv
-        sensor_filename = f"{sensor_brand}_{sensor_type}.csv".replace(" ", "_")
-        csv_path = os.path.join(review_dir, sensor_filename)
-        
-        # Check if file exists to determine if we need to write headers
-        file_exists = os.path.isfile(csv_path)
-        
         # Prepare row data
         average_score = self._calculate_average_score(scores) # Assumes scores dict uses "P1", "P2", ... keys
         review_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -124,6 +232,9 @@ class ReviewScoreLogger:
             'Overall_Likert_Score': scores.get('Overall', 'N/A'),
             'Overall_Justification': justifications.get('Overall', ''),
             'Review_Timestamp': review_timestamp,
+            'Generated_Datasheet_Filename': generated_filename,
+            'Generated_Datasheet_SHA256': generated_sha256,
+            'Official_Datasheet_SHA256': official_sha256 or '',
         }
         
         # Add individual Pn scores and justifications
@@ -137,15 +248,47 @@ class ReviewScoreLogger:
             row_data[score_col_name] = scores.get(p_key, "N/A")
             row_data[just_col_name] = justifications.get(p_key, "")
             
-        # Write to CSV
-        with open(csv_path, 'a', newline='', encoding='utf-8') as f:
-            csv_writer = csv.DictWriter(f, fieldnames=self.ORDERED_FIELD_NAMES)
-            if not file_exists:
-                csv_writer.writeheader()
-            csv_writer.writerow(row_data)
+        location = self.store.add(row_data)
+        if reviewer_model_id and generated_sha256:
+            self.pending_index.append((reviewer_model_id, generated_sha256, official_sha256,
+                                       {"generated_filename": generated_filename, "stored_in": location}))
+        self._write_pending_index()
+        
+        self.logger.info(f"Review for {sensor_brand} {sensor_type} logged to {location}")
+        return location
+    
+    def _write_pending_index(self):
+        """Index the reviews whose rows the store has written."""
+        if self.pending_index and not self.store.pending:
+            for reviewer_model_id, generated_sha256, official_sha256, details in self.pending_index:
+                self.index.add(reviewer_model_id, generated_sha256, official_sha256, **details)
+            self.pending_index = []
+    
+    def has_review(self, reviewer_model_id, generated_sha256, official_sha256):
+        """Check whether this reviewer already reviewed this pair of datasheets (including reviews not yet indexed).
         
-        self.logger.info(f"Review for {sensor_brand} {sensor_type} logged to {csv_path}")
-        return csv_path
+        Args:
+            reviewer_model_id (str): Reviewer model as requested
+            generated_sha256 (str): SHA-256 of the generated datasheet
+            official_sha256 (str): SHA-256 of the official datasheet ('' if there is none)
+            
+        Returns:
+            bool: True if the review can be skipped
+        """
+        key = ReviewIndex.make_key(reviewer_model_id, generated_sha256, official_sha256)
+        if any(ReviewIndex.make_key(*entry[:3]) == key for entry in self.pending_index):
+            return True
+        return self.index.has_review(reviewer_model_id, generated_sha256, official_sha256)
+    
+    def flush(self):
+        """Write buffered reviews to the store, then index them."""
+        self.store.flush()
+        self._write_pending_index()
+    
+    def close(self):
+        """Flush buffered reviews and release the store."""
+        self.flush()
+        self.store.close()
     
     def _calculate_average_score(self, scores):
         """Calculate average score from P1-P16.
@@ -176,32 +319,4 @@ class ReviewScoreLogger:
         Returns:
             pandas.DataFrame or None: DataFrame with review summary or None if no data
         """
-        reviewer_dir = f"{reviewer_provider}_{reviewer_model}"
-        review_dir = os.path.join(self.base_path, reviewer_dir)
-        
-        if not os.path.exists(review_dir):
-            self.logger.warning(f"No reviews found for {reviewer_provider} {reviewer_model}")
-            return None
-        
-        # Find all CSV files in the directory
-        csv_files = [f for f in os.listdir(review_dir) if f.endswith('.csv')]
-        
-        if not csv_files:
-            self.logger.warning(f"No CSV files found in {review_dir}")
-            return None
-        
-        # Read and concatenate all CSVs
-        dfs = []
-        for csv_file in csv_files:
-            try:
-                file_path = os.path.join(review_dir, csv_file)
-                df = pd.read_csv(file_path)
-                dfs.append(df)
-            except Exception as e:
-                self.logger.error(f"Error reading {csv_file}: {str(e)}")
-        
-        if not dfs:
-            return None
-        
-        # Concatenate all DataFrames
-        return pd.concat(dfs, ignore_index=True)
\ No newline at end of file
+        return self.store.query(reviewer_provider=reviewer_provider, reviewer_model=reviewer_model)
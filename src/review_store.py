@@ -0,0 +1,510 @@
+"""
+Storage backends for review score rows.
+
+CSVReviewStore keeps the original layout (one CSV per reviewer and sensor).
+SQLiteReviewStore keeps every review in one indexed table, buffers rows and
+writes them in batches, and can export the CSV layout or import it.
+"""
+
+import os
+import csv
+import glob
+import time
+import atexit
+import sqlite3
+import threading
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Columns the SQLite store indexes, each index covering one way reviews are looked up
+INDEXED_COLUMNS = {
+    'idx_reviews_sensor': ('Sensor_Brand', 'Sensor_Type'),
+    'idx_reviews_generator': ('Generated_Datasheet_LLM_Provider', 'Generated_Datasheet_LLM_Model'),
+    'idx_reviews_reviewer': ('Reviewer_LLM_Provider', 'Reviewer_LLM_Model'),
+}
+
+# query() keyword -> column
+QUERY_COLUMNS = {
+    'reviewer_provider': 'Reviewer_LLM_Provider',
+    'reviewer_model': 'Reviewer_LLM_Model',
+    'sensor_brand': 'Sensor_Brand',
+    'sensor_type': 'Sensor_Type',
+    'generator_provider': 'Generated_Datasheet_LLM_Provider',
+    'generator_model': 'Generated_Datasheet_LLM_Model',
+}
+
+
+def csv_path_for(base_path, reviewer_provider, reviewer_model, sensor_brand, sensor_type):
+    """
+    Path of the CSV holding one reviewer's reviews of one sensor.
+
+    Layout: [base_path]/[ReviewerLLMProvider]_[ReviewerLLMModel]/[SensorBrand]_[SensorType].csv
+
+    Returns:
+        str: The CSV path
+    """
+    reviewer_dir = f"{reviewer_provider}_{reviewer_model}"
+    sensor_filename = f"{sensor_brand}_{sensor_type}.csv".replace(" ", "_")
+    return os.path.join(base_path, reviewer_dir, sensor_filename)
+
+
+def _coerce_score(value):
+    """Turn a numeric score read back from a CSV into a number; other values are kept as text."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    return int(number) if number.is_integer() and '.' not in value else number
+
+
+class CSVReviewStore:
+    """Appends each review to the CSV of its reviewer and sensor."""
+
+    def __init__(self, base_path, fieldnames):
+        """
+        Initialize the store.
+
+        Args:
+            base_path (str): Base directory of the review CSVs
+            fieldnames (list): Column order of the CSVs
+        """
+        self.base_path = base_path
+        self.fieldnames = list(fieldnames)
+        self.pending = 0
+        # CSV files known to exist with the current header
+        self.checked_files = set()
+
+    def _upgrade_header(self, csv_path):
+        """Rewrite a CSV written with an older column set so it has the current header.
+
+        Existing rows keep their values; columns they lack are left empty.
+        """
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames == self.fieldnames:
+                return
+            rows = list(reader)
+        tmp_path = csv_path + '.tmp'
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            csv_writer = csv.DictWriter(f, fieldnames=self.fieldnames, restval='', extrasaction='ignore')
+            csv_writer.writeheader()
+            csv_writer.writerows(rows)
+        os.replace(tmp_path, csv_path)
+        logger.info(f"Upgraded the header of {csv_path} ({len(rows)} rows)")
+
+    def add(self, row):
+        """
+        Append a review row.
+
+        Args:
+            row (dict): Column -> value
+
+        Returns:
+            str: Path to the CSV file the row was written to
+        """
+        csv_path = csv_path_for(self.base_path, row['Reviewer_LLM_Provider'], row['Reviewer_LLM_Model'],
+                                row['Sensor_Brand'], row['Sensor_Type'])
+        write_header = False
+        if csv_path not in self.checked_files:
+            if os.path.isfile(csv_path):
+                self._upgrade_header(csv_path)
+            else:
+                os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+                write_header = True
+        with open(csv_path, 'a', newline='', encoding='utf-8') as f:
+            csv_writer = csv.DictWriter(f, fieldnames=self.fieldnames)
+            if write_header:
+                csv_writer.writeheader()
+            csv_writer.writerow(row)
+        self.checked_files.add(csv_path)
+        return csv_path
+
+    def query(self, columns=None, **filters):
+        """
+        Load reviews matching all the given filters.
+
+        Only the CSVs of one reviewer are read when both reviewer_provider and
+        reviewer_model are given; otherwise every CSV under base_path is read
+        and filtered in memory.
+
+        Args:
+            columns (list, optional): Columns to load (default: all); columns missing from older CSVs are skipped
+            **filters: Any of reviewer_provider, reviewer_model, sensor_brand, sensor_type,
+                generator_provider, generator_model
+
+        Returns:
+            pandas.DataFrame or None: The reviews, or None if there are none
+
+        Raises:
+            ValueError: If a filter is unknown
+        """
+        unknown = set(filters) - set(QUERY_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown review filters: {', '.join(sorted(unknown))}")
+        if 'reviewer_provider' in filters and 'reviewer_model' in filters:
+            review_dir = os.path.join(self.base_path, f"{filters['reviewer_provider']}_{filters['reviewer_model']}")
+            if not os.path.exists(review_dir):
+                logger.warning(f"No reviews found in {review_dir}")
+                return None
+            csv_files = [os.path.join(review_dir, f) for f in os.listdir(review_dir) if f.endswith('.csv')]
+        else:
+            csv_files = glob.glob(os.path.join(self.base_path, '**', '*.csv'), recursive=True)
+        if not csv_files:
+            logger.warning(f"No review CSV files found under {self.base_path}")
+            return None
+
+        wanted = set(columns or []) | {QUERY_COLUMNS[name] for name in filters}
+        dfs = []
+        for csv_file in csv_files:
+            try:
+                dfs.append(pd.read_csv(csv_file, usecols=(lambda c: c in wanted) if columns else None))
+            except Exception as e:
+                logger.error(f"Error reading {csv_file}: {str(e)}")
+        if not dfs:
+            return None
+        df = pd.concat(dfs, ignore_index=True)
+        for name, value in filters.items():
+            if QUERY_COLUMNS[name] not in df.columns:
+                return None
+            df = df[df[QUERY_COLUMNS[name]] == value]
+        if df.empty:
+            return None
+        if columns:
+            df = df[[name for name in columns if name in df.columns]]
+        return df.reset_index(drop=True)
+
+    def scan(self, columns, numeric_columns=(), **filters):
+        """
+        Load a few columns of the matching reviews, with numeric columns as floats.
+
+        Args:
+            columns (list): Columns to load
+            numeric_columns (iterable): Columns parsed as numbers; other values (e.g. "N/A") become NaN
+            **filters: As for query()
+
+        Returns:
+            pandas.DataFrame or None: The columns, or None if there are no reviews
+        """
+        df = self.query(columns=columns, **filters)
+        if df is None:
+            return None
+        for name in numeric_columns:
+            if name in df.columns:
+                df[name] = pd.to_numeric(df[name], errors='coerce')
+        return df
+
+    def flush(self):
+        """Rows are written as they are added; nothing to flush."""
+
+    def close(self):
+        """Nothing to release."""
+
+
+class SQLiteReviewStore:
+    """
+    Keeps every review in one SQLite table indexed by sensor, generator and reviewer.
+
+    Rows are buffered and inserted in one transaction per batch: when batch_size
+    rows are waiting, when the oldest waiting row is flush_interval_seconds old,
+    before any query, and at close (or interpreter exit). Score columns have no
+    declared type, so numeric scores stay numbers and "N/A"/"LLM_Error" stay text.
+    """
+
+    def __init__(self, path, fieldnames, batch_size=50, flush_interval_seconds=5.0):
+        """
+        Open (or create) the review database.
+
+        Args:
+            path (str): Path to the SQLite database file
+            fieldnames (list): Review columns, in export order
+            batch_size (int): Rows buffered before they are written
+            flush_interval_seconds (float): Maximum time a row stays buffered (checked when rows are added)
+        """
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_seconds = flush_interval_seconds
+        self.buffer = []
+        self.buffered_since = None
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.columns_sql = ", ".join(f'"{name}"' for name in self.fieldnames)
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS reviews (id INTEGER PRIMARY KEY, {self.columns_sql})")
+        # Columns added to the review format after the table was created
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(reviews)")}
+        for name in self.fieldnames:
+            if name not in existing:
+                self.conn.execute(f'ALTER TABLE reviews ADD COLUMN "{name}"')
+        for index_name, index_columns in INDEXED_COLUMNS.items():
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {index_name} ON reviews ({', '.join(index_columns)})"
+            )
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS imported_files (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime_ns INTEGER,
+                rows INTEGER
+            )
+        """)
+        self.conn.commit()
+        self.insert_sql = (
+            f"INSERT INTO reviews ({self.columns_sql}) VALUES ({', '.join('?' for _ in self.fieldnames)})"
+        )
+        atexit.register(self.close)
+        logger.info(f"Review store opened at {path} (batch size {self.batch_size})")
+
+    @property
+    def pending(self):
+        """Number of rows buffered but not yet written."""
+        with self.lock:
+            return len(self.buffer)
+
+    def add(self, row):
+        """
+        Buffer a review row, writing the batch if it is full or old enough.
+
+        Args:
+            row (dict): Column -> value
+
+        Returns:
+            str: Path to the database
+        """
+        values = tuple(row.get(name, '') for name in self.fieldnames)
+        with self.lock:
+            if not self.buffer:
+                self.buffered_since = time.monotonic()
+            self.buffer.append(values)
+            due = (len(self.buffer) >= self.batch_size or
+                   time.monotonic() - self.buffered_since >= self.flush_interval_seconds)
+            if due:
+                self._flush_locked()
+        return self.path
+
+    def _flush_locked(self):
+        """Write the buffered rows in one transaction. Must hold self.lock."""
+        if not self.buffer:
+            return
+        with self.conn:
+            self.conn.executemany(self.insert_sql, self.buffer)
+        logger.debug(f"Review store wrote {len(self.buffer)} rows")
+        self.buffer = []
+        self.buffered_since = None
+
+    def flush(self):
+        """Write any buffered rows."""
+        with self.lock:
+            self._flush_locked()
+
+    def query(self, columns=None, **filters):
+        """
+        Load reviews matching all the given filters.
+
+        Args:
+            columns (list, optional): Columns to load (default: all)
+            **filters: Any of reviewer_provider, reviewer_model, sensor_brand, sensor_type,
+                generator_provider, generator_model
+
+        Returns:
+            pandas.DataFrame or None: The reviews in insertion order, or None if there are none
+
+        Raises:
+            ValueError: If a filter or column is unknown
+        """
+        unknown = set(filters) - set(QUERY_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown review filters: {', '.join(sorted(unknown))}")
+        unknown_columns = set(columns or []) - set(self.fieldnames)
+        if unknown_columns:
+            raise ValueError(f"Unknown review columns: {', '.join(sorted(unknown_columns))}")
+        clauses = [f'"{QUERY_COLUMNS[name]}" = ?' for name in filters]
+        selected = ", ".join(f'"{name}"' for name in columns) if columns else self.columns_sql
+        sql = f"SELECT {selected} FROM reviews"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        with self.lock:
+            self._flush_locked()
+            df = pd.read_sql_query(sql, self.conn, params=list(filters.values()))
+        if df.empty:
+            logger.warning(f"No reviews found in {self.path} matching {filters}")
+            return None
+        return df
+
+    def scan(self, columns, numeric_columns=(), **filters):
+        """
+        Load a few columns of the matching reviews, with numeric columns as floats.
+
+        Faster than query() for large tables: text in numeric columns is turned
+        into NULL by SQLite, and the fetched rows are transposed and converted
+        column by column by NumPy instead of going through object columns.
+
+        Args:
+            columns (list): Columns to load
+            numeric_columns (iterable): Columns parsed as numbers; text values (e.g. "N/A") become NaN
+            **filters: As for query()
+
+        Returns:
+            pandas.DataFrame or None: The columns, or None if there are no reviews
+
+        Raises:
+            ValueError: If a filter or column is unknown
+        """
+        unknown = set(filters) - set(QUERY_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown review filters: {', '.join(sorted(unknown))}")
+        unknown_columns = set(columns) - set(self.fieldnames)
+        if unknown_columns:
+            raise ValueError(f"Unknown review columns: {', '.join(sorted(unknown_columns))}")
+        numeric_columns = set(numeric_columns)
+        fields = [f"""CASE WHEN typeof("{name}") IN ('integer', 'real') THEN "{name}" END""" if name in numeric_columns
+                  else f'"{name}"' for name in columns]
+        sql = f"SELECT {', '.join(fields)} FROM reviews"
+        if filters:
+            sql += " WHERE " + " AND ".join(f'"{QUERY_COLUMNS[name]}" = ?' for name in filters)
+        with self.lock:
+            self._flush_locked()
+            rows = self.conn.execute(sql, list(filters.values())).fetchall()
+        if not rows:
+            return None
+        return pd.DataFrame({
+            name: np.array(values, dtype=float) if name in numeric_columns else np.array(values, dtype=object)
+            for name, values in zip(columns, zip(*rows))
+        })
+
+    def export_csv(self, base_path):
+        """
+        Write every review to the per-reviewer, per-sensor CSV layout of CSVReviewStore.
+
+        Existing CSVs at the destination are replaced.
+
+        Args:
+            base_path (str): Directory to write the CSVs under
+
+        Returns:
+            list: Paths of the CSV files written
+        """
+        with self.lock:
+            self._flush_locked()
+            cursor = self.conn.execute(
+                f"SELECT {self.columns_sql} FROM reviews "
+                f"ORDER BY Reviewer_LLM_Provider, Reviewer_LLM_Model, Sensor_Brand, Sensor_Type, id"
+            )
+            written = []
+            current_path = None
+            f = None
+            try:
+                for values in cursor:
+                    row = dict(zip(self.fieldnames, values))
+                    csv_path = csv_path_for(base_path, row['Reviewer_LLM_Provider'], row['Reviewer_LLM_Model'],
+                                            row['Sensor_Brand'], row['Sensor_Type'])
+                    if csv_path != current_path:
+                        if f is not None:
+                            f.close()
+                        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+                        f = open(csv_path, 'w', newline='', encoding='utf-8')
+                        csv_writer = csv.DictWriter(f, fieldnames=self.fieldnames)
+                        csv_writer.writeheader()
+                        current_path = csv_path
+                        written.append(csv_path)
+                    csv_writer.writerow(row)
+            finally:
+                if f is not None:
+                    f.close()
+        logger.info(f"Exported reviews from {self.path} to {len(written)} CSV files under {base_path}")
+        return written
+
+    def import_csv(self, base_path):
+        """
+        Load review CSVs written by CSVReviewStore.
+
+        Each file is imported once; a file that changed since it was imported is
+        skipped with a warning rather than imported twice.
+
+        Args:
+            base_path (str): Directory holding the review CSVs
+
+        Returns:
+            int: Number of rows imported
+        """
+        imported = 0
+        score_columns = [name for name in self.fieldnames if name.endswith('_Score')]
+        for csv_path in sorted(glob.glob(os.path.join(base_path, '**', '*.csv'), recursive=True)):
+            key = os.path.abspath(csv_path)
+            stat = os.stat(csv_path)
+            with self.lock:
+                previous = self.conn.execute(
+                    "SELECT size, mtime_ns FROM imported_files WHERE path = ?", (key,)
+                ).fetchone()
+            if previous is not None:
+                if previous != (stat.st_size, stat.st_mtime_ns):
+                    logger.warning(f"{csv_path} changed since it was imported; skipping it")
+                continue
+            with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                if not reader.fieldnames or 'Reviewer_LLM_Model' not in reader.fieldnames:
+                    continue
+                rows = []
+                for row in reader:
+                    for name in score_columns:
+                        if name in row:
+                            row[name] = _coerce_score(row[name])
+                    rows.append(tuple('' if row.get(name) is None else row[name] for name in self.fieldnames))
+            with self.lock:
+                self._flush_locked()
+                with self.conn:
+                    self.conn.executemany(self.insert_sql, rows)
+                    self.conn.execute(
+                        "INSERT INTO imported_files (path, size, mtime_ns, rows) VALUES (?, ?, ?, ?)",
+                        (key, stat.st_size, stat.st_mtime_ns, len(rows))
+                    )
+            imported += len(rows)
+            logger.info(f"Imported {len(rows)} reviews from {csv_path}")
+        return imported
+
+    def close(self):
+        """Write any buffered rows and close the database."""
+        with self.lock:
+            if self.conn is None:
+                return
+            self._flush_locked()
+            self.conn.close()
+            self.conn = None
+        atexit.unregister(self.close)
+
+
+def create_review_store(config, base_path, fieldnames):
+    """
+    Create the store selected by the 'review_store' config section.
+
+    Args:
+        config (dict): Configuration dictionary
+        base_path (str): Base directory for review output
+        fieldnames (list): Review columns
+
+    Returns:
+        CSVReviewStore or SQLiteReviewStore: The store
+
+    Raises:
+        ValueError: If the store type is unknown
+    """
+    store_config = config.get('review_store', {})
+    store_type = store_config.get('type', 'csv')
+    if store_type == 'csv':
+        return CSVReviewStore(base_path, fieldnames)
+    if store_type == 'sqlite':
+        return SQLiteReviewStore(
+            store_config.get('path', os.path.join(base_path, 'reviews.sqlite3')),
+            fieldnames,
+            batch_size=store_config.get('batch_size', 50),
+            flush_interval_seconds=store_config.get('flush_interval_seconds', 5.0)
+        )
+    raise ValueError(f"Unknown review store: {store_type}")
@@ -0,0 +1,168 @@
+"""
+Append-only journal of job states, used to resume interrupted runs.
+"""
+
+import os
+import glob
+import json
+import threading
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def truncate_partial_line(path):
+    """
+    Cut off a last line left unterminated by a crash mid-write, so appends to a
+    JSON-lines file start on a fresh line instead of being glued onto it.
+
+    Args:
+        path (str): Path to the JSON-lines file
+
+    Returns:
+        bool: True if a partial line was removed
+    """
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if not data or data.endswith(b"\n"):
+            return False
+        end = data.rfind(b"\n") + 1
+        logger.warning(f"Dropping truncated last line of {path}: {data[end:][:200]!r}")
+        f.truncate(end)
+        f.flush()
+        os.fsync(f.fileno())
+    return True
+
+
+class RunJournal:
+    """
+    Records the state of every job of a command run in a JSON-lines file.
+
+    The first line is a header holding the command arguments needed to rebuild
+    the job list; every following line is a state transition for one job.
+    Lines are flushed and fsync'ed as they are written, so after a crash the
+    journal reflects every transition up to the interruption.
+    """
+
+    PENDING = "pending"
+    IN_FLIGHT = "in_flight"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, path):
+        """
+        Open a journal file, replaying any records it already contains.
+
+        Args:
+            path (str): Path to the journal (.jsonl) file
+        """
+        self.path = path
+        self.command = None
+        self.args = {}
+        self.states = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    @classmethod
+    def create(cls, journal_dir, command, args):
+        """
+        Start a new journal for a command run.
+
+        Args:
+            journal_dir (str): Directory holding the journals
+            command (str): Command name ("run", "review", "chunked-review")
+            args (dict): JSON-serialisable arguments needed to rebuild the jobs on resume
+
+        Returns:
+            RunJournal: The new journal
+        """
+        os.makedirs(journal_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        journal = cls(os.path.join(journal_dir, f"{command}_{timestamp}.jsonl"))
+        journal.command = command
+        journal.args = args
+        journal._write({"type": "header", "command": command, "args": args})
+        logger.info(f"Started {command} journal at {journal.path}")
+        return journal
+
+    @classmethod
+    def latest(cls, journal_dir, command):
+        """
+        Open the most recent journal for a command.
+
+        Args:
+            journal_dir (str): Directory holding the journals
+            command (str): Command name
+
+        Returns:
+            RunJournal or None: The journal, or None if the command has never been journaled
+        """
+        paths = glob.glob(os.path.join(journal_dir, f"{command}_*.jsonl"))
+        if not paths:
+            return None
+        journal = cls(max(paths, key=os.path.getmtime))
+        logger.info(f"Resuming {command} from journal {journal.path}")
+        return journal
+
+    def _load(self):
+        truncate_partial_line(self.path)
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable line {line_number} in journal {self.path}")
+                    continue
+                if record.get("type") == "header":
+                    self.command = record.get("command")
+                    self.args = record.get("args", {})
+                elif "job" in record:
+                    self.states[record["job"]] = record.get("state")
+
+    def _write(self, record):
+        with self.lock:
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def record(self, job_key, state, **details):
+        """
+        Append a state transition for a job.
+
+        Args:
+            job_key (str): Unique identifier of the job
+            state (str): One of PENDING, IN_FLIGHT, DONE, FAILED
+            **details: Extra JSON-serialisable fields (e.g. result path, error message)
+        """
+        self.states[job_key] = state
+        self._write({
+            "job": job_key,
+            "state": state,
+            "time": datetime.now().isoformat(),
+            **details
+        })
+
+    def is_done(self, job_key):
+        """Return True if the job has already completed successfully."""
+        return self.states.get(job_key) == self.DONE
+
+    def summary(self):
+        """
+        Count the jobs in each state.
+
+        Returns:
+            dict: state -> number of jobs
+        """
+        counts = {}
+        for state in self.states.values():
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    def close(self):
+        """Close the journal file."""
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
@@ -11,6 +11,23 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Rough average for English text and markdown across current LLM tokenizers
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens in a text without calling a tokenizer.
+    
+    Args:
+        text (str): The text to estimate
+        
+    Returns:
+        int: Approximate token count (about 4 characters per token)
+    """
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
 def extract_json_from_llm_response(response_text, sensor_info=None, model_info=None):
     """
     Extract and parse JSON from LLM response text with robust error handling.
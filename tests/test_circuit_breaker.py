@@ -0,0 +1,88 @@
+"""
+Tests that half-open probes which end without an outcome give their slot back.
+"""
+
+import unittest
+from unittest import mock
+
+from src.api_client import OpenRouterClient
+from src.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
+from src.rate_limiter import DailyTokenBudgetExceeded
+
+SETTINGS = {'circuit_breaker': {'min_requests': 1, 'window_size': 1, 'open_seconds': 0, 'half_open_max_requests': 1}}
+
+
+class StreamResponse:
+    """Minimal streamed requests.Response with a few server-sent events."""
+
+    status_code = 200
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_lines(self, decode_unicode=False):
+        for i in range(3):
+            yield 'data: {"choices": [{"delta": {"content": "tok%d"}}]}' % i
+        yield 'data: [DONE]'
+
+
+class HalfOpenProbeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = CircuitBreakerRegistry(SETTINGS)
+        self.breaker = self.registry.get("openrouter", "m")
+        # One failure opens the circuit; with open_seconds=0 the next request is a half-open probe
+        self.breaker.record_failure()
+        self.client = OpenRouterClient("key", "http://openrouter.invalid")
+        self.client.set_circuit_breakers(self.registry)
+
+    def assert_probe_available(self):
+        probe = self.breaker.before_request()
+        self.assertIsNotNone(probe)
+        self.breaker.release_probe(probe)
+
+    def test_released_probe_frees_the_slot(self):
+        probe = self.breaker.before_request()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+        self.breaker.release_probe(probe)
+        self.assert_probe_available()
+
+    def test_release_after_outcome_is_a_no_op(self):
+        probe = self.breaker.before_request()
+        self.breaker.record_failure()
+        self.breaker.release_probe(probe)
+        # The failed probe reopened the circuit; the next period starts with its own slot
+        second = self.breaker.before_request()
+        self.breaker.release_probe(probe)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request()
+        self.breaker.release_probe(second)
+
+    def test_probe_that_raises_before_recording_is_released(self):
+        with mock.patch.object(self.client.session, "post", side_effect=RuntimeError("unexpected")):
+            with self.assertRaises(RuntimeError):
+                self.client.send_request("m", "prompt")
+        self.assert_probe_available()
+
+    def test_stream_rejected_by_rate_limiter_takes_no_probe(self):
+        rate_limiter = mock.Mock()
+        rate_limiter.wait_if_needed.side_effect = DailyTokenBudgetExceeded("budget spent")
+        self.client.set_rate_limiter(rate_limiter)
+        with self.assertRaises(DailyTokenBudgetExceeded):
+            list(self.client.stream_request("m", "prompt"))
+        self.assert_probe_available()
+
+    def test_abandoned_stream_releases_its_probe(self):
+        with mock.patch.object(self.client.session, "post", return_value=StreamResponse()):
+            stream = self.client.stream_request("m", "prompt")
+            self.assertEqual(next(stream), "tok0")
+            stream.close()
+        self.assert_probe_available()
+
+
+if __name__ == "__main__":
+    unittest.main()
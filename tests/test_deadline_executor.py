@@ -0,0 +1,155 @@
+"""
+Tests for DeadlineExecutor and the Gemini client's use of it, against deliberately hanging stubs.
+"""
+
+import time
+import threading
+import unittest
+from unittest import mock
+
+from src.deadline_executor import DeadlineExecutor, DeadlineExceeded
+
+
+class HangingCall:
+    """Callable that blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.finished = threading.Event()
+
+    def __call__(self, *args, **kwargs):
+        self.started.set()
+        self.release.wait(10)
+        self.finished.set()
+        return "late"
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class DeadlineExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.hangs = []
+
+    def tearDown(self):
+        for hang in self.hangs:
+            hang.release.set()
+
+    def hanging_call(self):
+        hang = HangingCall()
+        self.hangs.append(hang)
+        return hang
+
+    def test_returns_result_within_deadline(self):
+        executor = DeadlineExecutor(max_workers=2)
+        self.assertEqual(executor.call(1.0, lambda a, b=0: a + b, 2, b=3), 5)
+        executor.shutdown(timeout=1)
+
+    def test_propagates_exceptions(self):
+        executor = DeadlineExecutor(max_workers=1)
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            executor.call(1.0, fail)
+        executor.shutdown(timeout=1)
+
+    def test_hanging_call_is_abandoned_at_the_deadline(self):
+        executor = DeadlineExecutor(max_workers=1)
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            executor.call(0.2, self.hanging_call())
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(executor.get_stats()["abandoned"], 1)
+
+    def test_abandoned_worker_is_replaced(self):
+        executor = DeadlineExecutor(max_workers=1)
+        with self.assertRaises(DeadlineExceeded):
+            executor.call(0.1, self.hanging_call())
+        # The only worker is stuck, yet the retry runs immediately on its replacement
+        start = time.monotonic()
+        self.assertEqual(executor.call(1.0, lambda: "retry"), "retry")
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_abandoned_thread_exits_when_call_returns(self):
+        executor = DeadlineExecutor(max_workers=1)
+        hang = self.hanging_call()
+        with self.assertRaises(DeadlineExceeded):
+            executor.call(0.1, hang)
+        stuck_threads = threading.active_count()
+        hang.release.set()
+        self.assertTrue(hang.finished.wait(1))
+        self.assertTrue(wait_until(lambda: executor.get_stats()["abandoned"] == 0))
+        self.assertTrue(wait_until(lambda: threading.active_count() < stuck_threads))
+
+    def test_queued_call_past_deadline_never_runs(self):
+        executor = DeadlineExecutor(max_workers=1, max_abandoned=0)
+        hang = self.hanging_call()
+        executor.submit(hang)
+        self.assertTrue(hang.started.wait(1))
+        ran = threading.Event()
+        with self.assertRaises(DeadlineExceeded):
+            executor.call(0.1, ran.set)
+        hang.release.set()
+        executor.shutdown(timeout=1)
+        self.assertFalse(ran.is_set())
+
+    def test_replacements_are_capped(self):
+        executor = DeadlineExecutor(max_workers=1, max_abandoned=1)
+        for _ in range(2):
+            with self.assertRaises(DeadlineExceeded):
+                executor.call(0.1, self.hanging_call())
+        stats = executor.get_stats()
+        self.assertEqual(stats["abandoned"], 1)
+        self.assertEqual(stats["deadlines_exceeded"], 2)
+        # The second stuck worker was not replaced, so the pool has no free worker left
+        with self.assertRaises(DeadlineExceeded):
+            executor.call(0.1, lambda: None)
+
+
+class GeminiDeadlineTest(unittest.TestCase):
+
+    def test_hanging_sdk_call_is_retried_without_blocking(self):
+        import src.api_client as api_client
+
+        hang = HangingCall()
+        calls = []
+
+        class HangingModel:
+            def __init__(self, name):
+                pass
+
+            def generate_content(self, prompt, **kwargs):
+                calls.append(prompt)
+                return hang()
+
+        self.addCleanup(hang.release.set)
+        executor = DeadlineExecutor(max_workers=1, name="gemini-test")
+        with mock.patch.object(api_client.genai, "configure"), \
+                mock.patch.object(api_client.genai, "GenerativeModel", HangingModel), \
+                mock.patch.object(api_client, "get_gemini_executor", return_value=executor), \
+                mock.patch.object(api_client.time, "sleep"):
+            client = api_client.GeminiClient("test-key", timeout=0.1)
+            start = time.monotonic()
+            with self.assertRaises(Exception) as raised:
+                client.send_request("google/gemini-test", "prompt")
+            elapsed = time.monotonic() - start
+
+        self.assertIn("timed out", str(raised.exception))
+        # Every attempt was sent even though the earlier ones never returned
+        self.assertEqual(len(calls), 3)
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(executor.get_stats()["abandoned"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests that replies rejected by their caller are not served again from the response cache.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.api_client import APIClient, discard_cached_response
+from src.chunked_reviewer import ChunkedReviewer
+from src.response_cache import ResponseCache
+
+
+class CountingClient(APIClient):
+    """Client that answers every request with the next canned reply, through the response cache."""
+
+    def __init__(self, replies, response_cache):
+        super().__init__()
+        self.provider_name = "stub"
+        self.replies = list(replies)
+        self.sent = 0
+        self.set_response_cache(response_cache)
+
+    def send_request(self, model, prompt):
+        cached = self._get_cached_response(model, prompt)
+        if cached is not None:
+            return cached
+        result = {"text": self.replies[self.sent], "input_tokens": 1, "output_tokens": 1}
+        self.sent += 1
+        self._store_cached_response(model, prompt, result)
+        return result
+
+
+class DiscardRejectedResponseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = ResponseCache(os.path.join(self.tmp, "cache.db"), ttl_seconds=3600)
+        # discard_cached_response works on the shared cache the factory hands to every client
+        patcher = mock.patch("src.api_client._response_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.cache.conn.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_discarded_reply_is_requested_again(self):
+        client = CountingClient(["not json", '{"ok": true}'], self.cache)
+        first = client.send_request("m", "prompt")
+        self.assertTrue(discard_cached_response(first))
+        second = client.send_request("m", "prompt")
+        self.assertEqual(client.sent, 2)
+        self.assertEqual(second["text"], '{"ok": true}')
+        # An accepted reply stays cached
+        self.assertTrue(client.send_request("m", "prompt").get("cached"))
+        self.assertEqual(client.sent, 2)
+
+    def test_malformed_chunk_is_not_replayed_from_cache_on_rerun(self):
+        client = CountingClient(["no json here", "still no json"], self.cache)
+        config = {
+            "reviews_base_path": os.path.join(self.tmp, "reviews"),
+            "official_datasheets_path": os.path.join(self.tmp, "official"),
+        }
+        reviewer = ChunkedReviewer(client, config)
+
+        chunk, _, error = reviewer._attempt_chunk(1, "m", "Brand", "Type", "chunk prompt")
+        self.assertIsNone(chunk)
+        self.assertIsNotNone(error)
+        self.assertEqual(client.sent, 1)
+
+        # A rerun with the same prompt sends a new request instead of reusing the bad reply
+        reviewer._attempt_chunk(1, "m", "Brand", "Type", "chunk prompt")
+        self.assertEqual(client.sent, 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()